@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db.models import Q
+from django.utils import timezone
 
 from .models import (
     TrainType,
@@ -7,15 +9,145 @@ from .models import (
     Route,
     CrewMember,
     Journey,
+    JourneyCrew,
     Ticket,
     Order,
+    Job,
 )
+from .pagination import EstimatedCountPaginator
 
-admin.site.register(TrainType)
-admin.site.register(Train)
-admin.site.register(Station)
-admin.site.register(Route)
-admin.site.register(CrewMember)
-admin.site.register(Journey)
-admin.site.register(Ticket)
-admin.site.register(Order)
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist of a table too large to count or to load into a dropdown:
+    an estimated count past the threshold, foreign keys as raw ids, and a
+    numeric search term matches the ``id_search_fields`` through their
+    indexes.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    id_search_fields = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if term.isdigit() and self.id_search_fields:
+            lookups = Q()
+            for field in self.id_search_fields:
+                lookups |= Q(**{field: int(term)})
+            return queryset.filter(lookups), False
+        return super().get_search_results(request, queryset, search_term)
+
+
+@admin.register(TrainType)
+class TrainTypeAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+
+
+@admin.register(Train)
+class TrainAdmin(admin.ModelAdmin):
+    list_display = ("name", "train_type", "cargo_num", "places_in_cargo")
+    list_select_related = ("train_type",)
+    autocomplete_fields = ("train_type",)
+    search_fields = ("name",)
+
+
+@admin.register(Station)
+class StationAdmin(admin.ModelAdmin):
+    list_display = ("name", "latitude", "longitude")
+    search_fields = ("name",)
+
+
+@admin.register(Route)
+class RouteAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "source", "destination")
+    autocomplete_fields = ("source", "destination")
+    search_fields = ("source__name", "destination__name")
+
+    def get_queryset(self, request):
+        # Route.__str__ reads both stations, also in autocomplete results.
+        return (
+            super().get_queryset(request)
+            .select_related("source", "destination")
+        )
+
+
+@admin.register(CrewMember)
+class CrewMemberAdmin(admin.ModelAdmin):
+    list_display = ("first_name", "last_name")
+    search_fields = ("first_name", "last_name")
+
+
+class JourneyCrewInline(admin.TabularInline):
+    model = JourneyCrew
+    extra = 1
+    autocomplete_fields = ("crewmember",)
+
+
+@admin.register(Journey)
+class JourneyAdmin(LargeTableAdmin):
+    inlines = (JourneyCrewInline,)
+    list_display = ("id", "route", "train", "departure_time", "arrival_time")
+    list_select_related = ("route__source", "route__destination", "train")
+    autocomplete_fields = ("route", "train")
+    date_hierarchy = "departure_time"
+    search_fields = ("route__source__name", "route__destination__name")
+    id_search_fields = ("id",)
+
+
+@admin.register(Order)
+class OrderAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "created_at")
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
+    date_hierarchy = "created_at"
+    ordering = ("-id",)
+    search_fields = ("user__email__exact",)
+    id_search_fields = ("id",)
+
+
+@admin.register(Ticket)
+class TicketAdmin(LargeTableAdmin):
+    list_display = (
+        "id",
+        "journey",
+        "order",
+        "cargo_number",
+        "seat_number",
+    )
+    list_select_related = (
+        "journey__route__source",
+        "journey__route__destination",
+        "order",
+    )
+    raw_id_fields = ("journey", "order")
+    # The partition key: a date range only reads its monthly partitions.
+    date_hierarchy = "journey_departure_time"
+    ordering = ("-id",)
+    search_fields = ("order__user__email__exact",)
+    id_search_fields = ("id", "order_id", "journey_id")
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin):
+    list_display = (
+        "id",
+        "name",
+        "status",
+        "attempts",
+        "run_at",
+        "duration",
+        "worker",
+    )
+    list_filter = ("status",)
+    ordering = ("-id",)
+    search_fields = ("^name",)
+    id_search_fields = ("id",)
+    actions = ("retry",)
+
+    @admin.action(description="Retry selected failed jobs")
+    def retry(self, request, queryset):
+        retried = queryset.filter(status=Job.FAILED).update(
+            status=Job.QUEUED, run_at=timezone.now(), attempts=0
+        )
+        self.message_user(request, f"Queued {retried} jobs again.")
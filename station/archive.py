@@ -0,0 +1,126 @@
+"""
+Cold storage for departed journeys.
+
+``archive_batch`` moves a batch of journeys that arrived before a cutoff,
+their tickets and the orders left without tickets into the ``Archived*``
+tables. Each batch is its own short transaction, so the hot tables are
+never locked for longer than one batch takes. Orders that keep active
+tickets stay live, ``OrderViewSet`` lists their archived tickets with them.
+Occupancy statistics keep counting archived journeys.
+"""
+
+import heapq
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Count
+
+from station import occupancy
+from station.models import (
+    ArchivedJourney,
+    ArchivedOrder,
+    ArchivedTicket,
+    Journey,
+    Order,
+    Ticket,
+)
+
+
+def archive_batch(cutoff, batch_size):
+    """Archive up to ``batch_size`` journeys, returns the counts moved"""
+    with transaction.atomic(), occupancy.suspended():
+        journeys = list(
+            Journey.objects.filter(arrival_time__lt=cutoff)
+            .select_related("route__source", "route__destination", "train")
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("id")[:batch_size]
+        )
+        if not journeys:
+            return 0, 0, 0
+        journey_ids = [journey.id for journey in journeys]
+
+        ArchivedJourney.objects.bulk_create(
+            [
+                ArchivedJourney(
+                    id=journey.id,
+                    departure_time=journey.departure_time,
+                    arrival_time=journey.arrival_time,
+                    route=str(journey.route),
+                    train=journey.train.name,
+                )
+                for journey in journeys
+            ]
+        )
+
+        # Departures precede the cutoff too, which prunes ticket partitions.
+        tickets = Ticket.objects.filter(
+            journey_id__in=journey_ids, journey_departure_time__lt=cutoff
+        )
+        rows = list(
+            tickets.values_list(
+                "id", "journey_id", "order_id", "cargo_number", "seat_number"
+            )
+        )
+        ArchivedTicket.objects.bulk_create(
+            [
+                ArchivedTicket(
+                    id=ticket_id,
+                    journey_id=journey_id,
+                    order_id=order_id,
+                    cargo_number=cargo_number,
+                    seat_number=seat_number,
+                )
+                for ticket_id, journey_id, order_id, cargo_number, seat_number
+                in rows
+            ]
+        )
+        tickets.delete()
+
+        orphans = list(
+            Order.objects.filter(id__in={row[2] for row in rows})
+            .annotate(ticket_count=Count("tickets"))
+            .filter(ticket_count=0)
+            .values_list("id", "created_at", "user_id")
+        )
+        ArchivedOrder.objects.bulk_create(
+            [
+                ArchivedOrder(id=order_id, created_at=created_at, user_id=user)
+                for order_id, created_at, user in orphans
+            ]
+        )
+        Order.objects.filter(id__in=[order[0] for order in orphans]).delete()
+        Journey.objects.filter(id__in=journey_ids).delete()
+
+    return len(journeys), len(rows), len(orphans)
+
+
+class OrderHistory:
+    """
+    Active and archived orders of one user as a single sequence, newest
+    first. Slicing fetches at most ``stop`` rows from each table, so it can
+    be handed to a paginator directly.
+    """
+
+    def __init__(self, orders, archived_orders):
+        self.orders = orders.order_by("-created_at", "-id")
+        self.archived_orders = archived_orders.order_by("-created_at", "-id")
+
+    def count(self):
+        return self.orders.count() + self.archived_orders.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        start, stop = item.start or 0, item.stop
+        if stop is None:
+            stop = self.count()
+        merged = heapq.merge(
+            self.orders[:stop],
+            self.archived_orders[:stop],
+            key=lambda order: (order.created_at, order.id),
+            reverse=True,
+        )
+        return list(islice(merged, start, stop))
@@ -0,0 +1,308 @@
+"""
+Live seat availability of journeys.
+
+Ticket inserts and deletes mark their journey as changed (see
+station.signals). Once the transaction commits, the availability of the
+changed journeys is read in one query and published to a broker, which
+fans it out to the event streams of that journey (see station.streams).
+
+Subscribers are small slot objects that only remember the latest and the
+last sent availability, so thousands of idle streams cost a few hundred
+bytes each and a burst of sales collapses into one event per stream.
+``LocalBroker`` delivers within the process; ``RedisBroker`` relays
+through Redis pub/sub so that sales made by any worker reach every
+worker's streams, and only while some worker streams the journey.
+``AVAILABILITY_BROKER["BACKEND"]`` selects the class.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+from station.models import Journey
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "BACKEND": "station.availability.LocalBroker",
+    "OPTIONS": {},
+    "KEEPALIVE": 15,
+}
+
+
+def broker_settings():
+    options = getattr(settings, "AVAILABILITY_BROKER", {})
+    return {**DEFAULT_SETTINGS, **options}
+
+
+class Subscriber:
+    """One stream's view of a journey, only touched on its event loop"""
+
+    __slots__ = ("journey_id", "loop", "available", "sent", "changed")
+
+    def __init__(self, journey_id, available=None):
+        self.journey_id = journey_id
+        self.loop = asyncio.get_running_loop()
+        self.available = available
+        self.sent = available
+        self.changed = asyncio.Event()
+
+    def update(self, available):
+        self.available = available
+        if self.sent is not None and available != self.sent:
+            self.changed.set()
+
+    def seed(self, available):
+        """
+        Start from the availability read after subscribing. An update
+        delivered in the meantime may be newer, it goes out next.
+        """
+        self.sent = available
+        if self.available is None:
+            self.available = available
+        elif self.available != available:
+            self.changed.set()
+
+    def take(self):
+        """The latest availability and its change since the last take"""
+        self.changed.clear()
+        delta = self.available - self.sent
+        self.sent = self.available
+        return self.available, delta
+
+
+def deliver(subscribers, available):
+    for subscriber in list(subscribers):
+        subscriber.update(available)
+
+
+class LocalBroker:
+    """Fans availability out to the subscribers of this process"""
+
+    def __init__(self, **options):
+        self._lock = threading.Lock()
+        # journey id -> event loop -> subscribers on that loop
+        self._channels = {}
+
+    def has_subscribers(self, journey_id):
+        return journey_id in self._channels
+
+    async def subscribe(self, journey_id, available=None):
+        subscriber = Subscriber(journey_id, available)
+        with self._lock:
+            loops = self._channels.setdefault(journey_id, {})
+            loops.setdefault(subscriber.loop, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            loops = self._channels.get(subscriber.journey_id, {})
+            subscribers = loops.get(subscriber.loop, set())
+            subscribers.discard(subscriber)
+            if not subscribers:
+                loops.pop(subscriber.loop, None)
+            if not loops:
+                self._channels.pop(subscriber.journey_id, None)
+
+    def publish(self, journey_id, available):
+        """Thread-safe: one callback per event loop, not per subscriber"""
+        with self._lock:
+            loops = list(self._channels.get(journey_id, {}).items())
+        for loop, subscribers in loops:
+            try:
+                loop.call_soon_threadsafe(deliver, subscribers, available)
+            except RuntimeError:
+                # The loop is closed, its streams are gone.
+                with self._lock:
+                    self._channels.get(journey_id, {}).pop(loop, None)
+
+
+class RedisBroker(LocalBroker):
+    """
+    Publishes through Redis (requires the "redis" package). One listener
+    thread per process receives every journey's updates and delivers
+    them to the local subscribers.
+    """
+
+    def __init__(
+        self,
+        url,
+        channel="journey-availability",
+        reconnect_delay=1,
+        watch_interval=15,
+        **options,
+    ):
+        import redis
+
+        super().__init__(**options)
+        self.redis = redis.Redis.from_url(url)
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.watch_interval = watch_interval
+        self._listener = None
+
+    def watched_key(self, journey_id):
+        return f"{self.channel}:watched:{journey_id}"
+
+    def has_subscribers(self, journey_id):
+        """
+        Whether a stream of any worker watches the journey. Markers outlive
+        their last stream by up to three watch intervals, which only costs
+        a few unneeded publishes.
+        """
+        import redis
+
+        try:
+            return bool(self.redis.exists(self.watched_key(journey_id)))
+        except redis.RedisError:
+            # Let the publish fail and log after the commit instead.
+            return True
+
+    def watch(self, journey_ids=None):
+        """Mark the journeys of this worker's streams as watched"""
+        if journey_ids is None:
+            with self._lock:
+                journey_ids = list(self._channels)
+        pipeline = self.redis.pipeline(transaction=False)
+        for journey_id in journey_ids:
+            pipeline.set(
+                self.watched_key(journey_id), 1, ex=3 * self.watch_interval
+            )
+        pipeline.execute()
+
+    async def subscribe(self, journey_id, available=None):
+        import redis
+
+        self.start_listener()
+        subscriber = await super().subscribe(journey_id, available)
+        try:
+            await asyncio.to_thread(self.watch, [journey_id])
+        except redis.RedisError:
+            # The listener marks it once Redis is back.
+            logger.warning("Could not watch journey %s", journey_id)
+        return subscriber
+
+    def publish(self, journey_id, available):
+        self.redis.publish(self.channel, f"{journey_id}:{available}")
+
+    def start_listener(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self.listen, name="availability", daemon=True
+                )
+                self._listener.start()
+
+    def listen(self):
+        """Relay messages, reconnecting after Redis errors"""
+        import redis
+
+        try:
+            while True:
+                try:
+                    self.relay()
+                except redis.RedisError:
+                    logger.warning(
+                        "Lost the availability channel, reconnecting in "
+                        "%s seconds",
+                        self.reconnect_delay,
+                        exc_info=True,
+                    )
+                    time.sleep(self.reconnect_delay)
+        finally:
+            # Unexpected errors end the thread, the next stream restarts it.
+            with self._lock:
+                self._listener = None
+
+    def relay(self):
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(self.channel)
+            # Updates published while disconnected were lost.
+            self.refresh()
+            watched = None
+            while True:
+                if (
+                    watched is None
+                    or time.monotonic() - watched >= self.watch_interval
+                ):
+                    self.watch()
+                    watched = time.monotonic()
+                message = pubsub.get_message(timeout=self.watch_interval)
+                if message is None:
+                    continue
+                journey_id, available = message["data"].split(b":")
+                LocalBroker.publish(self, int(journey_id), int(available))
+        finally:
+            pubsub.close()
+
+    def refresh(self):
+        with self._lock:
+            journey_ids = list(self._channels)
+        if not journey_ids:
+            return
+        try:
+            available = current_availability(journey_ids)
+        finally:
+            close_old_connections()
+        for journey_id, tickets_available in available.items():
+            LocalBroker.publish(self, journey_id, tickets_available)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                options = broker_settings()
+                _broker = import_string(options["BACKEND"])(
+                    **options["OPTIONS"]
+                )
+    return _broker
+
+
+def current_availability(journey_ids):
+    return dict(
+        Journey.objects.filter(pk__in=journey_ids)
+        .with_tickets_available()
+        .values_list("id", "tickets_available")
+    )
+
+
+_changed = threading.local()
+
+
+def journey_changed(journey_id):
+    """Publish the journey's availability after the current commit"""
+    if not get_broker().has_subscribers(journey_id):
+        return
+    pending = getattr(_changed, "journeys", None)
+    if pending is None:
+        pending = _changed.journeys = set()
+    pending.add(journey_id)
+    # Every change registers a flush: after a rollback the ids stay
+    # pending and simply go out with the next commit.
+    transaction.on_commit(flush)
+
+
+def flush():
+    pending = getattr(_changed, "journeys", None)
+    if not pending:
+        return
+    _changed.journeys = set()
+    # The orders are committed, a broker or query error must not fail them.
+    try:
+        broker = get_broker()
+        for journey_id, available in current_availability(pending).items():
+            broker.publish(journey_id, available)
+    except Exception:
+        logger.exception("Could not publish the availability of %s", pending)
@@ -0,0 +1,133 @@
+"""
+Departure and arrival boards of a station.
+
+A board lists the next journeys leaving (or reaching) a station with their
+available tickets. Station screens poll it every few seconds, so each board
+is cached for a few seconds under a per-station generation counter. Journey,
+route and ticket changes bump the counters of the stations they touch
+(see station.signals), so a board refreshes on the next poll after a
+change while other stations keep their entries. Tickets bump them once
+per order, after commit. Renamed stations show up once the entries expire.
+"""
+
+from functools import partial
+from itertools import chain
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from station import search_cache
+from station.models import Journey, Route
+
+PREFIX = "station-board"
+DEPARTURES = "departures"
+ARRIVALS = "arrivals"
+TIME_FIELDS = {DEPARTURES: "departure_time", ARRIVALS: "arrival_time"}
+STATION_FIELDS = {
+    DEPARTURES: "route__source_id",
+    ARRIVALS: "route__destination_id",
+}
+DEFAULT_SETTINGS = {
+    "TIMEOUT": 5,
+    "DEFAULT_LIMIT": 10,
+    "MAX_LIMIT": 50,
+}
+
+
+def board_settings():
+    options = getattr(settings, "STATION_BOARD_CACHE", {})
+    return {**DEFAULT_SETTINGS, **options}
+
+
+def generation_key(station_id):
+    return f"{PREFIX}:gen:{station_id}"
+
+
+def generation(station_id):
+    return search_cache.current_generations([generation_key(station_id)])[0]
+
+
+def upcoming(station_id, board, limit, now):
+    """The next ``limit`` journeys of a board, read from the database"""
+    time_field = TIME_FIELDS[board]
+    return list(
+        Journey.objects.filter(
+            **{
+                STATION_FIELDS[board]: station_id,
+                f"{time_field}__gte": now,
+            }
+        )
+        .select_related("route__source", "route__destination", "train")
+        .with_tickets_available()
+        .order_by(time_field, "id")[:limit]
+    )
+
+
+def get_board(station_id, board, limit, serialize, shape=""):
+    """
+    Serialized rows of a board, cached for ``TIMEOUT`` seconds per
+    response ``shape``. Journeys that left while cached are dropped on read.
+    """
+    now = timezone.now()
+    key = (
+        f"{PREFIX}:{station_id}:{board}:{limit}:{shape}:"
+        f"{generation(station_id)}"
+    )
+    cached = cache.get(key)
+    if cached is None:
+        journeys = upcoming(station_id, board, limit, now)
+        cached = [
+            (getattr(journey, TIME_FIELDS[board]), row)
+            for journey, row in zip(journeys, serialize(journeys))
+        ]
+        cache.set(key, cached, timeout=board_settings()["TIMEOUT"])
+    return [row for moment, row in cached if moment >= now]
+
+
+def invalidate_stations(*station_ids):
+    """Refresh the boards of these stations"""
+    search_cache.bump(
+        sorted({generation_key(pk) for pk in station_ids if pk is not None})
+    )
+
+
+def _invalidate(routes):
+    invalidate_stations(
+        *chain.from_iterable(
+            routes.values_list("source_id", "destination_id")
+        )
+    )
+
+
+def invalidate_routes(*route_ids):
+    _invalidate(Route.objects.filter(pk__in=route_ids))
+
+
+def invalidate_journey(journey_id):
+    _invalidate(Route.objects.filter(journey__pk=journey_id))
+
+
+def invalidate_ticket(ticket):
+    """
+    Refresh the boards of a ticket's journey once the transaction commits.
+    Tickets booked together on one ``Order`` instance are refreshed at once,
+    with the stations of the routes their journeys already loaded.
+    """
+    order = ticket._state.fields_cache.get("order")
+    journey = ticket._state.fields_cache.get("journey")
+    route = journey and journey._state.fields_cache.get("route")
+    if order is None or route is None or route.pk != journey.route_id:
+        transaction.on_commit(partial(invalidate_journey, ticket.journey_id))
+        return
+    stations = order.__dict__.setdefault("board_stations", set())
+    stations.update((route.source_id, route.destination_id))
+    transaction.on_commit(partial(_invalidate_order, order))
+
+
+def _invalidate_order(order):
+    # Every ticket of the order scheduled this, the first call does it all.
+    stations = order.__dict__.pop("board_stations", None)
+    if stations:
+        invalidate_stations(*stations)
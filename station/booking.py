@@ -0,0 +1,178 @@
+"""
+Queued order intake.
+
+With ``ORDER_INTAKE`` set to ``"queued"``, creating an order validates the
+tickets, stores a ``BookingRequest`` and answers ``202 Accepted`` with the
+URL of the request's status. The ``run_booking_workers`` command books the
+queue: a worker takes one journey at a time (``FOR NO KEY UPDATE SKIP
+LOCKED`` on the journey, so workers never wait on each other) and books up
+to ``batch_size`` of its oldest requests in a single transaction. Seat
+conflicts stay within one worker and a sale opening commits once per batch
+instead of once per order.
+
+A request whose seats were taken meanwhile fails with the validation
+errors a direct booking would have answered.
+"""
+
+import logging
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Min
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from station.models import BookingRequest, Journey, Order, Ticket
+from station.serializers import BookingRequestSerializer
+
+logger = logging.getLogger(__name__)
+
+SEAT_TAKEN = {"tickets": ["One of the seats was booked meanwhile."]}
+JOURNEY_DELETED = {"tickets": ["One of the journeys was deleted."]}
+
+
+def queued_intake():
+    return getattr(settings, "ORDER_INTAKE", "inline") == "queued"
+
+
+def enqueue(user, tickets_data):
+    """Store validated tickets of an order for the booking workers"""
+    return BookingRequest.objects.create(
+        user=user,
+        journey=tickets_data[0]["journey"],
+        tickets=[
+            {
+                "journey": ticket["journey"].pk,
+                "cargo_number": ticket["cargo_number"],
+                "seat_number": ticket["seat_number"],
+            }
+            for ticket in tickets_data
+        ],
+    )
+
+
+def pending_journeys(limit):
+    """Journeys with pending requests, the longest waiting first"""
+    return list(
+        BookingRequest.objects.pending()
+        .order_by()
+        .values("journey_id")
+        .annotate(first=Min("id"))
+        .order_by("first")
+        .values_list("journey_id", flat=True)[:limit]
+    )
+
+
+def book(booking, journeys):
+    if any(ticket["journey"] not in journeys for ticket in booking.tickets):
+        booking.status = BookingRequest.FAILED
+        booking.errors = JOURNEY_DELETED
+        return
+    try:
+        with transaction.atomic():
+            order = Order.objects.create(user_id=booking.user_id)
+            for ticket in booking.tickets:
+                Ticket.objects.create(
+                    order=order,
+                    journey=journeys[ticket["journey"]],
+                    cargo_number=ticket["cargo_number"],
+                    seat_number=ticket["seat_number"],
+                )
+    except ValidationError as exc:
+        booking.status = BookingRequest.FAILED
+        booking.errors = {"tickets": exc.messages}
+    except IntegrityError:
+        booking.status = BookingRequest.FAILED
+        booking.errors = SEAT_TAKEN
+    else:
+        booking.status = BookingRequest.BOOKED
+        booking.order = order
+
+
+def process_journey(journey_id, batch_size):
+    """
+    Book the oldest pending requests of a journey and return them, or
+    nothing when another worker holds the journey.
+    """
+    with transaction.atomic():
+        locked = (
+            Journey.objects.select_for_update(no_key=True, skip_locked=True)
+            .filter(pk=journey_id)
+            .exists()
+        )
+        if not locked:
+            return []
+        bookings = list(
+            BookingRequest.objects.pending()
+            .filter(journey_id=journey_id)
+            .order_by("id")[:batch_size]
+        )
+        journeys = Journey.objects.select_related("route", "train").in_bulk(
+            {
+                ticket["journey"]
+                for booking in bookings
+                for ticket in booking.tickets
+            }
+        )
+        now = timezone.now()
+        for booking in bookings:
+            book(booking, journeys)
+            booking.processed_at = now
+        BookingRequest.objects.bulk_update(
+            bookings, ["status", "order", "errors", "processed_at"]
+        )
+    return bookings
+
+
+def drain(batch_size=100):
+    """Book every pending request, returns how many were processed"""
+    processed = 0
+    while True:
+        batch = 0
+        for journey_id in pending_journeys(batch_size):
+            batch += len(process_journey(journey_id, batch_size))
+        if not batch:
+            return processed
+        processed += batch
+
+
+class BookingWorker(threading.Thread):
+    def __init__(self, stop, batch_size, poll_interval):
+        super().__init__(daemon=True)
+        self.stop = stop
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+
+    def run(self):
+        while not self.stop.is_set():
+            try:
+                processed = drain(self.batch_size)
+            except Exception:
+                logger.exception("Booking worker failed, retrying")
+                processed = 0
+            finally:
+                close_old_connections()
+            if not processed:
+                self.stop.wait(self.poll_interval)
+
+
+class QueuedCreateMixin:
+    """Queue ``create`` with ``202 Accepted`` when ``queued_intake()``"""
+
+    def create(self, request, *args, **kwargs):
+        if not queued_intake():
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        booking = enqueue(request.user, serializer.validated_data["tickets"])
+        data = BookingRequestSerializer(
+            booking, context=self.get_serializer_context()
+        ).data
+        return Response(
+            data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": data["url"]},
+        )
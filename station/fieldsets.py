@@ -0,0 +1,139 @@
+"""
+Sparse fieldsets and expansion of read responses.
+
+On GET requests ``?fields=id,route`` keeps only the listed fields of the
+top-level serializer, ``?omit=crew_members`` drops fields and
+``?expand=route`` swaps a field's compact form (a name or id) for the
+nested object. Serializers declare in ``Meta`` which relations each field
+reads and how it expands::
+
+    select_related_fields = {"train": ("train",)}
+    prefetch_related_fields = {"crew_members": ("crew_members",)}
+    expandable_fields = {
+        "train": ("station.serializers.TrainSerializer", {"read_only": True})
+    }
+
+``optimize_queryset`` then joins and prefetches only what the kept and
+expanded fields read, so trimming a response trims its queries too.
+"""
+
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_names(query_params, name):
+    value = query_params.get(name)
+    if value is None:
+        return None
+    return {item.strip() for item in value.split(",") if item.strip()}
+
+
+def field_selection(request):
+    """``(fields, omit, expand)`` of a request, ``fields`` None for all"""
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set(), set()
+    params = request.query_params
+    return (
+        parse_names(params, "fields"),
+        parse_names(params, "omit") or set(),
+        parse_names(params, "expand") or set(),
+    )
+
+
+def is_kept(name, fields, omit):
+    return (fields is None or name in fields) and name not in omit
+
+
+def expansion(serializer_class, name):
+    """The serializer class and field kwargs ``name`` expands to"""
+    path, kwargs = serializer_class.Meta.expandable_fields[name]
+    return import_string(path), kwargs
+
+
+def related_lookups(serializer_class, names, expand=(), prefix=""):
+    """``select_related`` and ``prefetch_related`` lookups of some fields"""
+    meta = serializer_class.Meta
+    selects = getattr(meta, "select_related_fields", {})
+    prefetches = getattr(meta, "prefetch_related_fields", {})
+    select, prefetch = [], []
+    for name in names:
+        select += [prefix + lookup for lookup in selects.get(name, ())]
+        prefetch += [prefix + lookup for lookup in prefetches.get(name, ())]
+        if name not in expand or name not in getattr(
+            meta, "expandable_fields", {}
+        ):
+            continue
+        nested_class, kwargs = expansion(serializer_class, name)
+        source = kwargs.get("source", name).replace(".", "__")
+        nested_select, nested_prefetch = related_lookups(
+            nested_class,
+            nested_class.Meta.fields,
+            prefix=f"{prefix}{source}__",
+        )
+        if name in prefetches:
+            # Relations of prefetched objects can only be prefetched.
+            prefetch += nested_select + nested_prefetch
+        else:
+            select += nested_select
+            prefetch += nested_prefetch
+    return select, prefetch
+
+
+def optimize_queryset(queryset, serializer_class, request):
+    """Join and prefetch what the requested fields of a serializer read"""
+    if not hasattr(getattr(serializer_class, "Meta", None), "fields"):
+        return queryset
+    fields, omit, expand = field_selection(request)
+    names = [
+        name
+        for name in serializer_class.Meta.fields
+        if is_kept(name, fields, omit)
+    ]
+    select, prefetch = related_lookups(serializer_class, names, expand)
+    if select:
+        queryset = queryset.select_related(*dict.fromkeys(select))
+    if prefetch:
+        queryset = queryset.prefetch_related(*dict.fromkeys(prefetch))
+    return queryset
+
+
+class SparseFieldsMixin:
+    """Apply ``?fields=``, ``?omit=`` and ``?expand=`` to a serializer"""
+
+    def is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_root():
+            return fields
+        only, omit, expand = field_selection(self.context.get("request"))
+        for name in expand & set(
+            getattr(self.Meta, "expandable_fields", {})
+        ):
+            if name in fields:
+                nested_class, kwargs = expansion(type(self), name)
+                fields[name] = nested_class(**kwargs)
+        return {
+            name: field
+            for name, field in fields.items()
+            if is_kept(name, only, omit)
+        }
+
+
+class SparseFieldsetsViewMixin:
+    """Trim ``get_queryset()`` to the fields the request asks for"""
+
+    def get_queryset(self):
+        return self.optimize(super().get_queryset())
+
+    def optimize(self, queryset, serializer_class=None):
+        return optimize_queryset(
+            queryset,
+            serializer_class or self.get_serializer_class(),
+            self.request,
+        )
@@ -0,0 +1,102 @@
+"""
+``Idempotency-Key`` support for create endpoints.
+
+The first request with a key inserts a row for (user, key) and keeps it
+locked in the same transaction as the work it does, storing the response
+before committing. A concurrent duplicate blocks on that insert until the
+first request commits, then replays the stored response without running
+validation or inserts again. Server errors roll the row back, so the
+client can retry them with the same key.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from station.models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+def key_ttl():
+    return getattr(settings, "IDEMPOTENCY_KEY_TTL", timedelta(hours=24))
+
+
+def fingerprint(request):
+    """Hash of the method, path and canonical JSON body of a request"""
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    payload = f"{request.method} {request.path}\n{body}"
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def claim(user, key, digest):
+    """Return (record, created); waits for a concurrent holder of the key"""
+    now = timezone.now()
+    IdempotencyKey.objects.filter(
+        user=user, key=key, expires_at__lte=now
+    ).delete()
+    try:
+        with transaction.atomic():
+            record = IdempotencyKey.objects.create(
+                user=user,
+                key=key,
+                fingerprint=digest,
+                expires_at=now + key_ttl(),
+            )
+            return record, True
+    except IntegrityError:
+        return IdempotencyKey.objects.get(user=user, key=key), False
+
+
+def replay(record, digest):
+    if record.fingerprint != digest:
+        return Response(
+            {"detail": f"{HEADER} was already used for another request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(
+        record.response,
+        status=record.status_code,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+class IdempotentCreateMixin:
+    """Deduplicate ``create`` calls that carry an ``Idempotency-Key``"""
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return super().create(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            raise ValidationError(
+                {HEADER: f"Use at most {MAX_KEY_LENGTH} characters."}
+            )
+
+        digest = fingerprint(request)
+        with transaction.atomic():
+            record, created = claim(request.user, key, digest)
+            if not created:
+                return replay(record, digest)
+
+            try:
+                response = super().create(request, *args, **kwargs)
+            except APIException as exc:
+                response = self.handle_exception(exc)
+
+            if response.status_code >= 500:
+                transaction.set_rollback(True)
+                return response
+            record.status_code = response.status_code
+            record.response = json.loads(JSONRenderer().render(response.data))
+            record.save(update_fields=["status_code", "response"])
+        return response
@@ -0,0 +1,237 @@
+"""
+Background jobs stored in the database.
+
+A function decorated with ``@job`` is queued with ``func.enqueue(**kwargs)``
+(JSON-serializable kwargs, optionally ``delay`` seconds later). The ``Job``
+row is inserted in the caller's transaction, so a job never runs for work
+that was rolled back. ``manage.py run_workers`` claims due jobs with
+``SELECT ... FOR UPDATE SKIP LOCKED``: any number of workers share the
+table without waiting on each other. Jobs run in a thread or process pool.
+
+A failed attempt is retried after an exponential backoff until
+``max_attempts``, and every attempt records its start, end and duration.
+While a job runs its worker refreshes the job's ``heartbeat_at`` every
+``JOBS["HEARTBEAT"]`` seconds. Jobs whose heartbeat is older than
+``JOBS["STALE_AFTER"]`` seconds belong to a worker that died, they are
+queued again.
+"""
+
+import logging
+import multiprocessing
+import os
+import random
+import socket
+import time
+import traceback
+from concurrent import futures
+from datetime import timedelta
+from functools import partial
+
+import django
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from station.models import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "MAX_ATTEMPTS": 5,
+    "BACKOFF": 10,
+    "MAX_BACKOFF": 60 * 60,
+    "HEARTBEAT": 30,
+    "STALE_AFTER": 5 * 60,
+}
+STALE_CHECK_INTERVAL = 60
+
+
+def job_settings():
+    options = getattr(settings, "JOBS", {})
+    return {**DEFAULT_SETTINGS, **options}
+
+
+def job(func=None, *, max_attempts=None):
+    """Make ``func`` a job, queued with ``func.enqueue(**kwargs)``"""
+
+    def decorate(func):
+        func.job_name = f"{func.__module__}.{func.__qualname__}"
+        func.max_attempts = max_attempts
+        func.enqueue = partial(enqueue, func)
+        return func
+
+    return decorate(func) if func else decorate
+
+
+def enqueue(func, delay=0, **kwargs):
+    return Job.objects.create(
+        name=func.job_name,
+        kwargs=kwargs,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=func.max_attempts or job_settings()["MAX_ATTEMPTS"],
+    )
+
+
+def resolve(name):
+    func = import_string(name)
+    if getattr(func, "job_name", None) != name:
+        raise ImportError(f"{name} is not a job")
+    return func
+
+
+def backoff(attempts):
+    """Seconds before retrying after ``attempts`` failed attempts"""
+    options = job_settings()
+    delay = min(
+        options["BACKOFF"] * 2 ** (attempts - 1), options["MAX_BACKOFF"]
+    )
+    # Jitter spreads the retries of jobs that failed together.
+    return delay * random.uniform(0.5, 1)
+
+
+def claim(limit, worker):
+    """Mark up to ``limit`` due jobs as running, returns their ids"""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+            .select_for_update(skip_locked=True)
+            .order_by("run_at", "id")
+            .values_list("id", flat=True)[:limit]
+        )
+        Job.objects.filter(pk__in=ids).update(
+            status=Job.RUNNING,
+            attempts=F("attempts") + 1,
+            started_at=now,
+            heartbeat_at=now,
+            finished_at=None,
+            duration=None,
+            worker=worker,
+        )
+    return ids
+
+
+def run(job_id):
+    """Run a claimed job and record the outcome of the attempt"""
+    job = Job.objects.get(pk=job_id)
+    started = time.monotonic()
+    try:
+        resolve(job.name)(**job.kwargs)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + timedelta(
+                seconds=backoff(job.attempts)
+            )
+        else:
+            job.status = Job.FAILED
+    else:
+        job.status = Job.DONE
+    job.duration = time.monotonic() - started
+    job.finished_at = timezone.now()
+    job.save(
+        update_fields=[
+            "status",
+            "run_at",
+            "duration",
+            "finished_at",
+            "last_error",
+        ]
+    )
+    logger.info(
+        "%s attempt %d took %.3fs", job, job.attempts, job.duration
+    )
+    return job
+
+
+def execute(job_id):
+    """Pool entry point: ``run`` then release the thread's connection"""
+    try:
+        return run(job_id).status
+    finally:
+        close_old_connections()
+
+
+def heartbeat(job_ids, worker):
+    """Mark the jobs ``worker`` is running as alive"""
+    return Job.objects.filter(
+        pk__in=job_ids, status=Job.RUNNING, worker=worker
+    ).update(heartbeat_at=timezone.now())
+
+
+def requeue_stale():
+    """Queue again the jobs of workers that stopped while running them"""
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=job_settings()["STALE_AFTER"])
+    stale = Job.objects.filter(status=Job.RUNNING, heartbeat_at__lt=cutoff)
+    stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED,
+        finished_at=now,
+        last_error="The worker running the job stopped.",
+    )
+    return stale.update(status=Job.QUEUED, run_at=now)
+
+
+class WorkerPool:
+    """Claim due jobs while ``concurrency`` threads or processes are free"""
+
+    def __init__(self, concurrency=4, processes=False, poll_interval=1.0):
+        self.concurrency = concurrency
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self.name = f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+    def executor(self):
+        if self.processes:
+            # Spawned rather than forked: children open their own
+            # connections instead of sharing the parent's sockets.
+            return futures.ProcessPoolExecutor(
+                self.concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        return futures.ThreadPoolExecutor(
+            self.concurrency, thread_name_prefix="job"
+        )
+
+    def run(self, stop, once=False):
+        """Run jobs until ``stop`` is set, or the queue is empty ``once``"""
+        # future -> id of the job it runs
+        running = {}
+        checked_stale = beaten = time.monotonic() - STALE_CHECK_INTERVAL
+        interval = job_settings()["HEARTBEAT"]
+        with self.executor() as executor:
+            while not stop.is_set():
+                if time.monotonic() - checked_stale > STALE_CHECK_INTERVAL:
+                    requeue_stale()
+                    checked_stale = time.monotonic()
+                done = [future for future in running if future.done()]
+                for future in done:
+                    del running[future]
+                    if future.exception():
+                        logger.error(
+                            "Job runner failed", exc_info=future.exception()
+                        )
+                if running and time.monotonic() - beaten > interval:
+                    heartbeat(list(running.values()), self.name)
+                    beaten = time.monotonic()
+                free = self.concurrency - len(running)
+                ids = claim(free, self.name) if free else []
+                running.update(
+                    (executor.submit(execute, pk), pk) for pk in ids
+                )
+                if once and not running:
+                    break
+                if ids:
+                    continue
+                if running:
+                    futures.wait(
+                        list(running),
+                        timeout=self.poll_interval,
+                        return_when=futures.FIRST_COMPLETED,
+                    )
+                else:
+                    stop.wait(self.poll_interval)
@@ -0,0 +1,66 @@
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+
+from station.archive import archive_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Move journeys that arrived before a cutoff, their tickets and "
+        "orders left without tickets to the archive tables"
+    )
+
+    def add_arguments(self, parser):
+        cutoff = parser.add_mutually_exclusive_group()
+        cutoff.add_argument(
+            "--before",
+            type=lambda value: datetime.strptime(value, "%Y-%m-%d"),
+            help="Archive journeys that arrived before this date "
+                 "(ex. 2024-01-01)",
+        )
+        cutoff.add_argument(
+            "--older-than-days",
+            type=int,
+            default=30,
+            help="Archive journeys that arrived this many days ago",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Journeys moved per transaction",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0,
+            help="Pause between batches, in seconds",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = options["before"] or (
+            datetime.now() - timedelta(days=options["older_than_days"])
+        )
+        totals = [0, 0, 0]
+
+        while True:
+            moved = archive_batch(cutoff, options["batch_size"])
+            if not moved[0]:
+                break
+            totals = [total + count for total, count in zip(totals, moved)]
+            self.stdout.write(
+                "Archived {} journeys, {} tickets, {} orders".format(*totals)
+            )
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Archived {} journeys, {} tickets and {} orders "
+                "that arrived before {:%Y-%m-%d %H:%M}".format(
+                    *totals, cutoff
+                )
+            )
+        )
@@ -0,0 +1,31 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from station.timetable import compile_snapshot, snapshot_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile stations, routes, trains and journeys into the read-only "
+        "timetable snapshot that workers memory-map"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            help="Snapshot file, defaults to TIMETABLE_SNAPSHOT['PATH']",
+        )
+
+    def handle(self, *args, **options):
+        path = options["output"] or snapshot_settings()["PATH"]
+        started = time.monotonic()
+        version, journeys = compile_snapshot(path)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compiled {journeys} journeys (version {version}, "
+                f"{os.path.getsize(path)} bytes) to {path} "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,46 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from train_service.schema import generate_schema, schema_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the OpenAPI schema served at api/schema/, or check that the "
+        "written one is up to date"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            help="Schema file, defaults to OPENAPI_SCHEMA['PATH']",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Exit with an error if the file differs from the API "
+                 "instead of writing it",
+        )
+
+    def handle(self, *args, **options):
+        path = options["output"] or schema_settings()["PATH"]
+        schema = generate_schema()
+
+        if options["check"]:
+            try:
+                with open(path, "rb") as file:
+                    current = file.read()
+            except FileNotFoundError:
+                raise CommandError(f"{path} is missing")
+            if current != schema:
+                raise CommandError(
+                    f"{path} is stale, run 'manage.py generate_schema'"
+                )
+            self.stdout.write(f"{path} is up to date")
+            return
+
+        with open(f"{path}.tmp", "wb") as file:
+            file.write(schema)
+        os.replace(f"{path}.tmp", path)
+        self.stdout.write(self.style.SUCCESS(f"Wrote the schema to {path}"))
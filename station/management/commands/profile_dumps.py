@@ -0,0 +1,70 @@
+import contextlib
+import os
+import pstats
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from train_service.profiling import list_dumps
+
+
+class Command(BaseCommand):
+    help = (
+        "List request profile dumps, or print the hottest functions "
+        "of the given dumps combined"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "dumps",
+            nargs="*",
+            help="Dump names or name fragments (e.g. 'journeys') to summarize",
+        )
+        parser.add_argument(
+            "--sort",
+            default="cumulative",
+            help="pstats sort key (cumulative, tottime, calls, ...)",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=30,
+            help="Number of functions to print",
+        )
+
+    def handle(self, *args, **options):
+        dumps = list_dumps()
+
+        if not options["dumps"]:
+            for path in dumps:
+                try:
+                    stats = pstats.Stats(path)
+                    modified = datetime.fromtimestamp(os.path.getmtime(path))
+                except FileNotFoundError:
+                    # Pruned by a worker since it was listed.
+                    continue
+                self.stdout.write(
+                    f"{os.path.basename(path)}  "
+                    f"{modified:%Y-%m-%d %H:%M:%S}  "
+                    f"{stats.total_tt:.3f}s  "
+                    f"{stats.total_calls} calls"
+                )
+            return
+
+        selected = [
+            path
+            for path in dumps
+            if any(part in os.path.basename(path) for part in options["dumps"])
+        ]
+        stats = pstats.Stats(stream=self.stdout)
+        loaded = 0
+        for path in selected:
+            with contextlib.suppress(FileNotFoundError):
+                stats.add(path)
+                loaded += 1
+        if not loaded:
+            raise CommandError("No profile dumps match the given names")
+
+        self.stdout.write(f"Summary of {loaded} dump(s)")
+        stats.strip_dirs().sort_stats(options["sort"])
+        stats.print_stats(options["limit"])
@@ -0,0 +1,87 @@
+import json
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from train_service.startup import benchmark, boot, package_times
+
+
+class Command(BaseCommand):
+    help = (
+        "Boot a worker in a fresh interpreter and report the import time of "
+        "each module, the cold-start time and the peak memory"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target", choices=("wsgi", "asgi"), default="wsgi"
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=25,
+            help="Number of modules to list, 0 for none",
+        )
+        parser.add_argument(
+            "--sort",
+            choices=("self", "cumulative"),
+            default="self",
+        )
+        parser.add_argument(
+            "--packages",
+            action="store_true",
+            help="Sum the import time of each top-level package",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Boots timed without importtime, the median is reported",
+        )
+        parser.add_argument(
+            "--record",
+            help="Append the benchmark as a JSON line to this file",
+        )
+
+    def handle(self, *args, **options):
+        target = options["target"]
+        _, imports = boot(target, importtime=True)
+        if options["limit"]:
+            self.write_imports(imports, options)
+
+        result = benchmark(target, max(options["repeat"], 1))
+        result.update(
+            target=target,
+            modules=len(imports),
+            import_seconds=sum(row.self_us for row in imports) / 1e6,
+            date=datetime.now().isoformat(timespec="seconds"),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"train_service.{target}: {result['modules']} modules, "
+                f"cold start {result['wall_seconds']:.3f}s "
+                f"(boot {result['boot_seconds']:.3f}s), "
+                f"peak memory {result['max_rss_kb'] / 1024:.1f} MiB"
+            )
+        )
+        if options["record"]:
+            with open(options["record"], "a") as file:
+                file.write(json.dumps(result) + "\n")
+
+    def write_imports(self, imports, options):
+        key = "self_us" if options["sort"] == "self" else "cumulative_us"
+        if options["packages"]:
+            rows = [
+                (name, {"self_us": own, "cumulative_us": cumulative})
+                for name, (own, cumulative) in package_times(imports).items()
+            ]
+        else:
+            rows = [(row.name, vars(row)) for row in imports]
+
+        rows.sort(key=lambda item: item[1][key], reverse=True)
+        self.stdout.write(f"{'self ms':>9} {'cumul. ms':>9}  module")
+        for name, times in rows[: options["limit"]]:
+            self.stdout.write(
+                f"{times['self_us'] / 1000:9.1f} "
+                f"{times['cumulative_us'] / 1000:9.1f}  {name}"
+            )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from station.waitlist import promote_waitlists
+
+
+class Command(BaseCommand):
+    help = "Book free seats of upcoming journeys for their waitlists"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Journeys read per query",
+        )
+
+    def handle(self, *args, **options):
+        promoted = promote_waitlists(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Promoted {len(promoted)} waitlist entries")
+        )
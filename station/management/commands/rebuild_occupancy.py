@@ -0,0 +1,55 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from station.models import Journey
+from station.occupancy import departure_day, rebuild_occupancy
+
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute daily occupancy statistics from journeys and tickets, "
+        "e.g. after loading rows with raw SQL"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=parse_date,
+            help="First departure day to rebuild (ex. 2024-01-01), defaults "
+                 "to the earliest journey that is not archived",
+        )
+        parser.add_argument(
+            "--until",
+            type=parse_date,
+            help="Last departure day to rebuild (ex. 2024-12-31)",
+        )
+
+    def handle(self, *args, **options):
+        since, until = options["since"], options["until"]
+        if since is None:
+            first = (
+                Journey.objects.order_by("departure_time")
+                .values_list("departure_time", flat=True)
+                .first()
+            )
+            if first is None:
+                self.stdout.write("No journeys to count")
+                return
+            since = departure_day(first)
+        if until is not None and until < since:
+            raise CommandError("--until must not be before --since")
+
+        started = time.monotonic()
+        rows = rebuild_occupancy(since, until)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {rows} occupancy rows since {since:%Y-%m-%d} "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,59 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from station.booking import BookingWorker, drain
+
+
+class Command(BaseCommand):
+    help = "Book the orders accepted with queued intake"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Booking threads, each books one journey at a time",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Requests of a journey booked per transaction",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=0.5,
+            help="Seconds an idle worker waits before looking again",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Book the pending requests and exit",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            processed = drain(options["batch_size"])
+            self.stdout.write(
+                self.style.SUCCESS(f"Processed {processed} booking requests")
+            )
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: stop.set())
+        workers = [
+            BookingWorker(
+                stop, options["batch_size"], options["poll_interval"]
+            )
+            for _ in range(options["workers"])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f"Started {len(workers)} booking workers")
+        stop.wait()
+        for worker in workers:
+            worker.join()
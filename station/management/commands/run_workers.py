@@ -0,0 +1,52 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from station.jobs import WorkerPool
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs, claimed with FOR UPDATE SKIP LOCKED so "
+        "that several workers can share the queue"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Jobs run at the same time",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=("thread", "process"),
+            default="thread",
+            help="Run jobs in threads, or in processes for CPU-bound jobs",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds an idle worker waits before looking again",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the due jobs and exit",
+        )
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        if not options["once"]:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *args: stop.set())
+        pool = WorkerPool(
+            concurrency=options["concurrency"],
+            processes=options["pool"] == "process",
+            poll_interval=options["poll_interval"],
+        )
+        kind = "processes" if pool.processes else "threads"
+        self.stdout.write(f"Running jobs in {pool.concurrency} {kind}")
+        pool.run(stop, once=options["once"])
@@ -0,0 +1,470 @@
+import csv
+import io
+import math
+import multiprocessing
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Max
+
+from station.models import (
+    CrewMember,
+    Journey,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.occupancy import rebuild_occupancy
+from train_service.db.pool import close_pools
+
+TRAIN_TYPES = ("intercity", "regional", "express", "sleeper", "suburban")
+FIRST_NAMES = (
+    "Andrii", "Olena", "Taras", "Iryna", "Mykola", "Oksana", "Petro",
+    "Nataliia", "Serhii", "Yuliia", "Dmytro", "Sofiia", "Bohdan", "Maria",
+)
+LAST_NAMES = (
+    "Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko",
+    "Melnyk", "Boiko", "Oliinyk", "Koval", "Polishchuk", "Lysenko",
+)
+MAX_CREW_PER_JOURNEY = 4
+
+# Shared with forked workers, see Command.run_chunks().
+_plan = None
+
+
+def write_rows(model, fields, rows, use_copy):
+    """Insert raw rows into ``model``'s table, bypassing model save()"""
+    if not rows:
+        return
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = [model._meta.get_field(field).column for field in fields]
+    quoted = ", ".join(connection.ops.quote_name(c) for c in columns)
+
+    with connection.cursor() as cursor:
+        if use_copy:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY {table} ({quoted}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        else:
+            placeholders = ", ".join(["%s"] * len(columns))
+            cursor.executemany(
+                f"INSERT INTO {table} ({quoted}) VALUES ({placeholders})",
+                rows,
+            )
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+
+
+def distance_km(a, b):
+    """Great-circle distance between two (latitude, longitude) points"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return round(6371 * 2 * math.asin(math.sqrt(h)))
+
+
+def seed_chunk(chunk):
+    """Generate and write journeys ``[start, stop)`` with crew and orders"""
+    plan = _plan
+    start, stop = chunk
+    orders_per_journey = plan["orders_per_journey"]
+    tickets_per_order = plan["tickets_per_order"]
+    window = plan["days"] * 24 * 60
+
+    journeys, crew, orders, tickets = [], [], [], []
+    for index in range(start, stop):
+        # Seeded per journey: the data does not depend on --chunk-size.
+        rng = random.Random(f"{plan['seed']}-journey-{index}")
+        journey_id = plan["journey_base"] + index
+        route_id, distance = rng.choice(plan["routes"])
+        train_id, cargo_num, places_in_cargo = rng.choice(plan["trains"])
+        departure = plan["start"] + timedelta(
+            minutes=rng.randrange(0, window, 5)
+        )
+        speed = rng.randint(60, 160)
+        arrival = departure + timedelta(
+            minutes=max(30, round((distance or 100) / speed * 60))
+        )
+        journeys.append((journey_id, departure, arrival, route_id, train_id))
+
+        crew_size = rng.randint(2, MAX_CREW_PER_JOURNEY)
+        crew_slot = plan["crew_base"] + index * MAX_CREW_PER_JOURNEY
+        for position, crew_id in enumerate(
+            rng.sample(plan["crew"], crew_size)
+        ):
+            crew.append(
+                (crew_slot + position, journey_id, crew_id, departure, arrival)
+            )
+
+        # Seats are handed out sequentially, so (journey, cargo, seat)
+        # stays unique without any lookups.
+        capacity = cargo_num * places_in_cargo
+        seat = 0
+        for position in range(rng.randint(0, orders_per_journey)):
+            count = min(rng.randint(1, tickets_per_order), capacity - seat)
+            if count <= 0:
+                break
+            slot = index * orders_per_journey + position
+            order_id = plan["order_base"] + slot
+            created_at = departure - timedelta(
+                minutes=rng.randrange(60, 60 * 24 * 60)
+            )
+            orders.append((order_id, created_at, rng.choice(plan["users"])))
+            ticket_slot = plan["ticket_base"] + slot * tickets_per_order
+            for offset in range(count):
+                tickets.append(
+                    (
+                        ticket_slot + offset,
+                        journey_id,
+                        departure,
+                        order_id,
+                        seat // places_in_cargo + 1,
+                        seat % places_in_cargo + 1,
+                    )
+                )
+                seat += 1
+
+    use_copy = plan["use_copy"]
+    with transaction.atomic():
+        write_rows(
+            Journey,
+            ("id", "departure_time", "arrival_time", "route", "train"),
+            journeys,
+            use_copy,
+        )
+        write_rows(
+            Journey.crew_members.through,
+            ("id", "journey", "crewmember", "departure_time", "arrival_time"),
+            crew,
+            use_copy,
+        )
+        write_rows(Order, ("id", "created_at", "user"), orders, use_copy)
+        write_rows(
+            Ticket,
+            (
+                "id",
+                "journey",
+                "journey_departure_time",
+                "order",
+                "cargo_number",
+                "seat_number",
+            ),
+            tickets,
+            use_copy,
+        )
+    return len(journeys), len(orders), len(tickets)
+
+
+def init_worker(plan):
+    global _plan
+    _plan = plan
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic, production-sized data set: stations, "
+        "routes, trains, crew, users, journeys, orders and tickets"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--stations", type=int, default=2000)
+        parser.add_argument("--routes", type=int, default=10000)
+        parser.add_argument("--trains", type=int, default=500)
+        parser.add_argument("--crew", type=int, default=3000)
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--journeys", type=int, default=1000000)
+        parser.add_argument(
+            "--orders-per-journey",
+            type=int,
+            default=20,
+            help="Upper bound of orders generated per journey",
+        )
+        parser.add_argument(
+            "--tickets-per-order",
+            type=int,
+            default=4,
+            help="Upper bound of tickets per order",
+        )
+        parser.add_argument(
+            "--start",
+            type=lambda value: datetime.strptime(value, "%Y-%m-%d"),
+            default=datetime(2024, 1, 1),
+            help="First departure date (ex. 2024-01-01)",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Spread departures over this many days",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Journeys generated and written per transaction",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes writing journey chunks in parallel",
+        )
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Use multi-row INSERTs even on PostgreSQL",
+        )
+
+    def handle(self, *args, **options):
+        if options["stations"] < 2:
+            raise CommandError("At least two stations are required")
+        if options["crew"] < MAX_CREW_PER_JOURNEY:
+            raise CommandError(
+                f"At least {MAX_CREW_PER_JOURNEY} crew members are required"
+            )
+
+        if self.is_seeded(options["seed"]):
+            raise CommandError(
+                f"Seed {options['seed']} was already loaded into this "
+                f"database, use another --seed"
+            )
+
+        started = time.monotonic()
+        use_copy = (
+            connection.vendor == "postgresql" and not options["no_copy"]
+        )
+        plan = self.seed_catalog(options, use_copy)
+        plan.update(
+            seed=options["seed"],
+            start=options["start"],
+            days=options["days"],
+            orders_per_journey=options["orders_per_journey"],
+            tickets_per_order=options["tickets_per_order"],
+            use_copy=use_copy,
+            journey_base=next_id(Journey),
+            crew_base=next_id(Journey.crew_members.through),
+            order_base=next_id(Order),
+            ticket_base=next_id(Ticket),
+        )
+
+        size = options["chunk_size"]
+        chunks = [
+            (start, min(start + size, options["journeys"]))
+            for start in range(0, options["journeys"], size)
+        ]
+        totals = self.run_chunks(plan, chunks, options["workers"])
+
+        self.reset_sequences()
+        # Raw inserts bypass the signals that keep the statistics current.
+        rebuild_occupancy(
+            options["start"].date(),
+            (options["start"] + timedelta(days=options["days"])).date(),
+        )
+        journeys, orders, tickets = totals
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {journeys} journeys, {orders} orders and {tickets} "
+                f"tickets in {time.monotonic() - started:.1f}s"
+            )
+        )
+
+    @staticmethod
+    def is_seeded(seed):
+        """Station names and user emails of a seed are unique"""
+        stations = Station.objects.filter(name__startswith=f"Station {seed}-")
+        users = get_user_model().objects.filter(
+            email__startswith=f"seed-{seed}-"
+        )
+        return stations.exists() or users.exists()
+
+    def seed_catalog(self, options, use_copy):
+        rng = random.Random(f"{options['seed']}-catalog")
+
+        train_type_base = next_id(TrainType)
+        write_rows(
+            TrainType,
+            ("id", "name"),
+            [
+                (train_type_base + index, name)
+                for index, name in enumerate(TRAIN_TYPES)
+            ],
+            use_copy,
+        )
+
+        train_base = next_id(Train)
+        trains = []
+        for index in range(options["trains"]):
+            trains.append(
+                (
+                    train_base + index,
+                    f"Train {options['seed']}-{index}",
+                    rng.randint(4, 16),
+                    rng.randint(20, 60),
+                    train_type_base + rng.randrange(len(TRAIN_TYPES)),
+                )
+            )
+        write_rows(
+            Train,
+            ("id", "name", "cargo_num", "places_in_cargo", "train_type"),
+            trains,
+            use_copy,
+        )
+
+        station_base = next_id(Station)
+        stations = [
+            (
+                station_base + index,
+                f"Station {options['seed']}-{index}",
+                round(rng.uniform(44.4, 52.3), 6),
+                round(rng.uniform(22.2, 40.2), 6),
+            )
+            for index in range(options["stations"])
+        ]
+        write_rows(
+            Station,
+            ("id", "name", "latitude", "longitude"),
+            stations,
+            use_copy,
+        )
+
+        route_base = next_id(Route)
+        routes = []
+        for index in range(options["routes"]):
+            source, destination = rng.sample(stations, 2)
+            routes.append(
+                (
+                    route_base + index,
+                    source[0],
+                    destination[0],
+                    distance_km(source[2:], destination[2:]),
+                )
+            )
+        write_rows(
+            Route,
+            ("id", "source", "destination", "distance"),
+            routes,
+            use_copy,
+        )
+
+        crew_base = next_id(CrewMember)
+        crew = [
+            (
+                crew_base + index,
+                rng.choice(FIRST_NAMES),
+                rng.choice(LAST_NAMES),
+            )
+            for index in range(options["crew"])
+        ]
+        write_rows(
+            CrewMember, ("id", "first_name", "last_name"), crew, use_copy
+        )
+
+        user_model = get_user_model()
+        user_base = next_id(user_model)
+        password = make_password(None)
+        now = datetime.now()
+        users = []
+        for index in range(options["users"]):
+            email = f"seed-{options['seed']}-{index}@example.com"
+            users.append(
+                (
+                    user_base + index,
+                    password,
+                    False,
+                    email,
+                    "",
+                    "",
+                    email,
+                    False,
+                    True,
+                    now,
+                )
+            )
+        write_rows(
+            user_model,
+            (
+                "id",
+                "password",
+                "is_superuser",
+                "username",
+                "first_name",
+                "last_name",
+                "email",
+                "is_staff",
+                "is_active",
+                "date_joined",
+            ),
+            users,
+            use_copy,
+        )
+
+        return {
+            "routes": [(route[0], route[3]) for route in routes],
+            "trains": [(train[0], train[2], train[3]) for train in trains],
+            "crew": [member[0] for member in crew],
+            "users": [user[0] for user in users],
+        }
+
+    def run_chunks(self, plan, chunks, workers):
+        totals = [0, 0, 0]
+
+        def report(result):
+            for position, value in enumerate(result):
+                totals[position] += value
+            self.stdout.write(
+                "{} journeys, {} orders, {} tickets written".format(*totals)
+            )
+
+        if workers <= 1:
+            init_worker(plan)
+            for chunk in chunks:
+                report(seed_chunk(chunk))
+            return totals
+
+        # Forked children must not share the parent's sockets.
+        connections.close_all()
+        close_pools()
+        context = multiprocessing.get_context("fork")
+        with context.Pool(workers, init_worker, (plan,)) as pool:
+            for result in pool.imap_unordered(seed_chunk, chunks):
+                report(result)
+        return totals
+
+    @staticmethod
+    def reset_sequences():
+        statements = connection.ops.sequence_reset_sql(
+            no_style(),
+            [
+                TrainType,
+                Train,
+                Station,
+                Route,
+                CrewMember,
+                get_user_model(),
+                Journey,
+                Journey.crew_members.through,
+                Order,
+                Ticket,
+            ],
+        )
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from station import partitions
+
+
+class Command(BaseCommand):
+    help = "List, create or detach the monthly partitions of the ticket table"
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest="action", required=True)
+        subparsers.add_parser("list", help="List the existing partitions")
+
+        create = subparsers.add_parser(
+            "create", help="Create partitions for upcoming months"
+        )
+        create.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Create partitions up to this many months from now",
+        )
+
+        detach = subparsers.add_parser(
+            "detach", help="Detach partitions of departed months"
+        )
+        detach.add_argument(
+            "--older-than-months",
+            type=int,
+            required=True,
+            help="Detach partitions of months before this many months ago",
+        )
+        detach.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop detached partitions instead of keeping them as tables",
+        )
+
+    def handle(self, *args, **options):
+        if not partitions.is_supported():
+            raise CommandError("Ticket partitioning requires PostgreSQL")
+
+        this_month = partitions.month_start(datetime.now())
+
+        if options["action"] == "list":
+            with connection.cursor() as cursor:
+                for name, bounds in partitions.list_partitions(cursor):
+                    self.stdout.write(f"{name}  {bounds}")
+            return
+
+        if options["action"] == "create":
+            names = partitions.create_partitions(
+                this_month,
+                partitions.add_months(this_month, options["months_ahead"]),
+            )
+            verb = "Created"
+        else:
+            names = partitions.detach_partitions(
+                partitions.add_months(
+                    this_month, -options["older_than_months"]
+                ),
+                drop=options["drop"],
+            )
+            verb = "Dropped" if options["drop"] else "Detached"
+
+        for name in names:
+            self.stdout.write(f"{verb} {name}")
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {len(names)} partition(s)")
+        )
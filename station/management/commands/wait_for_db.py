@@ -1,17 +1,54 @@
 import time
-from django.core.management.base import BaseCommand
-from django.db import connections
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
 from django.db.utils import OperationalError
 
 
 class Command(BaseCommand):
-    def handle(self, *args, **kwargs):
+    help = "Wait until the database accepts queries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to probe",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Give up after this many seconds",
+        )
+        parser.add_argument(
+            "--max-delay",
+            type=float,
+            default=5,
+            help="Upper bound of the exponential backoff between probes",
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        deadline = time.monotonic() + options["timeout"]
+        delay = 0.1
+
         self.stdout.write("Waiting for database...")
-        database_connection = None
-        while not database_connection:
+        while True:
             try:
-                database_connection = connections["default"]
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                break
             except OperationalError:
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+                connection.close()
+                if time.monotonic() + delay > deadline:
+                    raise CommandError(
+                        f"Database unavailable after {options['timeout']} "
+                        f"seconds"
+                    )
+                self.stdout.write(
+                    f"Database unavailable, waiting {delay:.1f} seconds..."
+                )
+                time.sleep(delay)
+                delay = min(delay * 2, options["max_delay"])
         self.stdout.write(self.style.SUCCESS("Database available!"))
+        connection.close()
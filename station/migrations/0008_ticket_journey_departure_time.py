@@ -0,0 +1,40 @@
+# Generated by Django 4.0.4 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+
+def copy_departure_times(apps, schema_editor):
+    Journey = apps.get_model("station", "Journey")
+    Ticket = apps.get_model("station", "Ticket")
+    Ticket.objects.update(
+        journey_departure_time=models.Subquery(
+            Journey.objects.filter(pk=models.OuterRef("journey")).values(
+                "departure_time"
+            )[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0007_crewmember_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='journey_departure_time',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(copy_departure_times, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='ticket',
+            name='journey_departure_time',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='journey',
+            index=models.Index(fields=['departure_time'], name='station_jou_departu_f114b4_idx'),
+        ),
+    ]
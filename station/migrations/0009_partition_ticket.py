@@ -0,0 +1,172 @@
+from datetime import datetime
+
+from django.db import migrations, models
+
+from station.partitions import add_months, create_partition, month_start
+
+MONTHS_AHEAD = 3
+SEAT_FIELDS = ("journey", "cargo_number", "seat_number")
+SEAT_CONSTRAINT = "station_ticket_journey_seat_uniq"
+
+# The seat constraint includes journey_departure_time: tickets must always
+# carry their journey's departure time, whatever code writes either table.
+SYNC_TRIGGERS = (
+    """
+    CREATE FUNCTION station_ticket_check_departure() RETURNS trigger AS $$
+    DECLARE
+        departure station_journey.departure_time%TYPE;
+    BEGIN
+        -- Blocks rescheduling the journey until this ticket commits.
+        SELECT departure_time INTO departure FROM station_journey
+        WHERE id = NEW.journey_id FOR SHARE;
+        IF FOUND AND NEW.journey_departure_time IS DISTINCT FROM departure
+        THEN
+            RAISE EXCEPTION 'Ticket departure % does not match journey %',
+                NEW.journey_departure_time, NEW.journey_id
+                USING ERRCODE = 'check_violation';
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER station_ticket_check_departure
+    BEFORE INSERT OR UPDATE OF journey_id, journey_departure_time
+    ON station_ticket
+    FOR EACH ROW EXECUTE FUNCTION station_ticket_check_departure()
+    """,
+    """
+    CREATE FUNCTION station_journey_move_tickets() RETURNS trigger AS $$
+    BEGIN
+        UPDATE station_ticket
+        SET journey_departure_time = NEW.departure_time
+        WHERE journey_id = NEW.id
+        AND journey_departure_time = OLD.departure_time;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER station_journey_move_tickets
+    AFTER UPDATE OF departure_time ON station_journey
+    FOR EACH ROW
+    WHEN (OLD.departure_time IS DISTINCT FROM NEW.departure_time)
+    EXECUTE FUNCTION station_journey_move_tickets()
+    """,
+)
+
+
+def partition_ticket_table(apps, schema_editor):
+    """
+    Rebuild station_ticket as a table range-partitioned by the month of
+    journey_departure_time. PostgreSQL requires the partition key in every
+    unique constraint, so the primary key becomes (id, journey_departure_time)
+    and the seat constraint gains journey_departure_time; a journey has a
+    single departure time, so the seat rule itself is unchanged. Triggers
+    keep journey_departure_time in step with the journey's departure.
+
+    Other databases only swap the seat constraint to match the model state.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        Ticket = apps.get_model("station", "Ticket")
+        schema_editor.alter_unique_together(Ticket, [SEAT_FIELDS], [])
+        schema_editor.execute(
+            f"CREATE UNIQUE INDEX {SEAT_CONSTRAINT} ON station_ticket "
+            f"(journey_id, cargo_number, seat_number, journey_departure_time)"
+        )
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("LOCK TABLE station_ticket IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(
+            "SELECT pg_get_serial_sequence('station_ticket', 'id'), "
+            "min(journey_departure_time), max(journey_departure_time) "
+            "FROM station_ticket"
+        )
+        sequence, first, last = cursor.fetchone()
+
+        cursor.execute(
+            "ALTER TABLE station_ticket RENAME TO station_ticket_unpartitioned"
+        )
+        cursor.execute(
+            "CREATE TABLE station_ticket "
+            "(LIKE station_ticket_unpartitioned INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (journey_departure_time)"
+        )
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY station_ticket.id")
+        cursor.execute(
+            "CREATE TABLE station_ticket_default "
+            "PARTITION OF station_ticket DEFAULT"
+        )
+
+        month = month_start(first or datetime.now())
+        last_month = add_months(month_start(datetime.now()), MONTHS_AHEAD)
+        if last is not None:
+            last_month = max(last_month, month_start(last))
+        while month <= last_month:
+            create_partition(cursor, month)
+            month = add_months(month, 1)
+
+        cursor.execute(
+            "INSERT INTO station_ticket "
+            "SELECT * FROM station_ticket_unpartitioned"
+        )
+        cursor.execute("DROP TABLE station_ticket_unpartitioned")
+
+        for statement in (
+            "ALTER TABLE station_ticket ADD CONSTRAINT station_ticket_pkey "
+            "PRIMARY KEY (id, journey_departure_time)",
+            f"ALTER TABLE station_ticket ADD CONSTRAINT {SEAT_CONSTRAINT} "
+            f"UNIQUE (journey_id, cargo_number, seat_number, "
+            f"journey_departure_time)",
+            "ALTER TABLE station_ticket "
+            "ADD CONSTRAINT station_ticket_journey_id_fk_station_journey_id "
+            "FOREIGN KEY (journey_id) REFERENCES station_journey (id) "
+            "DEFERRABLE INITIALLY DEFERRED",
+            "ALTER TABLE station_ticket "
+            "ADD CONSTRAINT station_ticket_order_id_fk_station_order_id "
+            "FOREIGN KEY (order_id) REFERENCES station_order (id) "
+            "DEFERRABLE INITIALLY DEFERRED",
+            "CREATE INDEX station_ticket_journey_id_idx "
+            "ON station_ticket (journey_id)",
+            "CREATE INDEX station_ticket_order_id_idx "
+            "ON station_ticket (order_id)",
+            *SYNC_TRIGGERS,
+        ):
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0008_ticket_journey_departure_time'),
+    ]
+
+    operations = [
+        # Irreversible: the partitioned table cannot be converted back
+        # in place. The state has no composite primary key, id stays
+        # unique through its sequence.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(partition_ticket_table),
+            ],
+            state_operations=[
+                migrations.AlterUniqueTogether(
+                    name='ticket',
+                    unique_together=set(),
+                ),
+                migrations.AddConstraint(
+                    model_name='ticket',
+                    constraint=models.UniqueConstraint(
+                        fields=(
+                            'journey',
+                            'cargo_number',
+                            'seat_number',
+                            'journey_departure_time',
+                        ),
+                        name=SEAT_CONSTRAINT,
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.0.4 on 2026-10-19 09:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_occupancy(apps, schema_editor):
+    """Start from the statistics of the existing journeys and tickets"""
+    from station.occupancy import aggregate
+
+    DailyOccupancy = apps.get_model("station", "DailyOccupancy")
+    DailyOccupancy.objects.bulk_create(
+        aggregate(
+            apps.get_model("station", "Journey").objects.all(),
+            apps.get_model("station", "Ticket").objects.all(),
+            model=DailyOccupancy,
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0010_archived_journey_order_ticket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('journeys', models.IntegerField(default=0)),
+                ('seats', models.IntegerField(default=0)),
+                ('tickets_sold', models.IntegerField(default=0)),
+                ('route', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='station.route')),
+                ('train_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='station.traintype')),
+            ],
+            options={
+                'ordering': ['day', 'route', 'train_type'],
+                'unique_together': {('day', 'route', 'train_type')},
+            },
+        ),
+        migrations.RunPython(backfill_occupancy, migrations.RunPython.noop),
+    ]
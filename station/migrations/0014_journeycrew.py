@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+INTERVAL_INDEX = "station_journey_crew_interval_idx"
+
+
+def copy_journey_times(apps, schema_editor):
+    Journey = apps.get_model("station", "Journey")
+    JourneyCrew = apps.get_model("station", "JourneyCrew")
+    journey = Journey.objects.filter(pk=models.OuterRef("journey_id"))
+    JourneyCrew.objects.update(
+        departure_time=models.Subquery(journey.values("departure_time")[:1]),
+        arrival_time=models.Subquery(journey.values("arrival_time")[:1]),
+    )
+
+
+def create_interval_index(apps, schema_editor):
+    """GiST index over (crew member, time range), PostgreSQL only"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    function = "tstzrange" if settings.USE_TZ else "tsrange"
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    schema_editor.execute(
+        f"CREATE INDEX {INTERVAL_INDEX} ON station_journey_crew_members "
+        f"USING gist (crewmember_id, {function}(departure_time, arrival_time))"
+    )
+
+
+def drop_interval_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {INTERVAL_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0013_idempotencykey'),
+    ]
+
+    operations = [
+        # The auto-created through table becomes an explicit model, same
+        # table and columns.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='JourneyCrew',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('journey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='crew_assignments', to='station.journey')),
+                        ('crewmember', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='station.crewmember')),
+                    ],
+                    options={
+                        'db_table': 'station_journey_crew_members',
+                        'unique_together': {('journey', 'crewmember')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='journey',
+                    name='crew_members',
+                    field=models.ManyToManyField(related_name='journeys', through='station.JourneyCrew', to='station.crewmember'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='journeycrew',
+            name='departure_time',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='journeycrew',
+            name='arrival_time',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(copy_journey_times, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='journeycrew',
+            index=models.Index(fields=['crewmember', 'departure_time'], name='station_jou_crewmem_e6b9ec_idx'),
+        ),
+        migrations.RunPython(create_interval_index, drop_interval_index),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.0.4 on 2026-10-19 09:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+INTERVAL_INDEX = "station_journey_train_interval_idx"
+
+
+def create_interval_index(apps, schema_editor):
+    """GiST index over (train, time range), PostgreSQL only"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    function = "tstzrange" if settings.USE_TZ else "tsrange"
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    schema_editor.execute(
+        f"CREATE INDEX {INTERVAL_INDEX} ON station_journey "
+        f"USING gist (train_id, {function}(departure_time, arrival_time))"
+    )
+
+
+def drop_interval_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {INTERVAL_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0014_journeycrew'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journey',
+            index=models.Index(fields=['train', 'departure_time'], name='station_jou_train_i_13d639_idx'),
+        ),
+        migrations.RunPython(create_interval_index, drop_interval_index),
+    ]
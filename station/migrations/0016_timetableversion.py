@@ -0,0 +1,26 @@
+# Generated by Django 4.0.4 on 2026-10-19 09:18
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    TimetableVersion = apps.get_model("station", "TimetableVersion")
+    TimetableVersion.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0015_journey_train_interval_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimetableVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
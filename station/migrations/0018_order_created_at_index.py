@@ -0,0 +1,17 @@
+# Generated by Django 4.0.4 on 2026-10-19 09:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0017_journey_board_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at'], name='station_ord_created_51ec24_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.0.4 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+def start_heartbeats(apps, schema_editor):
+    Job = apps.get_model("station", "Job")
+    Job.objects.filter(status="running").update(
+        heartbeat_at=models.F("started_at")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0020_job'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='job',
+            name='station_job_running_idx',
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(start_heartbeats, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'running')), fields=['heartbeat_at'], name='station_job_running_idx'),
+        ),
+    ]
@@ -3,7 +3,9 @@ import uuid
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
 
 
@@ -82,15 +84,136 @@ class CrewMember(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
+class Overlaps(models.Func):
+    """
+    ``[start, end)`` intersects ``[lower, upper)``. PostgreSQL compares
+    ranges, which the GiST interval indexes can serve.
+    """
+
+    arity = 4
+    output_field = models.BooleanField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        compiled = [
+            compiler.compile(expression)
+            for expression in self.get_source_expressions()
+        ]
+        (start, end, lower, upper), params = zip(*compiled)
+        if connection.vendor == "postgresql":
+            function = "tstzrange" if settings.USE_TZ else "tsrange"
+            return (
+                f"{function}({start}, {end}) && {function}({lower}, {upper})",
+                [*params[0], *params[1], *params[2], *params[3]],
+            )
+        return (
+            f"({start} < {upper} AND {end} > {lower})",
+            [*params[0], *params[3], *params[1], *params[2]],
+        )
+
+
+def overlaps(start, end):
+    """Rows whose departure_time/arrival_time overlap ``[start, end)``"""
+    return Overlaps(
+        F("departure_time"),
+        F("arrival_time"),
+        models.Value(start, output_field=models.DateTimeField()),
+        models.Value(end, output_field=models.DateTimeField()),
+    )
+
+
+class JourneyQuerySet(models.QuerySet):
+    def overlapping(self, start, end):
+        return self.filter(overlaps(start, end))
+
+    def with_tickets_available(self):
+        """
+        Annotate ``tickets_available``. Tickets are counted through a
+        subquery on the journey's departure time, so PostgreSQL only scans
+        the ticket partition of that month.
+        """
+        taken = (
+            Ticket.objects.filter(
+                journey=OuterRef("pk"),
+                journey_departure_time=OuterRef("departure_time"),
+            )
+            .order_by()
+            .values("journey")
+            .annotate(taken=Count("id"))
+            .values("taken")
+        )
+        return self.annotate(
+            tickets_available=(
+                F("train__places_in_cargo") * F("train__cargo_num")
+                - Coalesce(Subquery(taken), 0)
+            )
+        )
+
+
 class Journey(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     train = models.ForeignKey(Train, on_delete=models.CASCADE)
     route = models.ForeignKey(Route, on_delete=models.CASCADE)
-    crew_members = models.ManyToManyField(CrewMember, related_name="journeys")
+    crew_members = models.ManyToManyField(
+        CrewMember, through="JourneyCrew", related_name="journeys"
+    )
+
+    objects = JourneyQuerySet.as_manager()
 
     class Meta:
         ordering = ["-departure_time"]
+        indexes = [
+            models.Index(fields=["departure_time"]),
+            models.Index(fields=["train", "departure_time"]),
+            # Station boards: the next journeys of a station's routes.
+            models.Index(fields=["route", "departure_time"]),
+            models.Index(fields=["route", "arrival_time"]),
+        ]
+
+    TRACKED_FIELDS = ("departure_time", "arrival_time", "route_id", "train_id")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_values = {
+            field: instance.__dict__.get(field)
+            for field in cls.TRACKED_FIELDS
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Read by post_save receivers, see station.signals.
+        self.previous_values = getattr(self, "loaded_values", {})
+        departure_time = self.previous_values.get("departure_time")
+        with transaction.atomic():
+            if departure_time not in (None, self.departure_time) and (
+                connections[self._state.db].vendor != "postgresql"
+            ):
+                # A trigger moves them on PostgreSQL (see migration 0009).
+                self.tickets.update(
+                    journey_departure_time=self.departure_time
+                )
+            super().save(*args, **kwargs)
+            if departure_time is not None and (
+                self.previous_values["departure_time"],
+                self.previous_values["arrival_time"],
+            ) != (self.departure_time, self.arrival_time):
+                self.crew_assignments.update(
+                    departure_time=self.departure_time,
+                    arrival_time=self.arrival_time,
+                )
+        self.loaded_values = {
+            field: getattr(self, field) for field in self.TRACKED_FIELDS
+        }
+
+    @property
+    def taken_tickets(self):
+        """Tickets of this journey, looked up in its ticket partition only"""
+        if "tickets" in getattr(self, "_prefetched_objects_cache", {}):
+            return self.tickets.all()
+        return self.tickets.filter(
+            journey_departure_time=self.departure_time
+        )
 
     def __str__(self):
         return (
@@ -99,6 +222,52 @@ class Journey(models.Model):
         )
 
 
+class JourneyCrewQuerySet(models.QuerySet):
+    def overlapping(self, start, end):
+        """Assignments whose journey overlaps ``[start, end)``"""
+        return self.filter(overlaps(start, end))
+
+    def fill_times(self):
+        """Copy the journey times into assignments created by ``add()``"""
+        journey = Journey.objects.filter(pk=OuterRef("journey_id"))
+        return self.update(
+            departure_time=Subquery(journey.values("departure_time")[:1]),
+            arrival_time=Subquery(journey.values("arrival_time")[:1]),
+        )
+
+
+class JourneyCrew(models.Model):
+    """
+    Crew member assigned to a journey, with a copy of the journey's times:
+    the interval that conflict checks and rosters search per crew member.
+    """
+
+    journey = models.ForeignKey(
+        Journey, on_delete=models.CASCADE, related_name="crew_assignments"
+    )
+    crewmember = models.ForeignKey(
+        CrewMember, on_delete=models.CASCADE, related_name="assignments"
+    )
+    departure_time = models.DateTimeField(null=True, editable=False)
+    arrival_time = models.DateTimeField(null=True, editable=False)
+
+    objects = JourneyCrewQuerySet.as_manager()
+
+    class Meta:
+        db_table = "station_journey_crew_members"
+        unique_together = ("journey", "crewmember")
+        indexes = [models.Index(fields=["crewmember", "departure_time"])]
+
+    def save(self, *args, **kwargs):
+        if self.departure_time is None:
+            self.departure_time = self.journey.departure_time
+            self.arrival_time = self.journey.arrival_time
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.crewmember_id} on {self.journey_id}"
+
+
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(
@@ -110,6 +279,7 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["created_at"])]
 
 
 class Ticket(models.Model):
@@ -121,6 +291,9 @@ class Ticket(models.Model):
     )
     cargo_number = models.IntegerField()
     seat_number = models.IntegerField()
+    # Copy of journey.departure_time: the key the PostgreSQL table is
+    # range-partitioned on (see station.partitions).
+    journey_departure_time = models.DateTimeField(editable=False)
 
     @staticmethod
     def validate_ticket(cargo_number, seat_number, train, error_to_raise):
@@ -154,6 +327,7 @@ class Ticket(models.Model):
         using=None,
         update_fields=None,
     ):
+        self.journey_departure_time = self.journey.departure_time
         self.full_clean()
         return super(Ticket, self).save(
             force_insert, force_update, using, update_fields
@@ -166,5 +340,316 @@ class Ticket(models.Model):
         )
 
     class Meta:
-        unique_together = ("journey", "cargo_number", "seat_number")
+        # The partition key is part of every unique constraint, triggers
+        # keep it equal to the journey's departure (see migration 0009).
+        constraints = [
+            models.UniqueConstraint(
+                fields=(
+                    "journey",
+                    "cargo_number",
+                    "seat_number",
+                    "journey_departure_time",
+                ),
+                name="station_ticket_journey_seat_uniq",
+            ),
+        ]
         ordering = ["cargo_number", "seat_number"]
+
+
+class ArchivedJourney(models.Model):
+    """Departed journey moved out of the hot tables, see station.archive"""
+
+    id = models.BigIntegerField(primary_key=True)
+    departure_time = models.DateTimeField()
+    arrival_time = models.DateTimeField()
+    route = models.CharField(max_length=255)
+    train = models.CharField(max_length=100)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-departure_time"]
+
+    def __str__(self):
+        return f"{self.route}: {self.departure_time}"
+
+
+class ArchivedOrder(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    created_at = models.DateTimeField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_orders",
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["user", "-created_at"])]
+
+    def __str__(self):
+        return str(self.created_at)
+
+
+class ArchivedTicket(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    journey = models.ForeignKey(
+        ArchivedJourney, on_delete=models.CASCADE, related_name="tickets"
+    )
+    # Either an ArchivedOrder or an Order that still has active tickets.
+    order_id = models.BigIntegerField(db_index=True)
+    cargo_number = models.IntegerField()
+    seat_number = models.IntegerField()
+
+    class Meta:
+        ordering = ["cargo_number", "seat_number"]
+
+    def __str__(self):
+        return (
+            f"{self.journey} "
+            f"(row: {self.cargo_number}, seat: {self.seat_number})"
+        )
+
+
+class DailyOccupancy(models.Model):
+    """
+    Pre-aggregated seats and sold tickets per departure day, route and
+    train type, kept up to date by station.occupancy.
+    """
+
+    day = models.DateField()
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="occupancy"
+    )
+    train_type = models.ForeignKey(
+        TrainType, on_delete=models.CASCADE, related_name="occupancy"
+    )
+    journeys = models.IntegerField(default=0)
+    seats = models.IntegerField(default=0)
+    tickets_sold = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["day", "route", "train_type"]
+        unique_together = ("day", "route", "train_type")
+
+    @property
+    def load_factor(self):
+        return self.tickets_sold / self.seats if self.seats else 0.0
+
+    def __str__(self):
+        return f"{self.day} {self.route_id}/{self.train_type_id}"
+
+
+class WaitlistQuerySet(models.QuerySet):
+    def waiting(self):
+        return self.filter(promoted_at__isnull=True)
+
+    def with_position(self):
+        """Annotate 1-based places in the FIFO queue of each journey"""
+        ahead = (
+            WaitlistEntry.objects.waiting()
+            .filter(journey=OuterRef("journey"), id__lte=OuterRef("id"))
+            .order_by()
+            .values("journey")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        return self.annotate(
+            position=models.Case(
+                models.When(promoted_at__isnull=True, then=Subquery(ahead)),
+                default=None,
+            )
+        )
+
+
+class WaitlistEntry(models.Model):
+    """A user waiting for seats on a sold-out journey, served FIFO by id"""
+
+    journey = models.ForeignKey(
+        Journey, on_delete=models.CASCADE, related_name="waitlist"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="waitlist",
+    )
+    seats = models.PositiveSmallIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+    promoted_at = models.DateTimeField(null=True, blank=True)
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+
+    objects = WaitlistQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            # Only waiting entries are indexed: promotion reads the head of
+            # one journey's queue, whatever its length.
+            models.Index(
+                fields=["journey", "id"],
+                condition=models.Q(promoted_at__isnull=True),
+                name="station_waitlist_queue_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["journey", "user"],
+                condition=models.Q(promoted_at__isnull=True),
+                name="station_waitlist_one_entry_per_user",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} waiting for {self.seats} on {self.journey_id}"
+
+
+class IdempotencyKey(models.Model):
+    """Stored outcome of a request sent with an ``Idempotency-Key`` header"""
+
+    key = models.CharField(max_length=255)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ("user", "key")
+
+    def __str__(self):
+        return f"{self.user_id}: {self.key}"
+
+
+class TimetableVersion(models.Model):
+    """Single row counting timetable changes, see station.timetable"""
+
+    version = models.BigIntegerField(default=0)
+
+    @classmethod
+    def current(cls):
+        return cls.objects.values_list("version", flat=True).first() or 0
+
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(pk=1).update(version=F("version") + 1):
+            cls.objects.get_or_create(pk=1, defaults={"version": 1})
+
+    def __str__(self):
+        return str(self.version)
+
+
+class BookingRequestQuerySet(models.QuerySet):
+    def pending(self):
+        return self.filter(status=BookingRequest.PENDING)
+
+
+class BookingRequest(models.Model):
+    """Order accepted for the booking workers, see station.booking"""
+
+    PENDING = "pending"
+    BOOKED = "booked"
+    FAILED = "failed"
+    STATUSES = [
+        (PENDING, "Pending"),
+        (BOOKED, "Booked"),
+        (FAILED, "Failed"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    # Journey of the first ticket: workers book one journey's requests
+    # together.
+    journey = models.ForeignKey(
+        Journey, on_delete=models.CASCADE, related_name="+"
+    )
+    tickets = models.JSONField()
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=PENDING
+    )
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    errors = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = BookingRequestQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            # Only pending requests are indexed: workers read the oldest
+            # requests of one journey, whatever the backlog.
+            models.Index(
+                fields=["journey", "id"],
+                condition=models.Q(status="pending"),
+                name="station_booking_queue_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} booking on {self.journey_id}: {self.status}"
+
+
+class Job(models.Model):
+    """Background job run by ``manage.py run_workers``, see station.jobs"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=255)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the worker while the job runs.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Seconds the last attempt ran.
+    duration = models.FloatField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [
+            # Workers read the queue head and the running jobs only.
+            models.Index(
+                fields=["run_at", "id"],
+                condition=models.Q(status="queued"),
+                name="station_job_queue_idx",
+            ),
+            models.Index(
+                fields=["heartbeat_at"],
+                condition=models.Q(status="running"),
+                name="station_job_running_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id}: {self.status}"
@@ -0,0 +1,79 @@
+"""
+Batch retrieval with ``?ids=`` on list endpoints.
+
+``GET journeys/?ids=3,1,2`` returns the detail shape of each journey in
+the requested order, with ``{"id": 2, "detail": "Not found."}`` in place
+of ids that do not exist. A batch runs the same queries whatever its size:
+one for the objects plus one per prefetched relation.
+"""
+
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from station.fieldsets import optimize_queryset
+
+MAX_IDS = 100
+
+IDS_PARAMETER = OpenApiParameter(
+    "ids",
+    type=OpenApiTypes.STR,
+    description=f"Comma separated ids, at most {MAX_IDS}, returned in this "
+                f"order with detail fields (ex. ?ids=3,1,2)",
+)
+
+
+def parse_ids(value):
+    try:
+        ids = [int(pk) for pk in value.split(",") if pk.strip()]
+    except ValueError:
+        raise ValidationError({"ids": "Expected comma separated ids."})
+    if not ids:
+        raise ValidationError({"ids": "Expected at least one id."})
+    if len(ids) > MAX_IDS:
+        raise ValidationError({"ids": f"Expected at most {MAX_IDS} ids."})
+    return ids
+
+
+class MultiGetMixin:
+    """
+    Serve ``?ids=`` on ``list`` with ``multi_get_serializer_class`` over
+    ``get_multi_get_queryset()``, joined and prefetched for the requested
+    fields. List filters do not apply to a batch.
+    """
+
+    multi_get_serializer_class = None
+
+    def is_multi_get(self):
+        return self.action == "list" and "ids" in self.request.query_params
+
+    def get_multi_get_queryset(self):
+        return self.queryset.all()
+
+    def list(self, request, *args, **kwargs):
+        if self.is_multi_get():
+            return self.multi_get(request)
+        return super().list(request, *args, **kwargs)
+
+    def multi_get(self, request):
+        ids = parse_ids(request.query_params["ids"])
+        queryset = optimize_queryset(
+            self.get_multi_get_queryset(),
+            self.multi_get_serializer_class,
+            request,
+        )
+        objects = queryset.in_bulk(set(ids))
+        found = [pk for pk in dict.fromkeys(ids) if pk in objects]
+        serializer = self.multi_get_serializer_class(
+            [objects[pk] for pk in found],
+            many=True,
+            context=self.get_serializer_context(),
+        )
+        data = dict(zip(found, serializer.data))
+        return Response(
+            [
+                data[pk] if pk in data else {"id": pk, "detail": "Not found."}
+                for pk in ids
+            ]
+        )
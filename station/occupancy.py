@@ -0,0 +1,225 @@
+"""
+Incrementally maintained occupancy statistics.
+
+``DailyOccupancy`` holds journeys, seats and sold tickets per departure day,
+route and train type. Ticket inserts and deletes adjust the matching row by
+one once their transaction commits (see station.signals); journey and
+train changes recompute only the rows they touch. ``rebuild_occupancy``
+recomputes a range of days from scratch, e.g. after raw bulk loads that
+bypass model signals.
+
+Rebuilds lock the rows of their routes first, so concurrent rebuilds of a
+key (e.g. the first two sales of a day) run one after the other and each
+counts every committed ticket.
+"""
+
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from station.models import DailyOccupancy, Journey, Route, Ticket, Train
+
+_suspended = contextvars.ContextVar("occupancy_suspended", default=False)
+
+
+@contextmanager
+def suspended():
+    """Leave the statistics untouched, e.g. while archiving journeys"""
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def is_suspended():
+    return _suspended.get()
+
+
+def departure_day(value):
+    if timezone.is_aware(value):
+        return timezone.localdate(value)
+    return value.date()
+
+
+def day_bounds(day):
+    start = datetime.combine(day, time.min)
+    if settings.USE_TZ:
+        start = timezone.make_aware(start)
+    return start, start + timedelta(days=1)
+
+
+def occupancy_key(departure_time, route_id, train_type_id):
+    return departure_day(departure_time), route_id, train_type_id
+
+
+def journey_key(journey):
+    """Key of a saved journey, train type read from a cached train if any"""
+    train = journey._state.fields_cache.get("train")
+    if train is None or train.pk != journey.train_id:
+        train_type_id = (
+            Train.objects.filter(pk=journey.train_id)
+            .values_list("train_type_id", flat=True)
+            .first()
+        )
+    else:
+        train_type_id = train.train_type_id
+    return occupancy_key(
+        journey.departure_time, journey.route_id, train_type_id
+    )
+
+
+def _shift_tickets(key, count):
+    day, route_id, train_type_id = key
+    updated = DailyOccupancy.objects.filter(
+        day=day, route_id=route_id, train_type_id=train_type_id
+    ).update(tickets_sold=F("tickets_sold") + count)
+    if not updated:
+        rebuild_keys([key])
+
+
+def add_tickets(key, count):
+    """
+    Shift ``tickets_sold`` of one key, rebuilding it if it has no row.
+    The update runs after commit: taking the row lock inside the booking
+    transaction would serialize every booking of that day and route.
+    """
+    if is_suspended():
+        return
+    transaction.on_commit(lambda: _shift_tickets(key, count))
+
+
+def _key_filter(keys, departure_field, route_field, train_type_field):
+    conditions = []
+    for day, route_id, train_type_id in keys:
+        start, end = day_bounds(day)
+        conditions.append(
+            Q(
+                **{
+                    f"{departure_field}__gte": start,
+                    f"{departure_field}__lt": end,
+                    route_field: route_id,
+                    train_type_field: train_type_id,
+                }
+            )
+        )
+    return reduce(or_, conditions)
+
+
+def lock_routes(route_ids=None):
+    """
+    Serialize rebuilds of the given routes (all of them by default) until
+    the transaction ends. Journeys can still be added: NO KEY UPDATE locks
+    do not block foreign key checks.
+    """
+    routes = Route.objects.select_for_update(no_key=True).order_by("pk")
+    if route_ids is not None:
+        routes = routes.filter(pk__in=route_ids)
+    list(routes.values_list("pk", flat=True))
+
+
+def aggregate(journeys, tickets, model=DailyOccupancy):
+    """Group journeys and tickets into unsaved ``model`` rows"""
+    rows = {}
+    for row in (
+        journeys.annotate(day=TruncDate("departure_time"))
+        .values("day", "route_id", "train__train_type_id")
+        .annotate(
+            journey_count=Count("id"),
+            seat_count=Sum(
+                F("train__cargo_num") * F("train__places_in_cargo")
+            ),
+        )
+        .order_by()
+    ):
+        key = (row["day"], row["route_id"], row["train__train_type_id"])
+        rows[key] = model(
+            day=key[0],
+            route_id=key[1],
+            train_type_id=key[2],
+            journeys=row["journey_count"],
+            seats=row["seat_count"] or 0,
+        )
+
+    for row in (
+        tickets.annotate(day=TruncDate("journey_departure_time"))
+        .values("day", "journey__route_id", "journey__train__train_type_id")
+        .annotate(ticket_count=Count("id"))
+        .order_by()
+    ):
+        key = (
+            row["day"],
+            row["journey__route_id"],
+            row["journey__train__train_type_id"],
+        )
+        if key in rows:
+            rows[key].tickets_sold = row["ticket_count"]
+    return list(rows.values())
+
+
+def rebuild_keys(keys):
+    """Recompute the rows of the given (day, route, train type) keys"""
+    keys = {key for key in keys if key[2] is not None}
+    if not keys or is_suspended():
+        return
+    journeys = Journey.objects.filter(
+        _key_filter(
+            keys, "departure_time", "route_id", "train__train_type_id"
+        )
+    )
+    tickets = Ticket.objects.filter(
+        _key_filter(
+            keys,
+            "journey_departure_time",
+            "journey__route_id",
+            "journey__train__train_type_id",
+        )
+    )
+    with transaction.atomic():
+        lock_routes({route_id for _, route_id, _ in keys})
+        DailyOccupancy.objects.filter(
+            reduce(
+                or_,
+                (
+                    Q(day=day, route_id=route_id, train_type_id=train_type_id)
+                    for day, route_id, train_type_id in keys
+                ),
+            )
+        ).delete()
+        DailyOccupancy.objects.bulk_create(aggregate(journeys, tickets))
+
+
+def rebuild_occupancy(start=None, end=None):
+    """
+    Recompute every row with a day in [start, end]. Days of archived
+    journeys have no source rows left, so keep ``start`` after them.
+    """
+    journeys = Journey.objects.all()
+    tickets = Ticket.objects.all()
+    rows = DailyOccupancy.objects.all()
+    if start is not None:
+        journeys = journeys.filter(departure_time__gte=day_bounds(start)[0])
+        tickets = tickets.filter(
+            journey_departure_time__gte=day_bounds(start)[0]
+        )
+        rows = rows.filter(day__gte=start)
+    if end is not None:
+        journeys = journeys.filter(departure_time__lt=day_bounds(end)[1])
+        tickets = tickets.filter(journey_departure_time__lt=day_bounds(end)[1])
+        rows = rows.filter(day__lte=end)
+
+    with transaction.atomic():
+        lock_routes()
+        rows.delete()
+        created = DailyOccupancy.objects.bulk_create(
+            aggregate(journeys, tickets), batch_size=1000
+        )
+    return len(created)
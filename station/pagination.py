@@ -0,0 +1,132 @@
+"""
+Paging without an exact ``COUNT(*)`` of large tables.
+
+Counting a filtered ticket or order table reads every matching row.
+``EstimatedCountPaginator`` counts exactly up to
+``ESTIMATED_COUNT["THRESHOLD"]`` rows (``SELECT COUNT(*) FROM (...
+LIMIT threshold + 1)``) and past it takes PostgreSQL's estimate: the
+table's ``reltuples`` for an unfiltered list, the planner's row estimate
+(``EXPLAIN``) otherwise. The admin uses it as is, API lists through
+``EstimatedCountPagination``, which answers ``count_is_estimated``.
+
+An estimate may be off by a few percent: the last pages of a list may be
+empty or missing from the page links, narrowing the filters brings the
+count back under the threshold.
+"""
+
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+DEFAULT_SETTINGS = {
+    "THRESHOLD": 10000,
+}
+
+
+def count_settings():
+    options = getattr(settings, "ESTIMATED_COUNT", {})
+    return {**DEFAULT_SETTINGS, **options}
+
+
+def is_whole_table(query):
+    return not (
+        query.where
+        or query.distinct
+        or query.combinator
+        or query.group_by is not None
+        or query.is_sliced
+    )
+
+
+def table_estimate(cursor, table):
+    """``reltuples`` of a table and its partitions, None if never analyzed"""
+    cursor.execute(
+        """
+        SELECT reltuples FROM pg_class WHERE oid = %s::regclass
+        UNION ALL
+        SELECT child.reltuples
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = %s::regclass
+        """,
+        [table, table],
+    )
+    rows = [reltuples for (reltuples,) in cursor.fetchall()]
+    if all(reltuples < 0 for reltuples in rows):
+        return None
+    return int(sum(reltuples for reltuples in rows if reltuples > 0))
+
+
+def plan_estimate(cursor, queryset):
+    sql, params = queryset.order_by().query.sql_with_params()
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+    plan = cursor.fetchone()[0]
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def estimate_count(queryset):
+    """PostgreSQL's estimate of the rows of ``queryset``, None elsewhere"""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        estimate = None
+        if is_whole_table(queryset.query):
+            estimate = table_estimate(cursor, queryset.model._meta.db_table)
+        if estimate is None:
+            estimate = plan_estimate(cursor, queryset)
+    return estimate
+
+
+class EstimatedCountPaginator(Paginator):
+    """Exact count up to ``threshold`` rows, an estimate past it"""
+
+    threshold = None
+    is_estimated = False
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        threshold = self.threshold or count_settings()["THRESHOLD"]
+        counted = self.object_list[: threshold + 1].count()
+        if counted <= threshold:
+            return counted
+        estimate = estimate_count(self.object_list)
+        if estimate is None:
+            return self.object_list.count()
+        self.is_estimated = True
+        # A stale estimate can be lower than the rows just counted.
+        return max(estimate, counted)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.page.paginator.count),
+                    ("count_is_estimated", self.page.paginator.is_estimated),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"] = {
+            "count": response_schema["properties"]["count"],
+            "count_is_estimated": {"type": "boolean", "example": False},
+            **response_schema["properties"],
+        }
+        return response_schema
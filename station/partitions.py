@@ -0,0 +1,124 @@
+"""
+Monthly range partitions of the ticket table (PostgreSQL only).
+
+``station_ticket`` is partitioned by ``journey_departure_time``: one
+partition per departure month plus a default partition that catches
+tickets for months nobody created a partition for yet. Queries that filter
+on ``journey_departure_time`` only touch the partitions of those months.
+"""
+
+from datetime import datetime
+
+from django.db import connection, transaction
+
+TICKET_TABLE = "station_ticket"
+DEFAULT_PARTITION = f"{TICKET_TABLE}_default"
+
+
+def is_supported():
+    return connection.vendor == "postgresql"
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{TICKET_TABLE}_p{month:%Y%m}"
+
+
+def list_partitions(cursor):
+    """Return (name, bounds) of the ticket partitions, oldest first"""
+    cursor.execute(
+        """
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = %s::regclass
+        ORDER BY child.relname
+        """,
+        [TICKET_TABLE],
+    )
+    return cursor.fetchall()
+
+
+def create_partition(cursor, month):
+    """
+    Create the partition for ``month`` unless it exists. Rows that already
+    landed in the default partition for that month are moved into it.
+    """
+    month = month_start(month)
+    name = partition_name(month)
+    bounds = [month, add_months(month, 1)]
+    if name in {row[0] for row in list_partitions(cursor)}:
+        return False
+
+    cursor.execute(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+        f"WHERE journey_departure_time >= %s "
+        f"AND journey_departure_time < %s)",
+        bounds,
+    )
+    misplaced = cursor.fetchone()[0]
+
+    if misplaced:
+        cursor.execute(
+            f"ALTER TABLE {TICKET_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"
+        )
+    cursor.execute(
+        f"CREATE TABLE {name} PARTITION OF {TICKET_TABLE} "
+        f"FOR VALUES FROM (%s) TO (%s)",
+        bounds,
+    )
+    if misplaced:
+        for statement in (
+            f"INSERT INTO {TICKET_TABLE} SELECT * FROM {DEFAULT_PARTITION} "
+            f"WHERE journey_departure_time >= %s "
+            f"AND journey_departure_time < %s",
+            f"DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE journey_departure_time >= %s "
+            f"AND journey_departure_time < %s",
+        ):
+            cursor.execute(statement, bounds)
+        cursor.execute(
+            f"ALTER TABLE {TICKET_TABLE} "
+            f"ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"
+        )
+    return True
+
+
+def create_partitions(first_month, last_month):
+    """Create the partitions of every month in [first_month, last_month]"""
+    created = []
+    month = month_start(first_month)
+    with transaction.atomic(), connection.cursor() as cursor:
+        while month <= last_month:
+            if create_partition(cursor, month):
+                created.append(partition_name(month))
+            month = add_months(month, 1)
+    return created
+
+
+def detach_partitions(before_month, drop=False):
+    """
+    Detach (and optionally drop) the partitions of months before
+    ``before_month``. Detached partitions stay behind as plain tables.
+    """
+    cutoff = partition_name(month_start(before_month))
+    detached = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for name, _ in list_partitions(cursor):
+            if name == DEFAULT_PARTITION or name >= cutoff:
+                continue
+            cursor.execute(
+                f"ALTER TABLE {TICKET_TABLE} DETACH PARTITION {name}"
+            )
+            if drop:
+                cursor.execute(f"DROP TABLE {name}")
+            detached.append(name)
+    return detached
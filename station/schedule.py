@@ -0,0 +1,50 @@
+"""Busy and idle time of a train over a window."""
+
+
+def utilization_timeline(journeys, start, end):
+    """
+    Split ``[start, end)`` into busy and idle intervals. ``journeys`` are
+    (journey id, departure, arrival) tuples sorted by departure; journeys
+    that overlap or touch share one busy interval.
+    """
+    intervals = []
+    cursor = start
+    for journey_id, departure, arrival in journeys:
+        departure, arrival = max(departure, start), min(arrival, end)
+        if arrival <= departure:
+            continue
+        last = intervals[-1] if intervals else None
+        if last and last["state"] == "busy" and departure <= last["end"]:
+            last["end"] = max(last["end"], arrival)
+            last["journeys"].append(journey_id)
+        else:
+            if departure > cursor:
+                intervals.append(
+                    {"state": "idle", "start": cursor, "end": departure}
+                )
+            intervals.append(
+                {
+                    "state": "busy",
+                    "start": departure,
+                    "end": arrival,
+                    "journeys": [journey_id],
+                }
+            )
+        cursor = max(cursor, arrival)
+    if cursor < end:
+        intervals.append({"state": "idle", "start": cursor, "end": end})
+
+    busy = sum(
+        (interval["end"] - interval["start"]).total_seconds()
+        for interval in intervals
+        if interval["state"] == "busy"
+    )
+    window = (end - start).total_seconds()
+    return {
+        "from": start,
+        "to": end,
+        "busy_hours": round(busy / 3600, 2),
+        "idle_hours": round((window - busy) / 3600, 2),
+        "utilization": round(busy / window * 100, 2) if window else 0.0,
+        "intervals": intervals,
+    }
@@ -0,0 +1,178 @@
+"""
+Cache of journey search results.
+
+A search is keyed on its normalized ``from``/``to``/``departure``/
+``arrival`` parameters and stores the ids of the matching journeys, up to
+``MAX_ROWS`` of them (larger results are marked ``TOO_MANY`` and paginated
+by the database). Available tickets are read with the page, so sales do
+not invalidate searches. Entries are invalidated through generation
+counters: every key embeds the generations of the departure and arrival
+dates it filters on (or of "any date" without date filters), and a
+journey change bumps the counters of that journey's dates only, so
+unrelated searches stay cached. Catalog changes (stations, routes,
+trains) bump a global counter.
+
+Concurrent misses of one key are coalesced: the first request takes a
+short lock with ``cache.add`` and runs the query, the others wait for its
+result instead of hitting the database too.
+
+Counters only reach every worker through a shared cache: with a
+per-process backend (LocMem, the default without ``REDIS_URL``) searches
+are not cached unless ``ENABLED`` is set explicitly.
+"""
+
+import hashlib
+import json
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from train_service import caches
+
+PREFIX = "journey-search"
+GLOBAL = "all"
+ANY_DATE = "any"
+TOO_MANY = "too-many"
+DEFAULT_SETTINGS = {
+    # None: only cache when the default cache is shared between workers.
+    "ENABLED": None,
+    "TIMEOUT": 60 * 60,
+    "MAX_ROWS": 1000,
+    "LOCK_TIMEOUT": 10,
+    "WAIT_INTERVAL": 0.05,
+}
+
+
+def cache_settings():
+    options = getattr(settings, "JOURNEY_SEARCH_CACHE", {})
+    return {**DEFAULT_SETTINGS, **options}
+
+
+def is_enabled():
+    enabled = cache_settings()["ENABLED"]
+    if enabled is None:
+        return caches.is_shared()
+    return enabled
+
+
+def normalize(query_params):
+    """The search parameters that affect the result, in canonical form"""
+    params = {}
+    for name in ("from", "to"):
+        value = query_params.get(name, "").strip().casefold()
+        if value:
+            params[name] = value
+    for name in ("departure", "arrival"):
+        value = query_params.get(name, "").strip()
+        if value:
+            try:
+                value = datetime.strptime(value, "%Y-%m-%d").date()
+                value = value.isoformat()
+            except ValueError:
+                pass
+            params[name] = value
+    return params
+
+
+def generation_keys(params):
+    keys = [f"{PREFIX}:gen:{GLOBAL}"]
+    for name in ("departure", "arrival"):
+        if name in params:
+            keys.append(f"{PREFIX}:gen:{name}:{params[name]}")
+    if len(keys) == 1:
+        keys.append(f"{PREFIX}:gen:{ANY_DATE}")
+    return keys
+
+
+def current_generations(keys):
+    """Read the counters, seeding missing (or evicted) ones uniquely"""
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            # A fresh value, never a reset to an old one: entries stored
+            # under a generation that was evicted stay unreachable.
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def search_key(params):
+    keys = generation_keys(params)
+    payload = json.dumps(
+        [params, current_generations(keys)], sort_keys=True, default=str
+    )
+    return f"{PREFIX}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+def get_or_search(params, search):
+    """
+    Return the cached rows of ``params``, or run ``search()`` once for all
+    concurrent callers that missed and cache its result.
+    """
+    if not is_enabled():
+        return search()
+    options = cache_settings()
+    key = search_key(params)
+    rows = cache.get(key)
+    if rows is not None:
+        return rows
+
+    lock = f"{key}:lock"
+    deadline = time.monotonic() + options["LOCK_TIMEOUT"]
+    while not cache.add(lock, 1, timeout=options["LOCK_TIMEOUT"]):
+        time.sleep(options["WAIT_INTERVAL"])
+        rows = cache.get(key)
+        if rows is not None:
+            return rows
+        if time.monotonic() >= deadline:
+            # The lock holder died or is too slow, don't queue behind it.
+            return search()
+
+    try:
+        rows = search()
+        cache.set(key, rows, timeout=options["TIMEOUT"])
+        return rows
+    finally:
+        cache.delete(lock)
+
+
+def _bump(keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump(keys):
+    """
+    Bump generation counters now and again once the transaction commits,
+    dropping results other requests cached before the change was visible.
+    """
+    keys = list(keys)
+    _bump(keys)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(keys))
+
+
+def _day(value):
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date().isoformat()
+
+
+def invalidate_dates(*times):
+    """Drop cached searches that may contain journeys at these times"""
+    keys = {f"{PREFIX}:gen:{ANY_DATE}"}
+    for departure_time, arrival_time in times:
+        keys.add(f"{PREFIX}:gen:departure:{_day(departure_time)}")
+        keys.add(f"{PREFIX}:gen:arrival:{_day(arrival_time)}")
+    bump(sorted(keys))
+
+
+def invalidate_all():
+    bump([f"{PREFIX}:gen:{GLOBAL}"])
@@ -1,8 +1,11 @@
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
 
 import train_service.settings
+from station.fieldsets import SparseFieldsMixin
 from station.models import (
     TrainType,
     Train,
@@ -10,18 +13,70 @@ from station.models import (
     Route,
     CrewMember,
     Journey,
+    JourneyCrew,
     Order,
     Ticket,
+    ArchivedJourney,
+    ArchivedOrder,
+    ArchivedTicket,
+    WaitlistEntry,
+    BookingRequest,
 )
 
 
-class TrainTypeSerializer(serializers.ModelSerializer):
+class TrainTypeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = TrainType
         fields = ("id", "name")
 
 
-class TrainSerializer(serializers.ModelSerializer):
+class UtilizationIntervalSerializer(serializers.Serializer):
+    state = serializers.ChoiceField(choices=("busy", "idle"), read_only=True)
+    start = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+    end = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+    journeys = serializers.ListField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+
+class TrainUtilizationSerializer(serializers.Serializer):
+    train = serializers.IntegerField(read_only=True)
+    # "from" is a Python keyword, renamed in get_fields().
+    from_ = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+    to = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+    busy_hours = serializers.FloatField(read_only=True)
+    idle_hours = serializers.FloatField(read_only=True)
+    utilization = serializers.FloatField(read_only=True)
+    intervals = UtilizationIntervalSerializer(many=True, read_only=True)
+
+    def get_fields(self):
+        return {
+            "from" if name == "from_" else name: field
+            for name, field in super().get_fields().items()
+        }
+
+
+class TimetableEntrySerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    train = serializers.CharField(read_only=True)
+    route = serializers.CharField(read_only=True)
+    departure_time = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+    arrival_time = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+
+
+class TrainSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     train_type = serializers.SlugRelatedField(
         many=False, read_only=True, slug_field="name"
     )
@@ -36,9 +91,16 @@ class TrainSerializer(serializers.ModelSerializer):
             "places_in_cargo",
             "capacity",
         )
+        select_related_fields = {"train_type": ("train_type",)}
+        expandable_fields = {
+            "train_type": (
+                "station.serializers.TrainTypeSerializer",
+                {"read_only": True},
+            ),
+        }
 
 
-class StationListSerializer(serializers.ModelSerializer):
+class StationListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Station
         fields = ("id", "name", "latitude", "longitude", "image")
@@ -56,7 +118,9 @@ class StationListSerializer(serializers.ModelSerializer):
         return data
 
 
-class StationDetailSerializer(serializers.ModelSerializer):
+class StationDetailSerializer(
+    SparseFieldsMixin, serializers.ModelSerializer
+):
     class Meta:
         model = Station
         fields = ("id", "name", "latitude", "longitude", "image")
@@ -68,7 +132,7 @@ class StationImageSerializer(serializers.ModelSerializer):
         fields = ("id", "image")
 
 
-class RouteSerializer(serializers.ModelSerializer):
+class RouteSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Route
@@ -90,6 +154,20 @@ class RouteListSerializer(RouteSerializer):
             "source",
             "destination",
         )
+        select_related_fields = {
+            "source": ("source",),
+            "destination": ("destination",),
+        }
+        expandable_fields = {
+            "source": (
+                "station.serializers.StationDetailSerializer",
+                {"read_only": True},
+            ),
+            "destination": (
+                "station.serializers.StationDetailSerializer",
+                {"read_only": True},
+            ),
+        }
 
 
 class RouteDetailSerializer(RouteListSerializer):
@@ -100,8 +178,7 @@ class RouteDetailSerializer(RouteListSerializer):
         read_only=True, source="destination.station_coordinates"
     )
 
-    class Meta:
-        model = Route
+    class Meta(RouteListSerializer.Meta):
         fields = (
             "id",
             "source",
@@ -112,7 +189,7 @@ class RouteDetailSerializer(RouteListSerializer):
         )
 
 
-class CrewMemberSerializer(serializers.ModelSerializer):
+class CrewMemberSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = CrewMember
         fields = ("id", "first_name", "last_name", "full_name", "image")
@@ -130,22 +207,44 @@ class CrewMemberDetailSerializer(CrewMemberSerializer):
         fields = ("id", "first_name", "last_name", "full_name", "image")
 
 
+class CrewRosterSerializer(serializers.ModelSerializer):
+    route = serializers.StringRelatedField(source="journey.route")
+    train = serializers.CharField(source="journey.train.name", read_only=True)
+    departure_time = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+    arrival_time = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+
+    class Meta:
+        model = JourneyCrew
+        fields = (
+            "journey",
+            "route",
+            "train",
+            "departure_time",
+            "arrival_time",
+        )
+
+
 class CrewMemberImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = CrewMember
         fields = ("id", "image")
 
 
-class JourneySerializer(serializers.ModelSerializer):
-    train = serializers.SlugRelatedField(
-        many=False, read_only=True, slug_field="name"
-    )
-    route = serializers.StringRelatedField(many=False)
+class JourneySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     departure_time = serializers.DateTimeField(
-        read_only=True, format=train_service.settings.DATETIME_FORMAT
+        format=train_service.settings.DATETIME_FORMAT
     )
     arrival_time = serializers.DateTimeField(
-        read_only=True, format=train_service.settings.DATETIME_FORMAT
+        format=train_service.settings.DATETIME_FORMAT
+    )
+    # Declared explicitly: DRF makes M2M fields with a through model
+    # read-only by default.
+    crew_members = serializers.PrimaryKeyRelatedField(
+        many=True, queryset=CrewMember.objects.all()
     )
 
     class Meta:
@@ -159,8 +258,98 @@ class JourneySerializer(serializers.ModelSerializer):
             "crew_members",
         )
 
+    def validate(self, attrs):
+        data = super(JourneySerializer, self).validate(attrs=attrs)
+        instance = self.instance
+        departure_time = attrs.get(
+            "departure_time", getattr(instance, "departure_time", None)
+        )
+        arrival_time = attrs.get(
+            "arrival_time", getattr(instance, "arrival_time", None)
+        )
+        if departure_time is None or arrival_time is None:
+            return data
+        if arrival_time <= departure_time:
+            raise serializers.ValidationError(
+                {"arrival_time": "Arrival must be after departure."}
+            )
+        self.validate_train_schedule(
+            attrs.get("train", getattr(instance, "train", None)),
+            departure_time,
+            arrival_time,
+        )
+        self.validate_crew_schedule(attrs, departure_time, arrival_time)
+        return data
+
+    def validate_train_schedule(self, train, departure_time, arrival_time):
+        if train is None:
+            return
+        conflicts = Journey.objects.filter(train=train).overlapping(
+            departure_time, arrival_time
+        )
+        if self.instance is not None:
+            conflicts = conflicts.exclude(pk=self.instance.pk)
+        conflicts = conflicts.order_by("departure_time")[:10]
+        if conflicts:
+            raise serializers.ValidationError(
+                {
+                    "train": [
+                        f"{train.name} already runs journey {journey.id} "
+                        f"({journey.departure_time:%Y-%m-%d %H:%M} - "
+                        f"{journey.arrival_time:%Y-%m-%d %H:%M})"
+                        for journey in conflicts
+                    ]
+                }
+            )
+
+    def validate_crew_schedule(self, attrs, departure_time, arrival_time):
+        instance = self.instance
+        if "crew_members" in attrs:
+            crew_ids = [crew.id for crew in attrs["crew_members"]]
+        elif instance is not None:
+            crew_ids = list(
+                instance.crew_assignments.values_list(
+                    "crewmember_id", flat=True
+                )
+            )
+        else:
+            crew_ids = []
+        if not crew_ids:
+            return
+
+        conflicts = JourneyCrew.objects.filter(
+            crewmember_id__in=crew_ids
+        ).overlapping(departure_time, arrival_time)
+        if instance is not None:
+            conflicts = conflicts.exclude(journey=instance)
+        conflicts = conflicts.select_related("crewmember").order_by(
+            "departure_time"
+        )[:10]
+        if conflicts:
+            raise serializers.ValidationError(
+                {
+                    "crew_members": [
+                        f"{assignment.crewmember} is already assigned to "
+                        f"journey {assignment.journey_id} "
+                        f"({assignment.departure_time:%Y-%m-%d %H:%M} - "
+                        f"{assignment.arrival_time:%Y-%m-%d %H:%M})"
+                        for assignment in conflicts
+                    ]
+                }
+            )
+
 
 class JourneyListSerializer(JourneySerializer):
+    train = serializers.SlugRelatedField(
+        many=False, read_only=True, slug_field="name"
+    )
+    route = serializers.StringRelatedField(many=False)
+    departure_time = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+    arrival_time = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
     tickets_available = serializers.IntegerField(read_only=True)
 
     class Meta:
@@ -173,9 +362,28 @@ class JourneyListSerializer(JourneySerializer):
             "arrival_time",
             "tickets_available",
         )
+        select_related_fields = {
+            "train": ("train",),
+            "route": ("route__source", "route__destination"),
+        }
+        expandable_fields = {
+            "train": (
+                "station.serializers.TrainSerializer",
+                {"read_only": True},
+            ),
+            "route": (
+                "station.serializers.RouteListSerializer",
+                {"read_only": True},
+            ),
+        }
 
 
 class TicketSerializer(serializers.ModelSerializer):
+    # Validation reads the train, station boards the route.
+    journey = serializers.PrimaryKeyRelatedField(
+        queryset=Journey.objects.select_related("route", "train")
+    )
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
         Ticket.validate_ticket(
@@ -189,6 +397,14 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = ("id", "cargo_number", "seat_number", "journey")
+        # The model constraint also spans journey_departure_time, which
+        # DRF cannot validate: check the seat itself.
+        validators = [
+            UniqueTogetherValidator(
+                queryset=Ticket.objects.all(),
+                fields=("journey", "cargo_number", "seat_number"),
+            )
+        ]
 
 
 class TicketListSerializer(TicketSerializer):
@@ -208,11 +424,10 @@ class TicketSeatSerializer(TicketSerializer):
 class JourneyDetailSerializer(JourneyListSerializer):
     crew_members = CrewMemberListSerializer(many=True, read_only=True)
     taken_places = TicketSeatSerializer(
-        source="tickets", many=True, read_only=True
+        source="taken_tickets", many=True, read_only=True
     )
 
-    class Meta:
-        model = Journey
+    class Meta(JourneyListSerializer.Meta):
         fields = (
             "id",
             "train",
@@ -222,9 +437,20 @@ class JourneyDetailSerializer(JourneyListSerializer):
             "crew_members",
             "taken_places",
         )
-
-
-class OrderSerializer(serializers.ModelSerializer):
+        prefetch_related_fields = {
+            "crew_members": ("crew_members",),
+            "taken_places": ("tickets",),
+        }
+        expandable_fields = {
+            **JourneyListSerializer.Meta.expandable_fields,
+            "crew_members": (
+                "station.serializers.CrewMemberDetailSerializer",
+                {"many": True, "read_only": True},
+            ),
+        }
+
+
+class OrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
     created_at = serializers.DateTimeField(
         read_only=True, format=train_service.settings.DATETIME_FORMAT
@@ -233,6 +459,7 @@ class OrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = ("id", "created_at", "tickets")
+        prefetch_related_fields = {"tickets": ("tickets",)}
 
     def create(self, validated_data):
         with transaction.atomic():
@@ -245,3 +472,137 @@ class OrderSerializer(serializers.ModelSerializer):
 
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+    class Meta(OrderSerializer.Meta):
+        prefetch_related_fields = {
+            "tickets": (
+                "tickets__journey__route__source",
+                "tickets__journey__route__destination",
+                "tickets__journey__train",
+            ),
+        }
+
+
+class BookingRequestSerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(
+        view_name="station:booking-detail"
+    )
+    created_at = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+    processed_at = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+
+    class Meta:
+        model = BookingRequest
+        fields = (
+            "id",
+            "url",
+            "status",
+            "order",
+            "errors",
+            "created_at",
+            "processed_at",
+        )
+        read_only_fields = fields
+
+
+class ArchivedJourneySerializer(serializers.ModelSerializer):
+    departure_time = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+    arrival_time = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+
+    class Meta:
+        model = ArchivedJourney
+        fields = ("id", "train", "route", "departure_time", "arrival_time")
+
+
+class ArchivedTicketSerializer(serializers.ModelSerializer):
+    journey = ArchivedJourneySerializer(many=False, read_only=True)
+
+    class Meta:
+        model = ArchivedTicket
+        fields = ("id", "cargo_number", "seat_number", "journey")
+
+
+class ArchivedOrderSerializer(serializers.ModelSerializer):
+    tickets = ArchivedTicketSerializer(
+        source="archived_tickets", many=True, read_only=True
+    )
+    created_at = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+    archived = serializers.BooleanField(default=True, read_only=True)
+
+    class Meta:
+        model = ArchivedOrder
+        fields = ("id", "created_at", "tickets", "archived")
+
+
+class OccupancySerializer(serializers.Serializer):
+    day = serializers.DateField(read_only=True)
+    route = serializers.IntegerField(read_only=True)
+    train_type = serializers.IntegerField(read_only=True)
+    journeys = serializers.IntegerField(read_only=True)
+    seats = serializers.IntegerField(read_only=True)
+    tickets_sold = serializers.IntegerField(read_only=True)
+    load_factor = serializers.FloatField(read_only=True)
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    seats = serializers.IntegerField(default=1)
+    position = serializers.IntegerField(read_only=True, allow_null=True)
+    created_at = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+    promoted_at = serializers.DateTimeField(
+        read_only=True, format=train_service.settings.DATETIME_FORMAT
+    )
+
+    class Meta:
+        model = WaitlistEntry
+        fields = (
+            "id",
+            "journey",
+            "seats",
+            "position",
+            "created_at",
+            "promoted_at",
+            "order",
+        )
+        read_only_fields = ("order",)
+
+    def validate(self, attrs):
+        data = super(WaitlistEntrySerializer, self).validate(attrs=attrs)
+        journey = (
+            Journey.objects.with_tickets_available()
+            .select_related("train")
+            .get(pk=attrs["journey"].pk)
+        )
+        if journey.departure_time <= timezone.now():
+            raise serializers.ValidationError(
+                {"journey": "Journey has already departed."}
+            )
+        capacity = journey.train.capacity
+        if not 1 <= attrs["seats"] <= capacity:
+            raise serializers.ValidationError(
+                {"seats": f"seats must be in range (1, {capacity})"}
+            )
+        if journey.tickets_available >= attrs["seats"]:
+            raise serializers.ValidationError(
+                {"journey": "Seats are still available, book them directly."}
+            )
+        user = self.context["request"].user
+        if (
+            WaitlistEntry.objects.waiting()
+            .filter(journey=journey, user_id=user.id)
+            .exists()
+        ):
+            raise serializers.ValidationError(
+                {"journey": "You are already on this waitlist."}
+            )
+        return data
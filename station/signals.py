@@ -0,0 +1,234 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.db import transaction
+from django.dispatch import receiver
+
+from station import availability, boards, occupancy, search_cache, tasks
+from station.models import (
+    Job,
+    Journey,
+    JourneyCrew,
+    Route,
+    Station,
+    Ticket,
+    TimetableVersion,
+    Train,
+)
+
+
+@receiver(post_save, sender=Ticket)
+def count_sold_ticket(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    if not occupancy.is_suspended():
+        occupancy.add_tickets(occupancy.journey_key(instance.journey), 1)
+
+
+@receiver(post_delete, sender=Ticket)
+def count_released_ticket(sender, instance, **kwargs):
+    if occupancy.is_suspended():
+        return
+    row = (
+        Journey.objects.filter(pk=instance.journey_id)
+        .values_list("route_id", "train__train_type_id")
+        .first()
+    )
+    if row is not None:
+        route_id, train_type_id = row
+        occupancy.add_tickets(
+            occupancy.occupancy_key(
+                instance.journey_departure_time, route_id, train_type_id
+            ),
+            -1,
+        )
+
+
+@receiver(post_save, sender=Journey)
+def invalidate_journey_searches(sender, instance, raw=False, **kwargs):
+    times = [(instance.departure_time, instance.arrival_time)]
+    previous = getattr(instance, "previous_values", None)
+    if previous and previous["departure_time"] is not None:
+        times.append((previous["departure_time"], previous["arrival_time"]))
+    search_cache.invalidate_dates(*times)
+
+
+@receiver(post_delete, sender=Journey)
+def drop_journey_searches(sender, instance, **kwargs):
+    search_cache.invalidate_dates(
+        (instance.departure_time, instance.arrival_time)
+    )
+
+
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def invalidate_all_searches(sender, created=False, **kwargs):
+    """Station names and routes decide which journeys a search finds"""
+    if not created:
+        search_cache.invalidate_all()
+
+
+@receiver(post_save, sender=Journey)
+def refresh_journey_occupancy(sender, instance, raw=False, **kwargs):
+    if raw or occupancy.is_suspended():
+        return
+    keys = [occupancy.journey_key(instance)]
+    previous = getattr(instance, "previous_values", None)
+    if previous and any(
+        previous[field] != getattr(instance, field)
+        for field in Journey.TRACKED_FIELDS
+    ):
+        train_type_id = (
+            Train.objects.filter(pk=previous["train_id"])
+            .values_list("train_type_id", flat=True)
+            .first()
+        )
+        keys.append(
+            occupancy.occupancy_key(
+                previous["departure_time"], previous["route_id"], train_type_id
+            )
+        )
+    occupancy.rebuild_keys(keys)
+
+
+@receiver(post_delete, sender=Journey)
+def drop_journey_occupancy(sender, instance, **kwargs):
+    if not occupancy.is_suspended():
+        occupancy.rebuild_keys([occupancy.journey_key(instance)])
+
+
+OCCUPANCY_FIELDS = ("train_type_id", "cargo_num", "places_in_cargo")
+
+
+@receiver(pre_save, sender=Train)
+def remember_train_capacity(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance.previous_capacity = (
+            Train.objects.filter(pk=instance.pk)
+            .values(*OCCUPANCY_FIELDS)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Train)
+def refresh_train_occupancy(sender, instance, created, raw=False, **kwargs):
+    """Capacity or type changes move the seats of every journey"""
+    if created or raw or occupancy.is_suspended():
+        return
+    previous = getattr(instance, "previous_capacity", None)
+    if previous is not None and all(
+        previous[field] == getattr(instance, field)
+        for field in OCCUPANCY_FIELDS
+    ):
+        return
+    train_types = {
+        instance.train_type_id,
+        previous and previous["train_type_id"],
+    }
+    occupancy.rebuild_keys(
+        occupancy.occupancy_key(departure_time, route_id, train_type_id)
+        for departure_time, route_id in Journey.objects.filter(
+            train=instance
+        ).values_list("departure_time", "route_id")
+        for train_type_id in train_types
+    )
+
+
+@receiver(m2m_changed, sender=Journey.crew_members.through)
+def copy_times_to_crew_assignments(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        assignments = JourneyCrew.objects.filter(
+            crewmember=instance, journey_id__in=pk_set
+        )
+    else:
+        assignments = JourneyCrew.objects.filter(
+            journey=instance, crewmember_id__in=pk_set
+        )
+    assignments.filter(departure_time__isnull=True).fill_times()
+
+
+@receiver(post_save, sender=Journey)
+@receiver(post_delete, sender=Journey)
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Train)
+@receiver(post_delete, sender=Train)
+def expire_timetable_snapshot(sender, raw=False, **kwargs):
+    """Compiled snapshots fall back to the database until recompiled"""
+    if not raw:
+        transaction.on_commit(recompile_timetable)
+
+
+def recompile_timetable():
+    TimetableVersion.bump()
+    # Edits made before a queued compilation starts are compiled with it.
+    if not Job.objects.filter(
+        name=tasks.compile_timetable.job_name, status=Job.QUEUED
+    ).exists():
+        tasks.compile_timetable.enqueue()
+
+
+@receiver(post_save, sender=Journey)
+def refresh_journey_boards(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    route_ids = {instance.route_id}
+    previous = getattr(instance, "previous_values", None)
+    if previous and previous["route_id"] is not None:
+        route_ids.add(previous["route_id"])
+    boards.invalidate_routes(*route_ids)
+
+
+@receiver(post_delete, sender=Journey)
+def drop_journey_boards(sender, instance, **kwargs):
+    boards.invalidate_routes(instance.route_id)
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def refresh_ticket_boards(sender, instance, created=True, raw=False, **kwargs):
+    """Boards show the tickets available on each journey"""
+    if created and not raw:
+        boards.invalidate_ticket(instance)
+
+
+@receiver(pre_save, sender=Route)
+def remember_route_stations(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance.previous_stations = (
+            Route.objects.filter(pk=instance.pk)
+            .values_list("source_id", "destination_id")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def refresh_route_boards(
+    sender, instance, created=False, raw=False, **kwargs
+):
+    """Journeys moved with their route, new routes have none yet"""
+    if not created and not raw:
+        boards.invalidate_stations(
+            instance.source_id,
+            instance.destination_id,
+            *(getattr(instance, "previous_stations", None) or ()),
+        )
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def publish_availability(sender, instance, created=True, raw=False, **kwargs):
+    if created and not raw:
+        availability.journey_changed(instance.journey_id)
@@ -0,0 +1,151 @@
+"""
+Server-Sent Events stream of a journey's seat availability.
+
+``GET /api/station/journeys/<id>/availability/`` is answered by a plain
+ASGI app mounted in front of Django (see train_service/asgi.py), so an
+open stream holds no worker thread and no database connection. The first
+event carries the current availability, later ones are sent whenever
+orders change it::
+
+    event: availability
+    data: {"journey": 1, "tickets_available": 357, "delta": -3}
+
+A comment line is sent every ``AVAILABILITY_BROKER["KEEPALIVE"]`` seconds
+so that proxies keep idle streams open.
+"""
+
+import asyncio
+import io
+import json
+import re
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.signals import request_finished, request_started
+from rest_framework.exceptions import AuthenticationFailed
+
+from station import availability
+from user.authentication import CachedJWTAuthentication
+
+PATH = re.compile(r"^/api/station/journeys/(?P<pk>\d+)/availability/$")
+
+
+def event(journey_id, available, delta):
+    data = json.dumps(
+        {"journey": journey_id, "tickets_available": available, "delta": delta}
+    )
+    return f"event: availability\ndata: {data}\n\n".encode()
+
+
+def in_request(scope, func, *args):
+    """Run ``func`` with Django's request signals, e.g. closing connections"""
+    request_started.send(sender=AvailabilityStream, scope=scope)
+    try:
+        return func(*args)
+    finally:
+        request_finished.send(sender=AvailabilityStream)
+
+
+def authenticate(scope):
+    request = ASGIRequest(scope, io.BytesIO())
+    try:
+        return CachedJWTAuthentication().authenticate(request) is not None
+    except AuthenticationFailed:
+        return False
+
+
+def read_availability(journey_id):
+    return availability.current_availability([journey_id]).get(journey_id)
+
+
+class AvailabilityStream:
+    """ASGI app serving availability streams, other requests go to ``app``"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        match = scope["type"] == "http" and PATH.match(scope["path"])
+        if not match:
+            return await self.app(scope, receive, send)
+        if scope["method"] != "GET":
+            return await self.reply(send, 405)
+        if not await sync_to_async(in_request)(scope, authenticate, scope):
+            return await self.reply(send, 401)
+
+        # Subscribe before reading: a sale committed while the availability
+        # is read still reaches the stream.
+        journey_id = int(match["pk"])
+        broker = availability.get_broker()
+        subscriber = await broker.subscribe(journey_id)
+        try:
+            available = await sync_to_async(in_request)(
+                scope, read_availability, journey_id
+            )
+            if available is None:
+                return await self.reply(send, 404)
+            subscriber.seed(available)
+            await self.stream(subscriber, receive, send)
+        finally:
+            broker.unsubscribe(subscriber)
+
+    async def stream(self, subscriber, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        await self.send_body(
+            send, event(subscriber.journey_id, subscriber.sent, 0)
+        )
+
+        keepalive = availability.broker_settings()["KEEPALIVE"]
+        disconnected = asyncio.ensure_future(self.wait_disconnect(receive))
+        try:
+            while not disconnected.done():
+                changed = asyncio.ensure_future(subscriber.changed.wait())
+                await asyncio.wait(
+                    (changed, disconnected),
+                    timeout=keepalive,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                changed.cancel()
+                if disconnected.done():
+                    break
+                if subscriber.changed.is_set():
+                    available, delta = subscriber.take()
+                    await self.send_body(
+                        send, event(subscriber.journey_id, available, delta)
+                    )
+                else:
+                    await self.send_body(send, b": keepalive\n\n")
+        finally:
+            disconnected.cancel()
+
+    @staticmethod
+    async def wait_disconnect(receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    @staticmethod
+    async def send_body(send, body):
+        await send(
+            {"type": "http.response.body", "body": body, "more_body": True}
+        )
+
+    @staticmethod
+    async def reply(send, status):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"text/plain")],
+            }
+        )
+        await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,25 @@
+"""Background jobs of the station app, run by ``manage.py run_workers``"""
+
+from datetime import date
+
+from station import occupancy, timetable, waitlist
+from station.jobs import job
+
+
+@job
+def refresh_occupancy(since=None, until=None):
+    """Recompute occupancy statistics of ISO dates ``since`` to ``until``"""
+    occupancy.rebuild_occupancy(
+        date.fromisoformat(since) if since else None,
+        date.fromisoformat(until) if until else None,
+    )
+
+
+@job
+def promote_waitlists(batch_size=100):
+    waitlist.promote_waitlists(batch_size)
+
+
+@job(max_attempts=3)
+def compile_timetable(path=None):
+    timetable.compile_snapshot(path or timetable.snapshot_settings()["PATH"])
@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from station.models import Order, Ticket
+from station.tests.test_journey_api import (
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+TICKET_URL = reverse("admin:station_ticket_changelist")
+ROUTE_AUTOCOMPLETE_URL = reverse("admin:autocomplete")
+
+
+class LargeTableAdminTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@a.com", "pass", username="admin"
+        )
+        self.client.force_login(self.admin)
+        self.user = get_user_model().objects.create_user("a@a.com", "pass")
+        self.order = Order.objects.create(user=self.user)
+
+    def add_tickets(self, count):
+        for _ in range(count):
+            route = sample_route(
+                source=sample_station(name=f"From {Ticket.objects.count()}"),
+                destination=sample_station(
+                    name=f"To {Ticket.objects.count()}"
+                ),
+            )
+            Ticket.objects.create(
+                journey=sample_journey(route=route, train=sample_train()),
+                order=self.order,
+                cargo_number=1,
+                seat_number=1,
+            )
+
+    def changelist_queries(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(TICKET_URL, params or {})
+        self.assertEqual(res.status_code, 200)
+        return len(queries)
+
+    def test_ticket_changelist_queries_do_not_grow_with_rows(self):
+        self.add_tickets(1)
+        one = self.changelist_queries()
+        self.add_tickets(5)
+
+        self.assertEqual(self.changelist_queries(), one)
+
+    def test_numeric_search_matches_ids(self):
+        self.add_tickets(2)
+        ticket = Ticket.objects.first()
+        other_order = Order.objects.create(pk=1000, user=self.user)
+        Ticket.objects.filter(pk=ticket.pk).update(order=other_order)
+
+        res = self.client.get(TICKET_URL, {"q": str(other_order.id)})
+        self.assertEqual(list(res.context["cl"].result_list), [ticket])
+
+        res = self.client.get(TICKET_URL, {"q": "a@a.com"})
+        self.assertEqual(len(res.context["cl"].result_list), 2)
+
+    def test_route_autocomplete(self):
+        sample_route(
+            source=sample_station(name="Lviv"),
+            destination=sample_station(name="Kyiv"),
+        )
+
+        res = self.client.get(
+            ROUTE_AUTOCOMPLETE_URL,
+            {
+                "term": "lvi",
+                "app_label": "station",
+                "model_name": "journey",
+                "field_name": "route",
+            },
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [row["text"] for row in res.json()["results"]], ["Lviv - Kyiv"]
+        )
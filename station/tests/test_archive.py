@@ -0,0 +1,120 @@
+import io
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from station.models import (
+    ArchivedJourney,
+    ArchivedOrder,
+    ArchivedTicket,
+    Journey,
+    Order,
+    Ticket,
+)
+from station.tests.test_journey_api import (
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+ORDER_URL = reverse("station:order-list")
+
+
+class ArchiveJourneysTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("a@a.com", "pass")
+        route = sample_route(
+            source=sample_station(name="Lviv"),
+            destination=sample_station(name="Kyiv"),
+        )
+        train = sample_train()
+        self.past = sample_journey(
+            route=route,
+            train=train,
+            departure_time=datetime(2023, 5, 1, 10, 0),
+            arrival_time=datetime(2023, 5, 1, 20, 0),
+        )
+        self.upcoming = sample_journey(route=route, train=train)
+        self.past_order = self.order(self.past, created_at=datetime(2023, 4, 1))
+        self.mixed_order = self.order(self.past, self.upcoming)
+
+    def order(self, *journeys, created_at=None):
+        order = Order.objects.create(user=self.user)
+        for journey in journeys:
+            Ticket.objects.create(
+                journey=journey,
+                order=order,
+                cargo_number=1,
+                seat_number=Ticket.objects.filter(journey=journey).count() + 1,
+            )
+        if created_at:
+            Order.objects.filter(pk=order.pk).update(created_at=created_at)
+        return order
+
+    def archive(self):
+        call_command(
+            "archive_journeys",
+            before=datetime(2024, 1, 1),
+            batch_size=1,
+            stdout=io.StringIO(),
+        )
+
+    def test_departed_journeys_move_to_archive(self):
+        self.archive()
+
+        self.assertEqual(list(Journey.objects.all()), [self.upcoming])
+        self.assertEqual(
+            list(ArchivedJourney.objects.values_list("id", "route")),
+            [(self.past.id, "Lviv - Kyiv")],
+        )
+        self.assertEqual(ArchivedTicket.objects.count(), 2)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_only_orders_without_active_tickets_are_archived(self):
+        self.archive()
+
+        self.assertEqual(list(Order.objects.all()), [self.mixed_order])
+        self.assertEqual(
+            list(ArchivedOrder.objects.values_list("id", flat=True)),
+            [self.past_order.id],
+        )
+
+    def test_order_history_includes_archived_orders_on_request(self):
+        self.archive()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        active = client.get(ORDER_URL)
+        history = client.get(ORDER_URL, {"include_archived": "true"})
+
+        self.assertEqual(active.data["count"], 1)
+        self.assertEqual(history.data["count"], 2)
+        archived = history.data["results"][1]
+        self.assertEqual(archived["id"], self.past_order.id)
+        self.assertTrue(archived["archived"])
+        self.assertEqual(
+            archived["tickets"][0]["journey"]["route"], "Lviv - Kyiv"
+        )
+
+    def test_order_history_keeps_archived_tickets_of_active_orders(self):
+        self.archive()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.get(ORDER_URL, {"include_archived": "true"})
+
+        mixed = res.data["results"][0]
+        self.assertEqual(mixed["id"], self.mixed_order.id)
+        self.assertEqual(
+            [ticket["journey"]["id"] for ticket in mixed["tickets"]],
+            [self.upcoming.id],
+        )
+        self.assertEqual(
+            [ticket["journey"]["id"] for ticket in mixed["archived_tickets"]],
+            [self.past.id],
+        )
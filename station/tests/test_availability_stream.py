@@ -0,0 +1,239 @@
+import asyncio
+import importlib.util
+import json
+import threading
+from unittest import mock, skipUnless
+
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from station import availability
+from station.models import Order, Ticket
+from station.streams import AvailabilityStream
+from station.tests.test_journey_api import (
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+
+async def not_found(scope, receive, send):
+    await send({"type": "http.response.start", "status": 404, "headers": []})
+    await send({"type": "http.response.body", "body": b"django"})
+
+
+def stream_scope(journey_id, token=None, method="GET"):
+    headers = [(b"host", b"testserver")]
+    if token is not None:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return {
+        "type": "http",
+        "method": method,
+        "path": f"/api/station/journeys/{journey_id}/availability/",
+        "query_string": b"",
+        "headers": headers,
+    }
+
+
+def parse_event(message):
+    lines = message["body"].decode().splitlines()
+    return lines[0], json.loads(lines[1].removeprefix("data: "))
+
+
+class BrokerTests(TestCase):
+    def test_publish_from_other_thread_coalesces_updates(self):
+        broker = availability.LocalBroker()
+
+        async def scenario():
+            subscriber = await broker.subscribe(1, 360)
+            self.assertTrue(broker.has_subscribers(1))
+            publisher = threading.Thread(
+                target=lambda: [broker.publish(1, n) for n in (359, 357)]
+            )
+            publisher.start()
+            await asyncio.to_thread(publisher.join)
+            await asyncio.wait_for(subscriber.changed.wait(), 1)
+            await asyncio.sleep(0)
+            result = subscriber.take()
+            broker.unsubscribe(subscriber)
+            return result
+
+        self.assertEqual(asyncio.run(scenario()), (357, -3))
+        self.assertFalse(broker.has_subscribers(1))
+
+    def test_update_before_seed_goes_out_after_it(self):
+        async def scenario():
+            subscriber = await availability.LocalBroker().subscribe(1)
+            subscriber.update(357)
+            subscriber.seed(360)
+            return subscriber.sent, subscriber.take()
+
+        self.assertEqual(asyncio.run(scenario()), (360, (357, -3)))
+
+    @skipUnless(importlib.util.find_spec("redis"), "Requires redis")
+    def test_redis_listener_reconnects(self):
+        import redis
+
+        broker = availability.RedisBroker(
+            "redis://localhost:6379/0", reconnect_delay=0
+        )
+        pubsub = broker.redis.pubsub = mock.Mock()
+        pubsub.return_value.get_message.side_effect = [
+            redis.ConnectionError("Connection reset"),
+            None,
+            {"data": b"1:357"},
+            RuntimeError("Stop"),
+        ]
+        broker._listener = "running"
+
+        with mock.patch.object(
+            availability.LocalBroker, "publish"
+        ) as publish, mock.patch.object(
+            broker, "watch"
+        ) as watch, self.assertRaises(RuntimeError):
+            broker.listen()
+
+        publish.assert_called_once_with(broker, 1, 357)
+        self.assertEqual(pubsub.return_value.subscribe.call_count, 2)
+        self.assertEqual(watch.call_count, 2)
+        self.assertIsNone(broker._listener)
+
+    @skipUnless(importlib.util.find_spec("redis"), "Requires redis")
+    def test_redis_broker_tracks_watched_journeys(self):
+        import redis
+
+        broker = availability.RedisBroker("redis://localhost:6379/0")
+        broker.redis = mock.Mock()
+        broker.redis.exists.return_value = 0
+
+        self.assertFalse(broker.has_subscribers(1))
+        broker.redis.exists.assert_called_once_with(
+            "journey-availability:watched:1"
+        )
+
+        broker.redis.exists.side_effect = redis.ConnectionError()
+        self.assertTrue(broker.has_subscribers(1))
+
+    def test_publish_errors_do_not_fail_the_commit(self):
+        broker = availability.LocalBroker()
+        broker.has_subscribers = lambda journey_id: True
+
+        with mock.patch(
+            "station.availability.get_broker", return_value=broker
+        ), mock.patch(
+            "station.availability.current_availability",
+            return_value={1: 357},
+        ), mock.patch.object(
+            broker, "publish", side_effect=ConnectionError("Broker down")
+        ), self.assertLogs("station.availability", "ERROR"):
+            with self.captureOnCommitCallbacks(execute=True):
+                availability.journey_changed(1)
+
+
+class AvailabilityStreamTests(TestCase):
+    def setUp(self):
+        # Like Django's test client: keep the test transaction's connection.
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+        self.user = get_user_model().objects.create_user("a@a.com", "pass")
+        self.token = str(AccessToken.for_user(self.user))
+        self.journey = sample_journey(
+            route=sample_route(
+                source=sample_station(name="Lviv"),
+                destination=sample_station(name="Kyiv"),
+            ),
+            train=sample_train(),
+        )
+        self.app = AvailabilityStream(not_found)
+
+    def book(self, seats):
+        order = Order.objects.create(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            for seat in seats:
+                Ticket.objects.create(
+                    journey=self.journey,
+                    order=order,
+                    cargo_number=1,
+                    seat_number=seat,
+                )
+
+    @async_to_sync
+    async def request(self, scope):
+        communicator = ApplicationCommunicator(self.app, scope)
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(1)
+        body = await communicator.receive_output(1)
+        await communicator.wait(1)
+        return start["status"], body["body"]
+
+    def test_requires_authentication(self):
+        self.assertEqual(self.request(stream_scope(self.journey.id))[0], 401)
+
+    def test_unknown_journey(self):
+        self.assertEqual(
+            self.request(stream_scope(self.journey.id + 1, self.token))[0],
+            404,
+        )
+
+    def test_subscribes_before_reading_availability(self):
+        broker = availability.get_broker()
+
+        def read_availability(journey_id):
+            self.assertTrue(broker.has_subscribers(journey_id))
+            return 359
+
+        with mock.patch(
+            "station.streams.read_availability", side_effect=read_availability
+        ):
+            status, body = self.request(
+                stream_scope(self.journey.id, self.token)
+            )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            parse_event({"body": body})[1]["tickets_available"], 359
+        )
+
+    def test_other_paths_reach_django(self):
+        scope = stream_scope(self.journey.id, self.token)
+        scope["path"] = f"/api/station/journeys/{self.journey.id}/"
+
+        self.assertEqual(self.request(scope), (404, b"django"))
+
+    @async_to_sync
+    async def test_streams_availability_changes(self):
+        communicator = ApplicationCommunicator(
+            self.app, stream_scope(self.journey.id, self.token)
+        )
+        await communicator.send_input({"type": "http.request"})
+
+        start = await communicator.receive_output(1)
+        self.assertEqual(start["status"], 200)
+        self.assertIn(
+            (b"content-type", b"text/event-stream"), start["headers"]
+        )
+        name, data = parse_event(await communicator.receive_output(1))
+        self.assertEqual(name, "event: availability")
+        self.assertEqual(
+            data,
+            {"journey": self.journey.id, "tickets_available": 360, "delta": 0},
+        )
+
+        await sync_to_async(self.book)([1, 2, 3])
+        _, data = parse_event(await communicator.receive_output(1))
+        self.assertEqual(data["tickets_available"], 357)
+        self.assertEqual(data["delta"], -3)
+
+        await communicator.send_input({"type": "http.disconnect"})
+        await communicator.wait(1)
+        self.assertFalse(
+            availability.get_broker().has_subscribers(self.journey.id)
+        )
@@ -0,0 +1,132 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station import booking
+from station.models import BookingRequest, Order, Ticket
+from station.tests.test_journey_api import (
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+ORDER_URL = reverse("station:order-list")
+
+
+def booking_url(booking_id):
+    return reverse("station:booking-detail", args=[booking_id])
+
+
+@override_settings(ORDER_INTAKE="queued")
+class QueuedOrderTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@a.com", "pass", username="admin", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = sample_journey(
+            route=sample_route(
+                source=sample_station(name="Lviv"),
+                destination=sample_station(name="Kyiv"),
+            ),
+            train=sample_train(),
+        )
+
+    def order(self, *seats, **headers):
+        return self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {
+                        "journey": self.journey.id,
+                        "cargo_number": 1,
+                        "seat_number": seat,
+                    }
+                    for seat in seats
+                ]
+            },
+            format="json",
+            **headers,
+        )
+
+    def test_order_is_accepted_and_queued(self):
+        res = self.order(1, 2)
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["status"], BookingRequest.PENDING)
+        self.assertIsNone(res.data["order"])
+        self.assertEqual(
+            res["Location"],
+            f"http://testserver{booking_url(res.data['id'])}",
+        )
+        self.assertEqual(Order.objects.count(), 0)
+
+    def test_invalid_order_is_rejected_up_front(self):
+        res = self.order(1000)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(BookingRequest.objects.exists())
+
+    def test_workers_book_queued_orders(self):
+        accepted = self.order(1, 2)
+
+        self.assertEqual(booking.drain(), 1)
+
+        res = self.client.get(booking_url(accepted.data["id"]))
+        self.assertEqual(res.data["status"], BookingRequest.BOOKED)
+        order = Order.objects.get(pk=res.data["order"])
+        self.assertEqual(order.user, self.user)
+        self.assertEqual(
+            sorted(order.tickets.values_list("seat_number", flat=True)),
+            [1, 2],
+        )
+
+    def test_taken_seat_fails_the_later_request(self):
+        first = self.order(1)
+        second = self.order(1, 2)
+
+        booking.drain()
+
+        self.assertEqual(
+            BookingRequest.objects.get(pk=first.data["id"]).status,
+            BookingRequest.BOOKED,
+        )
+        failed = self.client.get(booking_url(second.data["id"])).data
+        self.assertEqual(failed["status"], BookingRequest.FAILED)
+        self.assertIsNone(failed["order"])
+        self.assertTrue(failed["errors"]["tickets"])
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_retry_replays_accepted_response(self):
+        first = self.order(1, HTTP_IDEMPOTENCY_KEY="order-1")
+        retry = self.order(1, HTTP_IDEMPOTENCY_KEY="order-1")
+
+        self.assertEqual(retry.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(BookingRequest.objects.count(), 1)
+
+    def test_status_of_other_users_request_is_hidden(self):
+        accepted = self.order(1)
+        other = get_user_model().objects.create_user("b@b.com", "pass")
+        self.client.force_authenticate(other)
+
+        res = self.client.get(booking_url(accepted.data["id"]))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_run_booking_workers_once(self):
+        self.order(1)
+        self.order(2)
+        out = io.StringIO()
+
+        call_command("run_booking_workers", "--once", stdout=out)
+
+        self.assertIn("Processed 2 booking requests", out.getvalue())
+        self.assertFalse(BookingRequest.objects.pending().exists())
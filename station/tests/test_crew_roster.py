@@ -0,0 +1,125 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import JourneyCrew
+from station.tests.test_journey_api import (
+    sample_crew_member,
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+
+def journey_detail_url(journey_id):
+    return reverse("station:journey-detail", args=[journey_id])
+
+
+def roster_url(crew_member_id):
+    return reverse("station:crewmember-roster", args=[crew_member_id])
+
+
+class CrewSchedulingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@a.com", "pass", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        self.route = sample_route(
+            source=sample_station(name="Lviv"),
+            destination=sample_station(name="Kyiv"),
+        )
+        self.driver = sample_crew_member(first_name="Ivan")
+        self.morning = self.journey(10, 14)
+        self.morning.crew_members.add(self.driver)
+
+    def journey(self, departure_hour, arrival_hour, day=1):
+        return sample_journey(
+            route=self.route,
+            # A train per journey, so only crew can conflict.
+            train=sample_train(),
+            departure_time=datetime(2024, 9, day, departure_hour, 0),
+            arrival_time=datetime(2024, 9, day, arrival_hour, 0),
+        )
+
+    def assign(self, journey, *crew_members):
+        return self.client.patch(
+            journey_detail_url(journey.id),
+            {"crew_members": [member.id for member in crew_members]},
+            format="json",
+        )
+
+    def test_assignment_copies_journey_times(self):
+        assignment = JourneyCrew.objects.get(
+            journey=self.morning, crewmember=self.driver
+        )
+
+        self.assertEqual(assignment.departure_time, datetime(2024, 9, 1, 10))
+        self.assertEqual(assignment.arrival_time, datetime(2024, 9, 1, 14))
+
+    def test_overlapping_assignment_rejected(self):
+        noon = self.journey(13, 18)
+
+        res = self.assign(noon, self.driver)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(
+            f"journey {self.morning.id}", res.data["crew_members"][0]
+        )
+        self.assertFalse(noon.crew_members.filter(pk=self.driver.pk).exists())
+
+    def test_back_to_back_assignment_allowed(self):
+        afternoon = self.journey(14, 18)
+
+        res = self.assign(afternoon, self.driver)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_updating_own_journey_is_not_a_conflict(self):
+        res = self.assign(self.morning, self.driver)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_rescheduled_journey_moves_assignments(self):
+        self.morning.departure_time = datetime(2024, 9, 2, 8, 0)
+        self.morning.arrival_time = datetime(2024, 9, 2, 9, 0)
+        self.morning.save()
+
+        assignment = JourneyCrew.objects.get(
+            journey=self.morning, crewmember=self.driver
+        )
+        self.assertEqual(assignment.departure_time, datetime(2024, 9, 2, 8))
+        res = self.assign(self.journey(10, 14), self.driver)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_roster_lists_journeys_in_window(self):
+        later = self.journey(10, 14, day=3)
+        later.crew_members.add(self.driver)
+        self.journey(10, 14, day=20).crew_members.add(self.driver)
+
+        res = self.client.get(
+            roster_url(self.driver.id),
+            {"from": "2024-09-01", "to": "2024-09-05"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["journey"] for row in res.data], [self.morning.id, later.id]
+        )
+        self.assertEqual(res.data[0]["route"], "Lviv - Kyiv")
+
+    def test_roster_requires_staff(self):
+        user = get_user_model().objects.create_user(
+            "user@a.com", "pass", username="user"
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(roster_url(self.driver.id))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
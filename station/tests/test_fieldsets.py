@@ -0,0 +1,119 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Order, Ticket
+from station.tests.test_journey_api import (
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+JOURNEY_URL = reverse("station:journey-list")
+ROUTE_URL = reverse("station:route-list")
+ORDER_URL = reverse("station:order-list")
+
+
+def journey_detail_url(journey_id):
+    return reverse("station:journey-detail", args=[journey_id])
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("a@a.com", "pass")
+        self.client.force_authenticate(self.user)
+        self.route = sample_route(
+            source=sample_station(name="Lviv"),
+            destination=sample_station(name="Kyiv"),
+        )
+        self.journey = sample_journey(route=self.route, train=sample_train())
+
+    def book(self, journey):
+        Ticket.objects.create(
+            journey=journey,
+            order=Order.objects.create(user=self.user),
+            cargo_number=1,
+            seat_number=1,
+        )
+
+    def test_fields_drop_joins_and_prefetches(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                journey_detail_url(self.journey.id),
+                {"fields": "id,departure_time,arrival_time"},
+            )
+
+        self.assertEqual(
+            set(res.data), {"id", "departure_time", "arrival_time"}
+        )
+
+    def test_omit(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                journey_detail_url(self.journey.id),
+                {"omit": "crew_members,taken_places"},
+            )
+
+        self.assertEqual(
+            set(res.data),
+            {"id", "train", "route", "departure_time", "arrival_time"},
+        )
+
+    def test_expand_nested_objects(self):
+        res = self.client.get(
+            journey_detail_url(self.journey.id),
+            {"expand": "route,train,crew_members", "omit": "taken_places"},
+        )
+
+        self.assertEqual(
+            res.data["route"],
+            {"id": self.route.id, "source": "Lviv", "destination": "Kyiv"},
+        )
+        self.assertEqual(res.data["train"]["train_type"], "sleeper")
+        self.assertEqual(res.data["crew_members"][0]["first_name"], "John")
+
+    def test_expanded_list_keeps_query_count(self):
+        for _ in range(3):
+            sample_journey(route=self.route, train=sample_train())
+
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                ROUTE_URL, {"expand": "source,destination"}
+            )
+
+        self.assertEqual(res.data[0]["source"]["name"], "Lviv")
+        res = self.client.get(
+            JOURNEY_URL, {"expand": "route", "fields": "id,route"}
+        )
+        self.assertEqual(len(res.data), 4)
+        self.assertEqual(res.data[0]["route"]["destination"], "Kyiv")
+
+    def test_order_list_prefetches_journeys(self):
+        self.book(self.journey)
+        with self.assertNumQueries(8):
+            self.client.get(ORDER_URL)
+
+        for _ in range(4):
+            self.book(sample_journey(route=self.route, train=sample_train()))
+        with self.assertNumQueries(8):
+            res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.data["count"], 5)
+
+    def test_writes_ignore_field_selection(self):
+        admin = get_user_model().objects.create_user(
+            "admin@a.com", "pass", username="admin", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+
+        res = self.client.patch(
+            journey_detail_url(self.journey.id) + "?fields=id",
+            {"departure_time": "2024-08-31 09:00:00"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("departure_time", res.data)
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import IdempotencyKey, Order
+from station.tests.test_journey_api import (
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+ORDER_URL = reverse("station:order-list")
+
+
+class IdempotentOrderTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@a.com", "pass", username="admin", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = sample_journey(
+            route=sample_route(
+                source=sample_station(name="Lviv"),
+                destination=sample_station(name="Kyiv"),
+            ),
+            train=sample_train(),
+        )
+
+    def order(self, seat=1, key="order-1"):
+        return self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {
+                        "journey": self.journey.id,
+                        "cargo_number": 1,
+                        "seat_number": seat,
+                    }
+                ]
+            },
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_first_response(self):
+        first = self.order()
+        retry = self.order()
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_with_other_body_rejected(self):
+        self.order(seat=1)
+
+        res = self.order(seat=2)
+
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_validation_errors_are_replayed(self):
+        first = self.order(seat=1000)
+        retry = self.order(seat=1000)
+
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+
+    def test_expired_key_runs_again(self):
+        self.order()
+        Order.objects.all().delete()
+        IdempotencyKey.objects.update(
+            expires_at=datetime.now() - timedelta(seconds=1)
+        )
+
+        res = self.order()
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(res.has_header("Idempotent-Replayed"))
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_requests_without_key_are_not_stored(self):
+        self.order(key="")
+        self.order(key="", seat=2)
+
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
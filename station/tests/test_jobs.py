@@ -0,0 +1,180 @@
+import io
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import (
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+    skipUnlessDBFeature,
+)
+from django.utils import timezone
+
+from station import jobs
+from station.models import Job
+
+CALLS = []
+
+
+@jobs.job
+def record(value):
+    CALLS.append(value)
+
+
+@jobs.job(max_attempts=2)
+def fail():
+    raise RuntimeError("Export failed")
+
+
+@jobs.job
+def sleep(seconds):
+    time.sleep(seconds)
+
+
+def claim_all():
+    return jobs.claim(100, "test")
+
+
+class JobTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_and_run(self):
+        job = record.enqueue(value=1)
+
+        self.assertEqual(claim_all(), [job.id])
+        jobs.run(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(CALLS, [1])
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(job.worker, "test")
+        self.assertGreaterEqual(job.duration, 0)
+        self.assertGreaterEqual(job.finished_at, job.started_at)
+
+    def test_rolled_back_enqueue_leaves_no_job(self):
+        with transaction.atomic():
+            record.enqueue(value=1)
+            transaction.set_rollback(True)
+
+        self.assertFalse(Job.objects.exists())
+
+    def test_delayed_job_waits(self):
+        record.enqueue(value=1, delay=60)
+
+        self.assertEqual(claim_all(), [])
+
+    def test_claimed_jobs_are_not_claimed_again(self):
+        record.enqueue(value=1)
+        claim_all()
+
+        self.assertEqual(claim_all(), [])
+
+    def test_failed_attempt_is_retried_with_backoff(self):
+        job = fail.enqueue()
+        claim_all()
+
+        with mock.patch("station.jobs.random.uniform", return_value=1):
+            jobs.run(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn("Export failed", job.last_error)
+        self.assertAlmostEqual(
+            (job.run_at - job.finished_at).total_seconds(), 10, delta=1
+        )
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        claim_all()
+        jobs.run(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_backoff_doubles_up_to_the_maximum(self):
+        with mock.patch("station.jobs.random.uniform", return_value=1):
+            self.assertEqual(
+                [jobs.backoff(attempts) for attempts in (1, 2, 3, 20)],
+                [10, 20, 40, 3600],
+            )
+
+    def test_only_jobs_can_run(self):
+        job = Job.objects.create(
+            name="os.getcwd", run_at=timezone.now(), max_attempts=1
+        )
+        claim_all()
+
+        jobs.run(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn("os.getcwd is not a job", job.last_error)
+
+    def test_stale_jobs_are_queued_again(self):
+        retried = record.enqueue(value=1)
+        exhausted = fail.enqueue()
+        claim_all()
+        Job.objects.filter(pk=exhausted.pk).update(attempts=2)
+        Job.objects.update(heartbeat_at=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(jobs.requeue_stale(), 1)
+
+        retried.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual(retried.status, Job.QUEUED)
+        self.assertEqual(exhausted.status, Job.FAILED)
+
+    def test_heartbeat_keeps_long_running_job(self):
+        job = record.enqueue(value=1)
+        claim_all()
+        day_ago = timezone.now() - timedelta(days=1)
+        Job.objects.update(started_at=day_ago, heartbeat_at=day_ago)
+
+        self.assertEqual(jobs.heartbeat([job.id], "other"), 0)
+        self.assertEqual(jobs.heartbeat([job.id], "test"), 1)
+
+        self.assertEqual(jobs.requeue_stale(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertEqual(job.started_at, day_ago)
+
+
+# Workers share the queue through SKIP LOCKED (PostgreSQL), SQLite's
+# in-memory test database locks whole tables between threads.
+@skipUnlessDBFeature("has_select_for_update_skip_locked")
+class WorkerPoolTests(TransactionTestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_run_workers_once(self):
+        for value in range(5):
+            record.enqueue(value=value)
+        fail.enqueue()
+
+        call_command(
+            "run_workers", "--once", "--concurrency=2", stdout=io.StringIO()
+        )
+
+        self.assertEqual(sorted(CALLS), [0, 1, 2, 3, 4])
+        self.assertEqual(Job.objects.filter(status=Job.DONE).count(), 5)
+        self.assertEqual(
+            Job.objects.get(name=fail.job_name).status, Job.QUEUED
+        )
+
+    @override_settings(JOBS={"HEARTBEAT": 0})
+    def test_worker_beats_while_job_runs(self):
+        job = sleep.enqueue(seconds=0.5)
+
+        jobs.WorkerPool(concurrency=1, poll_interval=0.1).run(
+            threading.Event(), once=True
+        )
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertGreater(job.heartbeat_at, job.started_at)
@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Order, Ticket
+from station.multiget import MAX_IDS
+from station.tests.test_journey_api import (
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+JOURNEY_URL = reverse("station:journey-list")
+STATION_URL = reverse("station:station-list")
+ROUTE_URL = reverse("station:route-list")
+
+
+class MultiGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("a@a.com", "pass")
+        self.client.force_authenticate(self.user)
+        self.lviv = sample_station(name="Lviv")
+        self.kyiv = sample_station(name="Kyiv")
+        self.route = sample_route(source=self.lviv, destination=self.kyiv)
+        self.journeys = [
+            sample_journey(route=self.route, train=sample_train())
+            for _ in range(3)
+        ]
+        order = Order.objects.create(user=self.user)
+        for journey in self.journeys:
+            Ticket.objects.create(
+                journey=journey, order=order, cargo_number=1, seat_number=1
+            )
+
+    def test_journeys_in_requested_order(self):
+        first, second, third = self.journeys
+        missing = third.id + 100
+        ids = f"{third.id},{missing},{first.id}"
+
+        res = self.client.get(JOURNEY_URL, {"ids": ids})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["id"] for row in res.data], [third.id, missing, first.id]
+        )
+        self.assertEqual(res.data[1], {"id": missing, "detail": "Not found."})
+        self.assertEqual(res.data[0]["route"], "Lviv - Kyiv")
+        self.assertEqual(len(res.data[0]["crew_members"]), 1)
+        self.assertEqual(
+            res.data[0]["taken_places"],
+            [{"journey": third.id, "cargo_number": 1, "seat_number": 1}],
+        )
+
+    def test_journey_batch_runs_fixed_queries(self):
+        ids = [journey.id for journey in self.journeys]
+        with self.assertNumQueries(3):
+            self.client.get(JOURNEY_URL, {"ids": str(ids[0])})
+        with self.assertNumQueries(3):
+            self.client.get(JOURNEY_URL, {"ids": ",".join(map(str, ids))})
+
+    def test_list_filters_do_not_apply(self):
+        res = self.client.get(
+            JOURNEY_URL,
+            {"ids": str(self.journeys[0].id), "from": "odesa"},
+        )
+
+        self.assertEqual(res.data[0]["id"], self.journeys[0].id)
+
+    def test_stations_and_routes(self):
+        res = self.client.get(
+            STATION_URL, {"ids": f"{self.kyiv.id},{self.lviv.id}"}
+        )
+        self.assertEqual(
+            [row["name"] for row in res.data], ["Kyiv", "Lviv"]
+        )
+
+        with self.assertNumQueries(1):
+            res = self.client.get(ROUTE_URL, {"ids": str(self.route.id)})
+        self.assertEqual(res.data[0]["source"], "Lviv")
+        self.assertIn("source_coordinates", res.data[0])
+
+    def test_duplicate_ids_repeat_the_object(self):
+        pk = self.lviv.id
+
+        res = self.client.get(STATION_URL, {"ids": f"{pk},{pk}"})
+
+        self.assertEqual(res.data[0], res.data[1])
+
+    def test_invalid_ids(self):
+        for ids in ("", "1,a", ",".join(["1"] * (MAX_IDS + 1))):
+            res = self.client.get(STATION_URL, {"ids": ids})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,228 @@
+import io
+from datetime import date, datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import DailyOccupancy, Order, Ticket, TrainType
+from station.tests.test_journey_api import (
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+OCCUPANCY_URL = reverse("station:occupancy-list")
+
+
+class OccupancyStatisticsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("a@a.com", "pass")
+        self.route = sample_route(
+            source=sample_station(name="Lviv"),
+            destination=sample_station(name="Kyiv"),
+        )
+        self.train = sample_train(cargo_num=2, places_in_cargo=10)
+        self.journey = sample_journey(route=self.route, train=self.train)
+
+    def book(self, journey, seats):
+        order = Order.objects.create(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            for seat in seats:
+                Ticket.objects.create(
+                    journey=journey,
+                    order=order,
+                    cargo_number=1,
+                    seat_number=seat,
+                )
+        return order
+
+    def row(self, day=date(2024, 8, 31), train_type=None):
+        return DailyOccupancy.objects.get(
+            day=day,
+            route=self.route,
+            train_type=train_type or self.train.train_type,
+        )
+
+    def test_journey_adds_seats(self):
+        sample_journey(route=self.route, train=self.train)
+
+        row = self.row()
+        self.assertEqual(row.journeys, 2)
+        self.assertEqual(row.seats, 40)
+        self.assertEqual(row.tickets_sold, 0)
+
+    def test_ticket_count_waits_for_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            Ticket.objects.create(
+                journey=self.journey,
+                order=Order.objects.create(user=self.user),
+                cargo_number=1,
+                seat_number=1,
+            )
+            self.assertEqual(self.row().tickets_sold, 0)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.row().tickets_sold, 1)
+
+    def test_tickets_are_counted_incrementally(self):
+        order = self.book(self.journey, [1, 2, 3])
+        self.book(self.journey, [4])
+        self.assertEqual(self.row().tickets_sold, 4)
+        self.assertEqual(self.row().load_factor, 0.2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.delete()
+        self.assertEqual(self.row().tickets_sold, 1)
+
+    def test_sale_without_row_rebuilds_it(self):
+        self.book(self.journey, [1])
+        DailyOccupancy.objects.all().delete()
+
+        self.book(self.journey, [2])
+        self.book(self.journey, [3])
+
+        self.assertEqual(DailyOccupancy.objects.count(), 1)
+        self.assertEqual(self.row().tickets_sold, 3)
+
+    def test_rescheduled_journey_moves_its_row(self):
+        self.book(self.journey, [1, 2])
+        self.journey.departure_time = datetime(2024, 9, 2, 10, 0)
+        self.journey.arrival_time = datetime(2024, 9, 2, 20, 0)
+        self.journey.save()
+
+        self.assertFalse(
+            DailyOccupancy.objects.filter(day=date(2024, 8, 31)).exists()
+        )
+        self.assertEqual(self.row(day=date(2024, 9, 2)).tickets_sold, 2)
+
+    def test_train_type_change_moves_its_row(self):
+        self.book(self.journey, [1])
+        express = TrainType.objects.create(name="express")
+        self.train.train_type = express
+        self.train.save()
+
+        self.assertEqual(DailyOccupancy.objects.count(), 1)
+        self.assertEqual(self.row(train_type=express).tickets_sold, 1)
+
+    def test_train_rename_keeps_rows(self):
+        self.train.name = "Intercity"
+
+        with mock.patch("station.occupancy.rebuild_keys") as rebuild_keys:
+            self.train.save()
+
+        rebuild_keys.assert_not_called()
+
+    def test_capacity_change_refreshes_seats(self):
+        self.train.places_in_cargo = 20
+        self.train.save()
+
+        self.assertEqual(self.row().seats, 40)
+
+    def test_rebuild_matches_incremental_rows(self):
+        self.book(self.journey, [1, 2, 3])
+        expected = list(
+            DailyOccupancy.objects.values(
+                "day", "route", "train_type", "journeys", "seats",
+                "tickets_sold",
+            )
+        )
+        DailyOccupancy.objects.update(tickets_sold=0, seats=0)
+
+        call_command("rebuild_occupancy", stdout=io.StringIO())
+
+        self.assertEqual(
+            list(
+                DailyOccupancy.objects.values(
+                    "day", "route", "train_type", "journeys", "seats",
+                    "tickets_sold",
+                )
+            ),
+            expected,
+        )
+
+
+class OccupancyApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@a.com", "pass", username="admin", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        self.route = sample_route(
+            source=sample_station(name="Lviv"),
+            destination=sample_station(name="Kyiv"),
+        )
+        train = sample_train(cargo_num=1, places_in_cargo=10)
+        self.journey = sample_journey(route=self.route, train=train)
+        sample_journey(
+            route=self.route,
+            train=train,
+            departure_time=datetime(2024, 9, 1, 10, 0),
+            arrival_time=datetime(2024, 9, 1, 20, 0),
+        )
+        order = Order.objects.create(user=self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            for seat in (1, 2, 3, 4, 5):
+                Ticket.objects.create(
+                    journey=self.journey,
+                    order=order,
+                    cargo_number=1,
+                    seat_number=seat,
+                )
+
+    def test_occupancy_per_day(self):
+        res = self.client.get(OCCUPANCY_URL, {"group_by": "day"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"],
+            [
+                {
+                    "day": "2024-08-31",
+                    "journeys": 1,
+                    "seats": 10,
+                    "tickets_sold": 5,
+                    "load_factor": 0.5,
+                },
+                {
+                    "day": "2024-09-01",
+                    "journeys": 1,
+                    "seats": 10,
+                    "tickets_sold": 0,
+                    "load_factor": 0.0,
+                },
+            ],
+        )
+
+    def test_total_for_date_range(self):
+        res = self.client.get(
+            OCCUPANCY_URL,
+            {"group_by": "", "from": "2024-08-01", "to": "2024-09-30"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["seats"], 20)
+        self.assertEqual(res.data["load_factor"], 0.25)
+
+    def test_invalid_group_rejected(self):
+        res = self.client.get(OCCUPANCY_URL, {"group_by": "station"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_occupancy_requires_staff(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "user@a.com", "pass", username="user"
+            )
+        )
+
+        res = self.client.get(OCCUPANCY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from station.models import Order
+from station.pagination import EstimatedCountPaginator, is_whole_table
+
+ORDER_URL = reverse("station:order-list")
+ORDER_ADMIN_URL = reverse("admin:station_order_changelist")
+
+
+@override_settings(ESTIMATED_COUNT={"THRESHOLD": 3})
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("a@a.com", "pass")
+        Order.objects.bulk_create(Order(user=self.user) for _ in range(5))
+
+    def test_exact_count_up_to_threshold(self):
+        paginator = EstimatedCountPaginator(Order.objects.all()[:3], 2)
+
+        self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.is_estimated)
+
+    @mock.patch("station.pagination.estimate_count", return_value=5000)
+    def test_estimate_past_threshold(self, estimate_count):
+        paginator = EstimatedCountPaginator(Order.objects.all(), 2)
+
+        self.assertEqual(paginator.count, 5000)
+        self.assertEqual(paginator.num_pages, 2500)
+        self.assertTrue(paginator.is_estimated)
+
+    @mock.patch("station.pagination.estimate_count", return_value=1)
+    def test_stale_estimate_below_counted_rows(self, estimate_count):
+        paginator = EstimatedCountPaginator(Order.objects.all(), 2)
+
+        self.assertEqual(paginator.count, 4)
+
+    def test_exact_count_without_estimate(self):
+        # SQLite has no planner estimate to fall back on.
+        paginator = EstimatedCountPaginator(Order.objects.all(), 2)
+
+        self.assertEqual(paginator.count, 5)
+        self.assertFalse(paginator.is_estimated)
+
+    def test_is_whole_table(self):
+        self.assertTrue(is_whole_table(Order.objects.all().query))
+        self.assertFalse(
+            is_whole_table(Order.objects.filter(user=self.user).query)
+        )
+        self.assertFalse(is_whole_table(Order.objects.distinct().query))
+
+    @mock.patch("station.pagination.estimate_count", return_value=5000)
+    def test_order_list_flags_estimate(self, estimate_count):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.get(ORDER_URL)
+
+        self.assertEqual(res.data["count"], 5000)
+        self.assertTrue(res.data["count_is_estimated"])
+        self.assertEqual(len(res.data["results"]), 5)
+
+    def test_order_list_exact_count(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        with self.settings(ESTIMATED_COUNT={"THRESHOLD": 10}):
+            res = client.get(ORDER_URL)
+
+        self.assertEqual(res.data["count"], 5)
+        self.assertFalse(res.data["count_is_estimated"])
+
+    @mock.patch("station.pagination.estimate_count", return_value=5000)
+    def test_admin_changelist_shows_estimate(self, estimate_count):
+        admin = get_user_model().objects.create_superuser(
+            "admin@a.com", "pass", username="admin"
+        )
+        self.client.force_login(admin)
+
+        res = self.client.get(ORDER_ADMIN_URL)
+
+        self.assertEqual(res.context["cl"].result_count, 5000)
+        self.assertContains(res, "~5000 orders")
@@ -0,0 +1,144 @@
+import threading
+import time
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from station import search_cache
+from station.models import Order, Ticket
+from station.tests.test_journey_api import (
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+JOURNEY_URL = reverse("station:journey-list")
+
+
+@override_settings(JOURNEY_SEARCH_CACHE={"ENABLED": True})
+class JourneySearchCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("a@a.com", "pass")
+        self.client.force_authenticate(self.user)
+        self.route = sample_route(
+            source=sample_station(name="Lviv"),
+            destination=sample_station(name="Kyiv"),
+        )
+        self.train = sample_train()
+        self.journey = sample_journey(route=self.route, train=self.train)
+        self.other_day = sample_journey(
+            route=self.route,
+            train=self.train,
+            departure_time=datetime(2024, 9, 5, 10, 0),
+            arrival_time=datetime(2024, 9, 5, 20, 0),
+        )
+
+    def book(self, journey):
+        Ticket.objects.create(
+            journey=journey,
+            order=Order.objects.create(user=self.user),
+            cargo_number=1,
+            seat_number=1,
+        )
+
+    def test_normalized_search_served_from_cache(self):
+        self.client.get(JOURNEY_URL, {"from": "lv", "departure": "2024-08-31"})
+
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                JOURNEY_URL, {"from": " LV ", "departure": "2024-08-31"}
+            )
+
+        self.assertEqual([row["id"] for row in res.data], [self.journey.id])
+
+    def test_sold_ticket_keeps_search_and_refreshes_availability(self):
+        params = search_cache.normalize({})
+        self.client.get(JOURNEY_URL)
+        key = search_cache.search_key(params)
+
+        self.book(self.journey)
+        with self.assertNumQueries(1):
+            res = self.client.get(JOURNEY_URL)
+
+        self.assertEqual(search_cache.search_key(params), key)
+        available = {row["id"]: row["tickets_available"] for row in res.data}
+        self.assertEqual(available[self.journey.id], 359)
+
+    def test_change_on_other_day_keeps_entry(self):
+        params = search_cache.normalize({"departure": "2024-08-31"})
+        key = search_cache.search_key(params)
+
+        self.other_day.save()
+
+        self.assertEqual(search_cache.search_key(params), key)
+        self.journey.save()
+        self.assertNotEqual(search_cache.search_key(params), key)
+
+    def test_large_results_are_not_cached(self):
+        with self.settings(
+            JOURNEY_SEARCH_CACHE={"ENABLED": True, "MAX_ROWS": 1}
+        ):
+            self.client.get(JOURNEY_URL)
+            with self.assertNumQueries(1):
+                res = self.client.get(JOURNEY_URL)
+
+        self.assertEqual(len(res.data), 2)
+        self.assertEqual(
+            cache.get(search_cache.search_key({})), search_cache.TOO_MANY
+        )
+
+    def test_rescheduled_journey_leaves_old_date_search(self):
+        self.client.get(JOURNEY_URL, {"departure": "2024-08-31"})
+
+        self.journey.departure_time = datetime(2024, 9, 1, 10, 0)
+        self.journey.arrival_time = datetime(2024, 9, 1, 20, 0)
+        self.journey.save()
+        res = self.client.get(JOURNEY_URL, {"departure": "2024-08-31"})
+
+        self.assertEqual(res.data, [])
+
+    def test_concurrent_misses_run_one_search(self):
+        calls = []
+
+        def search():
+            calls.append(1)
+            time.sleep(0.2)
+            return [(self.journey.id, 360)]
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    search_cache.get_or_search({"to": "kyiv"}, search)
+                )
+            )
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[(self.journey.id, 360)]] * 4)
+
+    def test_per_process_cache_disables_search_cache(self):
+        with self.settings(JOURNEY_SEARCH_CACHE={}):
+            self.assertFalse(search_cache.is_enabled())
+            with self.assertNumQueries(1):
+                self.client.get(JOURNEY_URL, {"to": "kyiv"})
+
+        redis = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache"
+            }
+        }
+        with self.settings(JOURNEY_SEARCH_CACHE={}, CACHES=redis):
+            self.assertTrue(search_cache.is_enabled())
@@ -0,0 +1,108 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F, Max
+from django.test import TestCase
+
+from station.models import (
+    CrewMember,
+    Journey,
+    Order,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+
+SEED_OPTIONS = {
+    "stations": 5,
+    "routes": 6,
+    "trains": 3,
+    "crew": 8,
+    "users": 4,
+    "journeys": 12,
+    "orders_per_journey": 5,
+    "tickets_per_order": 3,
+    "chunk_size": 5,
+}
+
+
+def seed(**options):
+    call_command(
+        "seed_load", stdout=io.StringIO(), **{**SEED_OPTIONS, **options}
+    )
+
+
+def journey_fingerprint():
+    return list(
+        Journey.objects.order_by("id").values_list(
+            "departure_time",
+            "arrival_time",
+            "route__source__name",
+            "train__name",
+        )
+    )
+
+
+class SeedLoadTests(TestCase):
+    def test_seed_load_creates_consistent_data(self):
+        seed()
+
+        self.assertEqual(Journey.objects.count(), 12)
+        self.assertTrue(Order.objects.exists())
+        over_capacity = Journey.objects.annotate(
+            taken=Count("tickets")
+        ).filter(
+            taken__gt=F("train__cargo_num") * F("train__places_in_cargo")
+        )
+        self.assertFalse(over_capacity.exists())
+        self.assertFalse(
+            Ticket.objects.values("journey", "cargo_number", "seat_number")
+            .annotate(duplicates=Count("id"))
+            .filter(duplicates__gt=1)
+            .exists()
+        )
+        self.assertTrue(
+            all(
+                2 <= journey.crew_members.count() <= 4
+                for journey in Journey.objects.all()
+            )
+        )
+
+    def test_seed_load_is_deterministic(self):
+        seed(seed=7)
+        first = journey_fingerprint()
+        for model in (Station, Train, TrainType, CrewMember, get_user_model()):
+            model.objects.all().delete()
+
+        seed(seed=7)
+
+        self.assertEqual(first, journey_fingerprint())
+
+    def test_data_does_not_depend_on_chunk_size(self):
+        seed(seed=7)
+        first = journey_fingerprint()
+        for model in (Station, Train, TrainType, CrewMember, get_user_model()):
+            model.objects.all().delete()
+
+        seed(seed=7, chunk_size=7)
+
+        self.assertEqual(first, journey_fingerprint())
+
+    def test_seed_is_loaded_once(self):
+        seed(seed=7)
+
+        with self.assertRaisesMessage(CommandError, "use another --seed"):
+            seed(seed=7)
+        seed(seed=8)
+
+        self.assertEqual(Journey.objects.count(), 24)
+
+    def test_sequences_continue_after_seeded_ids(self):
+        seed()
+        last_id = Order.objects.aggregate(last=Max("id"))["last"]
+
+        order = Order.objects.create(user_id=Order.objects.first().user_id)
+
+        self.assertGreater(order.id, last_id)
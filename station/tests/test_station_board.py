@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station import boards
+from station.models import Order, Ticket
+from station.tests.test_journey_api import (
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+
+def departures_url(station_id):
+    return reverse("station:station-departures", args=[station_id])
+
+
+def arrivals_url(station_id):
+    return reverse("station:station-arrivals", args=[station_id])
+
+
+class StationBoardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("a@a.com", "pass")
+        self.client.force_authenticate(self.user)
+        self.lviv = sample_station(name="Lviv")
+        self.kyiv = sample_station(name="Kyiv")
+        self.odesa = sample_station(name="Odesa")
+        self.route = sample_route(source=self.lviv, destination=self.kyiv)
+        self.other_route = sample_route(
+            source=self.odesa, destination=self.kyiv
+        )
+        now = datetime.now().replace(microsecond=0)
+        self.departed = self.journey(now - timedelta(hours=1))
+        self.later = self.journey(now + timedelta(hours=5))
+        self.next = self.journey(now + timedelta(hours=2))
+
+    def journey(self, departure_time, route=None):
+        return sample_journey(
+            route=route or self.route,
+            train=sample_train(),
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=4),
+        )
+
+    def book(self, journey):
+        Ticket.objects.create(
+            journey=journey,
+            order=Order.objects.create(user=self.user),
+            cargo_number=1,
+            seat_number=1,
+        )
+
+    def test_next_departures_in_order(self):
+        res = self.client.get(departures_url(self.lviv.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["id"] for row in res.data], [self.next.id, self.later.id]
+        )
+        self.assertEqual(res.data[0]["route"], "Lviv - Kyiv")
+        self.assertEqual(res.data[0]["tickets_available"], 360)
+
+    def test_arrivals_include_journeys_still_on_the_way(self):
+        other = self.journey(
+            datetime.now() + timedelta(hours=1), route=self.other_route
+        )
+
+        res = self.client.get(arrivals_url(self.kyiv.id), {"limit": 3})
+
+        self.assertEqual(
+            [row["id"] for row in res.data],
+            [self.departed.id, other.id, self.next.id],
+        )
+        self.assertEqual(self.client.get(arrivals_url(self.lviv.id)).data, [])
+
+    def test_board_served_from_cache(self):
+        self.client.get(departures_url(self.lviv.id))
+
+        with self.assertNumQueries(1):
+            res = self.client.get(departures_url(self.lviv.id))
+
+        self.assertEqual(len(res.data), 2)
+
+    def test_sold_ticket_refreshes_board(self):
+        self.client.get(departures_url(self.lviv.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(self.next)
+        res = self.client.get(departures_url(self.lviv.id))
+
+        self.assertEqual(res.data[0]["tickets_available"], 359)
+
+    def test_order_refreshes_boards_once_after_commit(self):
+        generation = boards.generation(self.lviv.id)
+        order = Order.objects.create(user=self.user)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            for journey, seat in (
+                (self.next, 1),
+                (self.later, 1),
+                (self.next, 2),
+            ):
+                Ticket.objects.create(
+                    journey=journey,
+                    order=order,
+                    cargo_number=1,
+                    seat_number=seat,
+                )
+        self.assertEqual(boards.generation(self.lviv.id), generation)
+
+        with mock.patch.object(
+            boards, "invalidate_stations", wraps=boards.invalidate_stations
+        ) as invalidate, CaptureQueriesContext(connection) as queries:
+            for callback in callbacks:
+                callback()
+
+        # Stations come from the routes the tickets' journeys loaded.
+        self.assertFalse(
+            [query for query in queries if "station_route" in query["sql"]]
+        )
+        invalidate.assert_called_once()
+        self.assertEqual(
+            set(invalidate.call_args.args), {self.lviv.id, self.kyiv.id}
+        )
+        self.assertNotEqual(boards.generation(self.lviv.id), generation)
+
+    def test_change_on_other_station_keeps_board(self):
+        generation = boards.generation(self.lviv.id)
+
+        self.journey(datetime.now() + timedelta(hours=1), self.other_route)
+
+        self.assertEqual(boards.generation(self.lviv.id), generation)
+        self.next.departure_time += timedelta(minutes=10)
+        self.next.arrival_time += timedelta(minutes=10)
+        self.next.save()
+        self.assertNotEqual(boards.generation(self.lviv.id), generation)
+
+    def test_rerouted_journey_leaves_old_board(self):
+        self.client.get(departures_url(self.lviv.id))
+
+        self.later.route = self.other_route
+        self.later.save()
+        res = self.client.get(departures_url(self.lviv.id))
+
+        self.assertEqual([row["id"] for row in res.data], [self.next.id])
+
+    def test_invalid_limit(self):
+        for limit in ("0", "51", "many"):
+            res = self.client.get(
+                departures_url(self.lviv.id), {"limit": limit}
+            )
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_station(self):
+        res = self.client.get(departures_url(self.odesa.id + 100))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
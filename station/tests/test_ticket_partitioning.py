@@ -0,0 +1,203 @@
+import io
+from datetime import datetime
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+
+from station import partitions
+from station.models import Journey, Order, Ticket
+from station.tests.test_journey_api import (
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+
+class TicketPartitionKeyTests(TestCase):
+    def setUp(self):
+        self.journey = sample_journey(
+            route=sample_route(
+                source=sample_station(name="Lviv"),
+                destination=sample_station(name="Kyiv"),
+            ),
+            train=sample_train(),
+        )
+        self.order = Order.objects.create(
+            user=get_user_model().objects.create_user("a@a.com", "password")
+        )
+        self.ticket = Ticket.objects.create(
+            journey=self.journey,
+            order=self.order,
+            cargo_number=1,
+            seat_number=1,
+        )
+
+    def test_ticket_copies_journey_departure_time(self):
+        self.assertEqual(
+            self.ticket.journey_departure_time, self.journey.departure_time
+        )
+
+    def test_rescheduling_journey_moves_its_tickets(self):
+        journey = Journey.objects.get(pk=self.journey.pk)
+        journey.departure_time = datetime(2024, 9, 30, 10, 0)
+        journey.save()
+
+        self.ticket.refresh_from_db()
+        self.assertEqual(
+            self.ticket.journey_departure_time, datetime(2024, 9, 30, 10, 0)
+        )
+        self.assertEqual(list(journey.taken_tickets), [self.ticket])
+
+    def test_tickets_available_counts_journey_tickets(self):
+        journey = Journey.objects.with_tickets_available().get(
+            pk=self.journey.pk
+        )
+
+        self.assertEqual(journey.tickets_available, 359)
+
+    def test_partition_command_requires_postgresql(self):
+        if connection.vendor == "postgresql":
+            self.skipTest("Only meaningful on other database engines")
+
+        with self.assertRaises(CommandError):
+            call_command("ticket_partitions", "list")
+
+
+def ticket_partition(ticket):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT tableoid::regclass::text FROM station_ticket "
+            "WHERE id = %s",
+            [ticket.id],
+        )
+        return cursor.fetchone()[0]
+
+
+def partition_names():
+    with connection.cursor() as cursor:
+        return [name for name, _ in partitions.list_partitions(cursor)]
+
+
+@skipUnless(connection.vendor == "postgresql", "Requires PostgreSQL")
+class TicketPartitionTests(TestCase):
+    def setUp(self):
+        self.order = Order.objects.create(
+            user=get_user_model().objects.create_user("a@a.com", "password")
+        )
+        self.route = sample_route(
+            source=sample_station(name="Lviv"),
+            destination=sample_station(name="Kyiv"),
+        )
+        self.train = sample_train()
+
+    def book(self, departure_time):
+        return Ticket.objects.create(
+            journey=sample_journey(
+                route=self.route,
+                train=self.train,
+                departure_time=departure_time,
+                arrival_time=departure_time,
+            ),
+            order=self.order,
+            cargo_number=1,
+            seat_number=1,
+        )
+
+    def test_ticket_without_partition_lands_in_default(self):
+        ticket = self.book(datetime(2024, 8, 31, 10, 0))
+
+        self.assertEqual(
+            ticket_partition(ticket), partitions.DEFAULT_PARTITION
+        )
+
+    def test_create_partitions(self):
+        created = partitions.create_partitions(
+            datetime(2024, 8, 1), datetime(2024, 9, 1)
+        )
+        ticket = self.book(datetime(2024, 9, 30, 10, 0))
+
+        self.assertEqual(
+            created, ["station_ticket_p202408", "station_ticket_p202409"]
+        )
+        self.assertEqual(ticket_partition(ticket), "station_ticket_p202409")
+        self.assertEqual(
+            partitions.create_partitions(
+                datetime(2024, 8, 1), datetime(2024, 8, 1)
+            ),
+            [],
+        )
+
+    def test_create_partition_moves_rows_out_of_default(self):
+        august = self.book(datetime(2024, 8, 31, 10, 0))
+        september = self.book(datetime(2024, 9, 30, 10, 0))
+
+        partitions.create_partitions(
+            datetime(2024, 8, 1), datetime(2024, 8, 1)
+        )
+
+        self.assertEqual(ticket_partition(august), "station_ticket_p202408")
+        self.assertEqual(
+            ticket_partition(september), partitions.DEFAULT_PARTITION
+        )
+        self.assertIn(partitions.DEFAULT_PARTITION, partition_names())
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_journey_update_moves_its_tickets(self):
+        ticket = self.book(datetime(2024, 8, 31, 10, 0))
+
+        Journey.objects.filter(pk=ticket.journey_id).update(
+            departure_time=datetime(2024, 9, 30, 10, 0)
+        )
+
+        ticket.refresh_from_db()
+        self.assertEqual(
+            ticket.journey_departure_time, datetime(2024, 9, 30, 10, 0)
+        )
+
+    def test_stale_departure_time_is_rejected(self):
+        ticket = self.book(datetime(2024, 8, 31, 10, 0))
+        journey = ticket.journey
+        Journey.objects.filter(pk=journey.pk).update(
+            departure_time=datetime(2024, 9, 30, 10, 0)
+        )
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Ticket.objects.create(
+                journey=journey,
+                order=self.order,
+                cargo_number=1,
+                seat_number=1,
+            )
+
+    def test_detach_partitions(self):
+        partitions.create_partitions(
+            datetime(2024, 8, 1), datetime(2024, 9, 1)
+        )
+        ticket = self.book(datetime(2024, 8, 31, 10, 0))
+
+        detached = partitions.detach_partitions(datetime(2024, 9, 1))
+
+        self.assertEqual(detached, ["station_ticket_p202408"])
+        self.assertNotIn("station_ticket_p202408", partition_names())
+        self.assertFalse(Ticket.objects.filter(pk=ticket.pk).exists())
+
+    def test_partition_command(self):
+        this_month = partitions.month_start(datetime.now())
+        out = io.StringIO()
+
+        call_command(
+            "ticket_partitions", "create", "--months-ahead=1", stdout=out
+        )
+        call_command("ticket_partitions", "list", stdout=out)
+
+        names = [
+            partitions.partition_name(this_month),
+            partitions.partition_name(partitions.add_months(this_month, 1)),
+        ]
+        for name in names:
+            self.assertIn(f"Created {name}", out.getvalue())
+            self.assertIn(name, partition_names())
@@ -0,0 +1,204 @@
+import os
+import tempfile
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station import jobs, tasks
+from station.models import Job, TimetableVersion
+from station.tests.test_journey_api import (
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+from station.timetable import (
+    DatabaseTimetable,
+    TimetableSnapshot,
+    get_timetable,
+    holder,
+)
+
+BOARD_URL = reverse("station:timetable-board")
+
+
+def timetable_url(journey_id):
+    return reverse("station:timetable-detail", args=[journey_id])
+
+
+class TimetableSnapshotTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "timetable.bin")
+        settings = override_settings(
+            TIMETABLE_SNAPSHOT={"PATH": self.path, "CHECK_INTERVAL": 0}
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(holder.reset)
+        holder.reset()
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("user@a.com", "pass")
+        self.client.force_authenticate(self.user)
+
+        self.lviv = sample_station(name="Lviv")
+        self.kyiv = sample_station(name="Kyiv")
+        self.route = sample_route(source=self.lviv, destination=self.kyiv)
+        self.back = sample_route(source=self.kyiv, destination=self.lviv)
+        self.train = sample_train(name="Hyundai")
+        self.late = sample_journey(
+            route=self.route,
+            train=self.train,
+            departure_time=datetime(2024, 9, 1, 18, 0),
+            arrival_time=datetime(2024, 9, 1, 23, 0),
+        )
+        self.early = sample_journey(
+            route=self.route,
+            train=self.train,
+            departure_time=datetime(2024, 9, 1, 8, 0),
+            arrival_time=datetime(2024, 9, 1, 13, 0),
+        )
+        self.returning = sample_journey(
+            route=self.back,
+            train=self.train,
+            departure_time=datetime(2024, 9, 1, 14, 0),
+            arrival_time=datetime(2024, 9, 1, 17, 0),
+        )
+
+    def compile(self):
+        call_command("compile_timetable", stdout=StringIO())
+
+    def test_snapshot_matches_database(self):
+        self.compile()
+        snapshot = TimetableSnapshot(self.path)
+        self.addCleanup(snapshot.close)
+        database = DatabaseTimetable()
+
+        self.assertEqual(len(snapshot), 3)
+        for journey in (self.late, self.early, self.returning):
+            self.assertEqual(
+                snapshot.journey(journey.id), database.journey(journey.id)
+            )
+        self.assertIsNone(snapshot.journey(self.returning.id + 100))
+
+        after = datetime(2024, 9, 1, 9, 0)
+        for station in (self.lviv, self.kyiv):
+            for arrivals in (False, True):
+                self.assertEqual(
+                    snapshot.board(station.id, after, 10, arrivals),
+                    database.board(station.id, after, 10, arrivals),
+                )
+
+    def test_board_is_sorted_and_limited(self):
+        self.compile()
+        snapshot = TimetableSnapshot(self.path)
+        self.addCleanup(snapshot.close)
+
+        rows = snapshot.board(self.lviv.id, datetime(2024, 9, 1), 10)
+        self.assertEqual(
+            [row["id"] for row in rows], [self.early.id, self.late.id]
+        )
+        rows = snapshot.board(self.lviv.id, datetime(2024, 9, 1), 1)
+        self.assertEqual([row["id"] for row in rows], [self.early.id])
+        self.assertEqual(
+            snapshot.board(self.lviv.id, datetime(2024, 9, 2), 10), []
+        )
+        self.assertEqual(rows[0]["route"], "Lviv - Kyiv")
+        self.assertEqual(rows[0]["train"], "Hyundai")
+
+    def test_stale_snapshot_falls_back_to_database(self):
+        self.compile()
+        self.assertIsInstance(get_timetable(), TimetableSnapshot)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.early.departure_time = datetime(2024, 9, 1, 7, 0)
+            self.early.save()
+        self.assertIsInstance(get_timetable(), DatabaseTimetable)
+
+        self.compile()
+        timetable = get_timetable()
+        self.assertIsInstance(timetable, TimetableSnapshot)
+        self.assertEqual(timetable.version, TimetableVersion.current())
+
+    def test_timetable_edit_queues_one_recompilation(self):
+        self.compile()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.early.departure_time = datetime(2024, 9, 1, 7, 0)
+            self.early.save()
+            self.late.delete()
+
+        queued = Job.objects.get(name=tasks.compile_timetable.job_name)
+        self.assertEqual(jobs.claim(10, "test"), [queued.id])
+        jobs.run(queued.id)
+        self.assertIsInstance(get_timetable(), TimetableSnapshot)
+
+    def test_board_endpoint(self):
+        self.compile()
+        res = self.client.get(
+            BOARD_URL,
+            {"station": self.kyiv.id, "after": "2024-09-01T00:00"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res["X-Timetable-Version"], str(TimetableVersion.current())
+        )
+        self.assertEqual(
+            res.data,
+            [
+                {
+                    "id": self.returning.id,
+                    "train": "Hyundai",
+                    "route": "Kyiv - Lviv",
+                    "departure_time": "2024-09-01 14:00:00",
+                    "arrival_time": "2024-09-01 17:00:00",
+                }
+            ],
+        )
+
+        res = self.client.get(
+            BOARD_URL,
+            {
+                "station": self.kyiv.id,
+                "after": "2024-09-01T00:00",
+                "arrivals": "true",
+            },
+        )
+        self.assertEqual(
+            [row["id"] for row in res.data], [self.early.id, self.late.id]
+        )
+
+    def test_board_endpoint_without_snapshot(self):
+        res = self.client.get(
+            BOARD_URL, {"station": self.lviv.id, "after": "2024-09-01"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["X-Timetable-Version"], "database")
+        self.assertEqual(len(res.data), 2)
+
+    def test_board_endpoint_validates_params(self):
+        res = self.client.get(BOARD_URL, {"after": "tomorrow"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("station", res.data)
+        self.assertIn("after", res.data)
+
+    def test_journey_endpoint(self):
+        self.compile()
+        res = self.client.get(timetable_url(self.late.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["departure_time"], "2024-09-01 18:00:00")
+
+        res = self.client.get(timetable_url(self.late.id + 100))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
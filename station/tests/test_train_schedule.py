@@ -0,0 +1,123 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Journey
+from station.tests.test_journey_api import (
+    sample_crew_member,
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+JOURNEY_URL = reverse("station:journey-list")
+
+
+def journey_detail_url(journey_id):
+    return reverse("station:journey-detail", args=[journey_id])
+
+
+def utilization_url(train_id):
+    return reverse("station:train-utilization", args=[train_id])
+
+
+class TrainScheduleTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@a.com", "pass", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        self.route = sample_route(
+            source=sample_station(name="Lviv"),
+            destination=sample_station(name="Kyiv"),
+        )
+        self.train = sample_train()
+        self.morning = self.journey(10, 14)
+
+    def journey(self, departure_hour, arrival_hour):
+        return sample_journey(
+            route=self.route,
+            train=self.train,
+            departure_time=datetime(2024, 9, 1, departure_hour, 0),
+            arrival_time=datetime(2024, 9, 1, arrival_hour, 0),
+        )
+
+    def create(self, departure, arrival):
+        return self.client.post(
+            JOURNEY_URL,
+            {
+                "route": self.route.id,
+                "train": self.train.id,
+                "departure_time": departure,
+                "arrival_time": arrival,
+                "crew_members": [sample_crew_member().id],
+            },
+            format="json",
+        )
+
+    def test_overlapping_journey_rejected(self):
+        res = self.create("2024-09-01 13:00:00", "2024-09-01 18:00:00")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(f"journey {self.morning.id}", res.data["train"][0])
+
+    def test_back_to_back_journey_created(self):
+        res = self.create("2024-09-01 14:00:00", "2024-09-01 18:00:00")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Journey.objects.filter(train=self.train).count(), 2)
+
+    def test_reschedule_into_overlap_rejected(self):
+        evening = self.journey(18, 22)
+
+        res = self.client.patch(
+            journey_detail_url(evening.id),
+            {"departure_time": "2024-09-01 12:00:00"},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_utilization_timeline(self):
+        # Overlaps written before validation existed still count once.
+        noon = self.journey(13, 18)
+
+        res = self.client.get(
+            utilization_url(self.train.id),
+            {"from": "2024-09-01", "to": "2024-09-01"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["busy_hours"], 8)
+        self.assertEqual(res.data["utilization"], 33.33)
+        self.assertEqual(
+            [
+                (interval["state"], interval["start"], interval["end"])
+                for interval in res.data["intervals"]
+            ],
+            [
+                ("idle", "2024-09-01 00:00:00", "2024-09-01 10:00:00"),
+                ("busy", "2024-09-01 10:00:00", "2024-09-01 18:00:00"),
+                ("idle", "2024-09-01 18:00:00", "2024-09-02 00:00:00"),
+            ],
+        )
+        self.assertEqual(
+            res.data["intervals"][1]["journeys"], [self.morning.id, noon.id]
+        )
+
+    def test_utilization_requires_staff(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "user@a.com", "pass", username="user"
+            )
+        )
+
+        res = self.client.get(utilization_url(self.train.id))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
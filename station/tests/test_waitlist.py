@@ -0,0 +1,150 @@
+import io
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Order, Ticket, WaitlistEntry
+from station.tests.test_journey_api import (
+    sample_journey,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+WAITLIST_URL = reverse("station:waitlist-list")
+
+
+def order_detail_url(order_id):
+    return reverse("station:order-detail", args=[order_id])
+
+
+def waitlist_detail_url(entry_id):
+    return reverse("station:waitlist-detail", args=[entry_id])
+
+
+class WaitlistTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@a.com", "pass", username="admin", is_staff=True
+        )
+        self.users = [
+            get_user_model().objects.create_user(
+                f"user{index}@a.com", "pass", username=f"user{index}"
+            )
+            for index in range(3)
+        ]
+        departure = datetime.now() + timedelta(days=7)
+        self.journey = sample_journey(
+            route=sample_route(
+                source=sample_station(name="Lviv"),
+                destination=sample_station(name="Kyiv"),
+            ),
+            train=sample_train(cargo_num=1, places_in_cargo=2),
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=8),
+        )
+        self.order = Order.objects.create(user=self.admin)
+        for seat in (1, 2):
+            Ticket.objects.create(
+                journey=self.journey,
+                order=self.order,
+                cargo_number=1,
+                seat_number=seat,
+            )
+
+    def join(self, user, seats=1):
+        self.client.force_authenticate(user)
+        return self.client.post(
+            WAITLIST_URL, {"journey": self.journey.id, "seats": seats}
+        )
+
+    def cancel_order(self):
+        self.client.force_authenticate(self.admin)
+        return self.client.delete(order_detail_url(self.order.id))
+
+    def test_join_sold_out_journey_returns_position(self):
+        first = self.join(self.users[0])
+        second = self.join(self.users[1])
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.data["position"], 1)
+        self.assertEqual(second.data["position"], 2)
+
+    def test_join_defaults_to_one_seat(self):
+        self.client.force_authenticate(self.users[0])
+
+        res = self.client.post(WAITLIST_URL, {"journey": self.journey.id})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["seats"], 1)
+
+    def test_join_twice_rejected(self):
+        self.join(self.users[0])
+
+        res = self.join(self.users[0])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_join_with_free_seats_rejected(self):
+        Ticket.objects.filter(seat_number=2).delete()
+
+        res = self.join(self.users[0])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cancelled_seats_promote_queue_in_order(self):
+        first = self.join(self.users[0]).data
+        second = self.join(self.users[1]).data
+        third = self.join(self.users[2]).data
+
+        res = self.cancel_order()
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        promoted = WaitlistEntry.objects.filter(promoted_at__isnull=False)
+        self.assertEqual(
+            sorted(promoted.values_list("id", flat=True)),
+            [first["id"], second["id"]],
+        )
+        self.assertEqual(
+            sorted(
+                Ticket.objects.filter(journey=self.journey).values_list(
+                    "order__user", flat=True
+                )
+            ),
+            [self.users[0].id, self.users[1].id],
+        )
+        self.client.force_authenticate(self.users[2])
+        res = self.client.get(waitlist_detail_url(third["id"]))
+        self.assertEqual(res.data["position"], 1)
+
+    def test_promotion_keeps_fifo_order(self):
+        self.join(self.users[0], seats=2)
+        self.join(self.users[1])
+        # Only seat 2 is freed, the head of the queue asked for two.
+        Ticket.objects.filter(seat_number=1).update(
+            order=Order.objects.create(user=self.admin)
+        )
+
+        self.cancel_order()
+
+        self.assertFalse(
+            WaitlistEntry.objects.filter(promoted_at__isnull=False).exists()
+        )
+
+    @override_settings(WAITLIST_PROMOTION="batch")
+    def test_batch_promotion(self):
+        self.join(self.users[0])
+        self.cancel_order()
+        self.assertEqual(WaitlistEntry.objects.waiting().count(), 1)
+
+        call_command("promote_waitlist", stdout=io.StringIO())
+
+        entry = WaitlistEntry.objects.get()
+        self.assertIsNotNone(entry.promoted_at)
+        self.assertEqual(entry.order.tickets.count(), 1)
@@ -0,0 +1,392 @@
+"""
+Memory-mapped timetable snapshot.
+
+``compile_timetable`` writes stations, routes, trains and journeys to one
+binary file: a small header, a JSON table of sections and one packed
+array per column, with names kept in a shared string table. Workers map
+the file read-only and read the columns through ``memoryview`` casts, so
+every process on a host shares the same page-cache pages and nothing is
+copied into Python objects until a row is actually served.
+
+The header carries the ``TimetableVersion`` the snapshot was compiled
+from. Timetable edits bump that version (see station.signals), and
+workers re-check it and the file at most every ``CHECK_INTERVAL``
+seconds: a replaced file is re-mapped, a stale snapshot is ignored and
+lookups fall back to the database until the snapshot is compiled again
+by the ``compile_timetable`` job the edit queued (see station.tasks).
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from station.models import Journey, Route, Station, TimetableVersion, Train
+
+MAGIC = b"TTBL"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIqqI")
+EPOCH = datetime(1970, 1, 1)
+DEFAULT_SETTINGS = {
+    "PATH": "/files/timetable/timetable.bin",
+    "CHECK_INTERVAL": 5,
+}
+
+
+def snapshot_settings():
+    options = getattr(settings, "TIMETABLE_SNAPSHOT", {})
+    return {**DEFAULT_SETTINGS, **options}
+
+
+def to_epoch(value):
+    if timezone.is_aware(value):
+        return int(value.timestamp())
+    return int((value - EPOCH).total_seconds())
+
+
+def from_epoch(seconds):
+    if settings.USE_TZ:
+        return datetime.fromtimestamp(seconds, tz=dt_timezone.utc)
+    return EPOCH + timedelta(seconds=seconds)
+
+
+class StringTable:
+    def __init__(self):
+        self.index = {}
+        self.offsets = array("I", [0])
+        self.data = bytearray()
+
+    def add(self, value):
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.offsets) - 1
+            self.data += value.encode()
+            self.offsets.append(len(self.data))
+        return position
+
+
+def compile_snapshot(path):
+    """Write a snapshot of the current timetable to ``path`` atomically"""
+    # Read first: changes made while compiling leave the snapshot stale.
+    version = TimetableVersion.current()
+    strings = StringTable()
+    columns = {}
+
+    stations = list(Station.objects.order_by("id").values_list("id", "name"))
+    station_index = {pk: position for position, (pk, _) in enumerate(stations)}
+    columns["stations.id"] = array("q", (pk for pk, _ in stations))
+    columns["stations.name"] = array(
+        "I", (strings.add(name) for _, name in stations)
+    )
+
+    routes = list(
+        Route.objects.order_by("id").values_list(
+            "id", "source_id", "destination_id", "distance"
+        )
+    )
+    route_index = {row[0]: position for position, row in enumerate(routes)}
+    columns["routes.id"] = array("q", (row[0] for row in routes))
+    columns["routes.source"] = array(
+        "I", (station_index[row[1]] for row in routes)
+    )
+    columns["routes.destination"] = array(
+        "I", (station_index[row[2]] for row in routes)
+    )
+    columns["routes.distance"] = array("i", (row[3] or 0 for row in routes))
+
+    trains = list(
+        Train.objects.order_by("id").values_list(
+            "id", "name", "cargo_num", "places_in_cargo", "train_type__name"
+        )
+    )
+    train_index = {row[0]: position for position, row in enumerate(trains)}
+    columns["trains.id"] = array("q", (row[0] for row in trains))
+    columns["trains.name"] = array(
+        "I", (strings.add(row[1]) for row in trains)
+    )
+    columns["trains.cargo_num"] = array("i", (row[2] for row in trains))
+    columns["trains.places_in_cargo"] = array("i", (row[3] for row in trains))
+    columns["trains.train_type"] = array(
+        "I", (strings.add(row[4]) for row in trains)
+    )
+
+    journey_columns = [array("q"), array("q"), array("q"), array("I")]
+    journey_columns.append(array("I"))
+    for pk, departure, arrival, route_id, train_id in (
+        Journey.objects.order_by("id")
+        .values_list(
+            "id", "departure_time", "arrival_time", "route_id", "train_id"
+        )
+        .iterator(chunk_size=10000)
+    ):
+        journey_columns[0].append(pk)
+        journey_columns[1].append(to_epoch(departure))
+        journey_columns[2].append(to_epoch(arrival))
+        journey_columns[3].append(route_index[route_id])
+        journey_columns[4].append(train_index[train_id])
+    for name, column in zip(
+        ("id", "departure", "arrival", "route", "train"), journey_columns
+    ):
+        columns[f"journeys.{name}"] = column
+
+    # Per-station boards: journey positions grouped by station (CSR
+    # offsets) and sorted by time within each station.
+    for board, station_column, time_column in (
+        ("departures", "routes.source", "journeys.departure"),
+        ("arrivals", "routes.destination", "journeys.arrival"),
+    ):
+        station_of = columns[station_column]
+        times = columns[time_column]
+        route_of = columns["journeys.route"]
+        order = sorted(
+            range(len(times)),
+            key=lambda position: (
+                station_of[route_of[position]],
+                times[position],
+            ),
+        )
+        counts = [0] * (len(stations) + 1)
+        for position in order:
+            counts[station_of[route_of[position]] + 1] += 1
+        for station in range(len(stations)):
+            counts[station + 1] += counts[station]
+        columns[f"{board}.order"] = array("I", order)
+        columns[f"{board}.offsets"] = array("I", counts)
+
+    columns["strings.offsets"] = strings.offsets
+    columns["strings.data"] = array("B", bytes(strings.data))
+
+    write_snapshot(path, version, columns)
+    return version, len(journey_columns[0])
+
+
+def write_snapshot(path, version, columns):
+    sections, offset = {}, 0
+    for name, column in columns.items():
+        offset += -offset % 8
+        sections[name] = [offset, len(column), column.typecode]
+        offset += len(column) * column.itemsize
+    table = json.dumps(sections).encode()
+    start = HEADER.size + len(table)
+    start += -start % 8
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(
+                HEADER.pack(
+                    MAGIC,
+                    FORMAT_VERSION,
+                    version,
+                    int(time.time()),
+                    len(table),
+                )
+            )
+            file.write(table)
+            file.write(b"\0" * (start - file.tell()))
+            for name, column in columns.items():
+                file.write(b"\0" * (start + sections[name][0] - file.tell()))
+                column.tofile(file)
+            file.flush()
+            os.fsync(file.fileno())
+        # Readers keep their old mapping until they notice the new file.
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class TimetableSnapshot:
+    """Read-only view of a compiled snapshot file"""
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            self.file_id = (stat.st_ino, stat.st_mtime_ns)
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, format_version, version, created, table_size = (
+            HEADER.unpack_from(self._map)
+        )
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a timetable snapshot")
+        self.version = version
+        self.created_at = created
+        table = self._map[HEADER.size:HEADER.size + table_size]
+        start = HEADER.size + table_size
+        start += -start % 8
+
+        view = memoryview(self._map)
+        self.columns = {}
+        for name, (offset, length, typecode) in json.loads(table).items():
+            size = struct.calcsize(typecode)
+            begin = start + offset
+            self.columns[name] = view[begin:begin + length * size].cast(
+                typecode
+            )
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return len(self["journeys.id"])
+
+    def string(self, position):
+        offsets = self["strings.offsets"]
+        data = self["strings.data"]
+        return bytes(data[offsets[position]:offsets[position + 1]]).decode()
+
+    def station_position(self, station_id):
+        ids = self["stations.id"]
+        position = bisect_left(ids, station_id)
+        if position < len(ids) and ids[position] == station_id:
+            return position
+        return None
+
+    def journey_row(self, position):
+        route = self["journeys.route"][position]
+        source = self["routes.source"][route]
+        destination = self["routes.destination"][route]
+        train = self["journeys.train"][position]
+        return {
+            "id": self["journeys.id"][position],
+            "train": self.string(self["trains.name"][train]),
+            "route": (
+                f"{self.string(self['stations.name'][source])} - "
+                f"{self.string(self['stations.name'][destination])}"
+            ),
+            "departure_time": from_epoch(self["journeys.departure"][position]),
+            "arrival_time": from_epoch(self["journeys.arrival"][position]),
+        }
+
+    def journey(self, journey_id):
+        ids = self["journeys.id"]
+        position = bisect_left(ids, journey_id)
+        if position < len(ids) and ids[position] == journey_id:
+            return self.journey_row(position)
+        return None
+
+    def board(self, station_id, after, limit, arrivals=False):
+        """Journeys leaving (or reaching) a station at or after ``after``"""
+        station = self.station_position(station_id)
+        if station is None:
+            return []
+        name = "arrivals" if arrivals else "departures"
+        times = self["journeys.arrival" if arrivals else "journeys.departure"]
+        order = self[f"{name}.order"]
+        offsets = self[f"{name}.offsets"]
+        low, high = offsets[station], offsets[station + 1]
+        first = bisect_left(
+            order,
+            to_epoch(after),
+            low,
+            high,
+            key=lambda position: times[position],
+        )
+        return [
+            self.journey_row(order[index])
+            for index in range(first, min(first + limit, high))
+        ]
+
+    def close(self):
+        self.columns.clear()
+        self._map.close()
+
+
+class DatabaseTimetable:
+    """Same lookups as ``TimetableSnapshot``, answered by the database"""
+
+    version = None
+
+    @staticmethod
+    def journeys():
+        return Journey.objects.select_related(
+            "route__source", "route__destination", "train"
+        )
+
+    @staticmethod
+    def journey_row(journey):
+        return {
+            "id": journey.id,
+            "train": journey.train.name,
+            "route": str(journey.route),
+            "departure_time": journey.departure_time,
+            "arrival_time": journey.arrival_time,
+        }
+
+    def journey(self, journey_id):
+        journey = self.journeys().filter(pk=journey_id).first()
+        return self.journey_row(journey) if journey else None
+
+    def board(self, station_id, after, limit, arrivals=False):
+        if arrivals:
+            journeys = self.journeys().filter(
+                route__destination_id=station_id, arrival_time__gte=after
+            ).order_by("arrival_time", "id")
+        else:
+            journeys = self.journeys().filter(
+                route__source_id=station_id, departure_time__gte=after
+            ).order_by("departure_time", "id")
+        return [self.journey_row(journey) for journey in journeys[:limit]]
+
+
+class SnapshotHolder:
+    """Per-process handle that re-maps the snapshot when it is replaced"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = None
+        self._current_version = None
+
+    def refresh(self):
+        options = snapshot_settings()
+        try:
+            stat = os.stat(options["PATH"])
+        except FileNotFoundError:
+            self._snapshot = None
+        else:
+            file_id = (stat.st_ino, stat.st_mtime_ns)
+            if self._snapshot is None or self._snapshot.file_id != file_id:
+                # The previous mapping is released once no request uses it.
+                self._snapshot = TimetableSnapshot(options["PATH"])
+        self._current_version = TimetableVersion.current()
+        self._checked_at = time.monotonic()
+
+    def get(self):
+        """The mapped snapshot if it matches the timetable, else None"""
+        interval = snapshot_settings()["CHECK_INTERVAL"]
+        with self._lock:
+            if (
+                self._checked_at is None
+                or time.monotonic() - self._checked_at >= interval
+            ):
+                self.refresh()
+            snapshot = self._snapshot
+            if snapshot is not None and (
+                snapshot.version == self._current_version
+            ):
+                return snapshot
+        return None
+
+    def reset(self):
+        with self._lock:
+            self._snapshot = None
+            self._checked_at = None
+
+
+holder = SnapshotHolder()
+
+
+def get_timetable():
+    return holder.get() or DatabaseTimetable()
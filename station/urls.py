@@ -9,6 +9,10 @@ from station.views import (
     CrewMemberViewSet,
     JourneyViewSet,
     OrderViewSet,
+    OccupancyViewSet,
+    WaitlistViewSet,
+    TimetableViewSet,
+    BookingRequestViewSet,
 )
 
 router = routers.DefaultRouter()
@@ -19,6 +23,12 @@ router.register("routes", RouteViewSet)
 router.register("crew_members", CrewMemberViewSet)
 router.register("journeys", JourneyViewSet)
 router.register("orders", OrderViewSet)
+router.register("timetable", TimetableViewSet, basename="timetable")
+router.register("waitlist", WaitlistViewSet, basename="waitlist")
+router.register("bookings", BookingRequestViewSet, basename="booking")
+router.register(
+    "analytics/occupancy", OccupancyViewSet, basename="occupancy"
+)
 
 
 urlpatterns = [path("", include(router.urls))]
@@ -1,16 +1,20 @@
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
 
-from django.db.models import Count, F
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     extend_schema,
     OpenApiParameter,
     extend_schema_view,
 )
+from django.db import transaction
+from django.db.models import Sum
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAdminUser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
@@ -22,7 +26,21 @@ from station.models import (
     CrewMember,
     Journey,
     Order,
+    ArchivedOrder,
+    ArchivedTicket,
+    DailyOccupancy,
+    WaitlistEntry,
+    BookingRequest,
 )
+from station import boards, search_cache, waitlist
+from station.schedule import utilization_timeline
+from station.timetable import get_timetable
+from station.archive import OrderHistory
+from station.idempotency import IdempotentCreateMixin
+from station.booking import QueuedCreateMixin
+from station.fieldsets import SparseFieldsetsViewMixin
+from station.multiget import IDS_PARAMETER, MultiGetMixin
+from station.pagination import EstimatedCountPagination
 from station.permissions import IsAdminOrIfAuthenticatedReadOnly
 from station.serializers import (
     TrainTypeSerializer,
@@ -39,11 +57,52 @@ from station.serializers import (
     CrewMemberListSerializer,
     CrewMemberDetailSerializer,
     CrewMemberImageSerializer,
+    CrewRosterSerializer,
+    TrainUtilizationSerializer,
     JourneyListSerializer,
     JourneyDetailSerializer,
     OrderListSerializer,
+    ArchivedOrderSerializer,
+    ArchivedTicketSerializer,
+    OccupancySerializer,
+    WaitlistEntrySerializer,
+    TimetableEntrySerializer,
+    BookingRequestSerializer,
 )
 
+MAX_WINDOW_DAYS = 366
+BOARD_LIMIT_PARAMETER = OpenApiParameter(
+    "limit",
+    type=OpenApiTypes.INT,
+    description="Number of journeys, 10 by default (ex. ?limit=20)",
+)
+
+
+def day_window(query_params, default_days):
+    """
+    ``[start, end)`` datetimes covering the ``from``/``to`` days (both
+    inclusive). Defaults to ``default_days`` days starting today.
+    """
+    days = {}
+    for name in ("from", "to"):
+        value = query_params.get(name)
+        if not value:
+            continue
+        try:
+            days[name] = datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise ValidationError({name: "Use the YYYY-MM-DD format."})
+
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = days.get("from", today)
+    end = days.get("to", start + timedelta(days=default_days - 1))
+    end += timedelta(days=1)
+    if not start < end <= start + timedelta(days=MAX_WINDOW_DAYS):
+        raise ValidationError(
+            {"to": f"Use a range of 1 to {MAX_WINDOW_DAYS} days."}
+        )
+    return start, end
+
 
 @extend_schema_view(
     list=extend_schema(description="Get a list of all train types"),
@@ -57,6 +116,8 @@ class TrainTypeViewSet(
     queryset = TrainType.objects.all()
     serializer_class = TrainTypeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    token_claims_authentication = True
+    read_from_replicas = True
 
 
 @extend_schema_view(
@@ -64,6 +125,7 @@ class TrainTypeViewSet(
     create=extend_schema(description="Create new train"),
 )
 class TrainViewSet(
+    SparseFieldsetsViewMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
@@ -71,10 +133,56 @@ class TrainViewSet(
     queryset = Train.objects.all()
     serializer_class = TrainSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    token_claims_authentication = True
+    read_from_replicas = True
+
+    def get_serializer_class(self):
+        if self.action == "utilization":
+            return TrainUtilizationSerializer
+        return TrainSerializer
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "from",
+                type=OpenApiTypes.DATE,
+                description="First day of the window, defaults to today "
+                            "(ex. ?from=2024-08-01)",
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.DATE,
+                description="Last day of the window, defaults to 7 days "
+                            "after from (ex. ?to=2024-08-07)",
+            ),
+        ]
+    )
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="utilization",
+        permission_classes=[IsAdminUser],
+    )
+    def utilization(self, request, pk=None):
+        """Busy and idle intervals of a train and its utilization in %"""
+        train = self.get_object()
+        start, end = day_window(request.query_params, default_days=7)
+        journeys = (
+            Journey.objects.filter(train=train)
+            .overlapping(start, end)
+            .order_by("departure_time")
+            .values_list("id", "departure_time", "arrival_time")
+        )
+        timeline = utilization_timeline(journeys, start, end)
+        serializer = self.get_serializer({"train": train.id, **timeline})
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @extend_schema_view(
-    list=extend_schema(description="Get a list of all train stations"),
+    list=extend_schema(
+        description="Get a list of all train stations",
+        parameters=[IDS_PARAMETER],
+    ),
     create=extend_schema(description="Create new train station"),
     retrieve=extend_schema(
         description="Get info about a train station with a given id number"
@@ -89,6 +197,8 @@ class TrainViewSet(
     ),
 )
 class StationViewSet(
+    SparseFieldsetsViewMixin,
+    MultiGetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -97,6 +207,9 @@ class StationViewSet(
 ):
     queryset = Station.objects.all()
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    token_claims_authentication = True
+    read_from_replicas = True
+    multi_get_serializer_class = StationDetailSerializer
 
     @action(
         methods=["POST"],
@@ -115,17 +228,63 @@ class StationViewSet(
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def station_board(self, request, pk, board):
+        if not pk.isdigit():
+            raise NotFound()
+        options = boards.board_settings()
+        limit = request.query_params.get("limit", options["DEFAULT_LIMIT"])
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValidationError({"limit": "Expected a number."})
+        if not 0 < limit <= options["MAX_LIMIT"]:
+            raise ValidationError(
+                {"limit": f"Expected 1 to {options['MAX_LIMIT']}."}
+            )
+        if not Station.objects.filter(pk=pk).exists():
+            raise NotFound()
+        rows = boards.get_board(
+            int(pk),
+            board,
+            limit,
+            lambda journeys: self.get_serializer(journeys, many=True).data,
+            shape=urlencode(
+                sorted(
+                    (name, request.query_params[name])
+                    for name in ("fields", "omit", "expand")
+                    if name in request.query_params
+                )
+            ),
+        )
+        return Response(rows)
+
+    @extend_schema(parameters=[BOARD_LIMIT_PARAMETER])
+    @action(methods=["GET"], detail=True)
+    def departures(self, request, pk=None):
+        """Get the next journeys leaving the station"""
+        return self.station_board(request, pk, boards.DEPARTURES)
+
+    @extend_schema(parameters=[BOARD_LIMIT_PARAMETER])
+    @action(methods=["GET"], detail=True)
+    def arrivals(self, request, pk=None):
+        """Get the next journeys arriving at the station"""
+        return self.station_board(request, pk, boards.ARRIVALS)
+
     def get_serializer_class(self):
         if self.action == "upload_image":
             return StationImageSerializer
         if self.action == "retrieve":
             return StationDetailSerializer
+        if self.action in ("departures", "arrivals"):
+            return JourneyListSerializer
 
         return StationListSerializer
 
 
 @extend_schema_view(
-    list=extend_schema(description="Get a list of all routes"),
+    list=extend_schema(
+        description="Get a list of all routes", parameters=[IDS_PARAMETER]
+    ),
     create=extend_schema(description="Create new route"),
     retrieve=extend_schema(
         description="Get info about route with a given id number"
@@ -138,6 +297,8 @@ class StationViewSet(
     ),
 )
 class RouteViewSet(
+    SparseFieldsetsViewMixin,
+    MultiGetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -146,6 +307,9 @@ class RouteViewSet(
 ):
     queryset = Route.objects.all()
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    token_claims_authentication = True
+    read_from_replicas = True
+    multi_get_serializer_class = RouteDetailSerializer
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -170,6 +334,7 @@ class RouteViewSet(
     ),
 )
 class CrewMemberViewSet(
+    SparseFieldsetsViewMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -178,10 +343,14 @@ class CrewMemberViewSet(
 ):
     queryset = CrewMember.objects.all()
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    token_claims_authentication = True
+    read_from_replicas = True
 
     def get_serializer_class(self):
         if self.action == "upload_image":
             return CrewMemberImageSerializer
+        if self.action == "roster":
+            return CrewRosterSerializer
         if self.action == "list":
             return CrewMemberListSerializer
         if self.action in ["retrieve", "update"]:
@@ -205,6 +374,44 @@ class CrewMemberViewSet(
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "from",
+                type=OpenApiTypes.DATE,
+                description="First day of the roster, defaults to today "
+                            "(ex. ?from=2024-08-01)",
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.DATE,
+                description="Last day of the roster, defaults to 30 days "
+                            "after from (ex. ?to=2024-08-31)",
+            ),
+        ]
+    )
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="roster",
+        permission_classes=[IsAdminUser],
+    )
+    def roster(self, request, pk=None):
+        """Journeys of a crew member that overlap a range of days"""
+        crew_member = self.get_object()
+        start, end = day_window(request.query_params, default_days=30)
+        assignments = (
+            crew_member.assignments.overlapping(start, end)
+            .select_related(
+                "journey__route__source",
+                "journey__route__destination",
+                "journey__train",
+            )
+            .order_by("departure_time")
+        )
+        serializer = self.get_serializer(assignments, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
 
 @extend_schema_view(
     create=extend_schema(description="Create new journey"),
@@ -217,23 +424,19 @@ class CrewMemberViewSet(
     ),
 )
 class JourneyViewSet(
+    SparseFieldsetsViewMixin,
+    MultiGetMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
     viewsets.GenericViewSet,
 ):
-    queryset = (
-        Journey.objects.all()
-        .select_related("route", "train")
-        .annotate(
-            tickets_available=(
-                F("train__places_in_cargo") * F("train__cargo_num")
-                - Count("tickets")
-            )
-        )
-    )
+    queryset = Journey.objects.order_by("id")
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    token_claims_authentication = True
+    read_from_replicas = True
+    multi_get_serializer_class = JourneyDetailSerializer
 
     def get_queryset(self):
         arrival_date = self.request.query_params.get("arrival")
@@ -242,6 +445,8 @@ class JourneyViewSet(
         source = self.request.query_params.get("from")
 
         queryset = self.queryset
+        if self.action == "list":
+            queryset = queryset.with_tickets_available()
 
         if arrival_date:
             date = datetime.strptime(arrival_date, "%Y-%m-%d").date()
@@ -259,7 +464,7 @@ class JourneyViewSet(
         if source:
             queryset = queryset.filter(route__source__name__icontains=source)
 
-        return queryset
+        return self.optimize(queryset)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -291,21 +496,164 @@ class JourneyViewSet(
                 type=OpenApiTypes.STR,
                 description="Filter by source station (ex. ?from=kh)",
             ),
+            IDS_PARAMETER,
         ]
     )
     def list(self, request, *args, **kwargs):
         """Get a list of journeys"""
-        return super().list(request, *args, **kwargs)
+        if self.is_multi_get() or not search_cache.is_enabled():
+            return super().list(request, *args, **kwargs)
+        journey_ids = search_cache.get_or_search(
+            search_cache.normalize(request.query_params), self.search
+        )
+        if journey_ids == search_cache.TOO_MANY:
+            return super().list(request, *args, **kwargs)
+
+        page = self.paginate_queryset(journey_ids)
+        if page is not None:
+            journey_ids = page
+        # Availability changes with every sale, it is read for the page.
+        journeys = self.optimize(
+            Journey.objects.with_tickets_available()
+        ).in_bulk(journey_ids)
+        results = [
+            journeys[journey_id]
+            for journey_id in journey_ids
+            if journey_id in journeys
+        ]
+        serializer = self.get_serializer(results, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    def search(self):
+        """Ids of the matching journeys, ``TOO_MANY`` past ``MAX_ROWS``"""
+        limit = search_cache.cache_settings()["MAX_ROWS"]
+        journey_ids = list(
+            self.get_queryset().values_list("id", flat=True)[: limit + 1]
+        )
+        if len(journey_ids) > limit:
+            return search_cache.TOO_MANY
+        return journey_ids
+
+
+class TimetableViewSet(viewsets.GenericViewSet):
+    """Read-only lookups served from the compiled timetable snapshot"""
+
+    serializer_class = TimetableEntrySerializer
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    token_claims_authentication = True
+    read_from_replicas = True
+    MAX_LIMIT = 100
+
+    @staticmethod
+    def timetable_response(timetable, data):
+        response = Response(data)
+        response["X-Timetable-Version"] = (
+            "database" if timetable.version is None else timetable.version
+        )
+        return response
+
+    def retrieve(self, request, pk=None):
+        """Get a journey by id"""
+        try:
+            journey_id = int(pk)
+        except ValueError:
+            raise NotFound()
+        timetable = get_timetable()
+        row = timetable.journey(journey_id)
+        if row is None:
+            raise NotFound()
+        return self.timetable_response(
+            timetable, self.get_serializer(row).data
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "station",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Station id (ex. ?station=3)",
+            ),
+            OpenApiParameter(
+                "after",
+                type=OpenApiTypes.DATETIME,
+                description="Earliest time, defaults to now "
+                            "(ex. ?after=2024-08-24T10:00)",
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description="Journeys to return, at most 100 (ex. ?limit=20)",
+            ),
+            OpenApiParameter(
+                "arrivals",
+                type=OpenApiTypes.BOOL,
+                description="Arrivals instead of departures "
+                            "(ex. ?arrivals=true)",
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False)
+    def board(self, request):
+        """Get the next departures (or arrivals) of a station"""
+        params = request.query_params
+        errors = {}
+        try:
+            station_id = int(params.get("station", ""))
+        except ValueError:
+            errors["station"] = "Expected a station id."
+        try:
+            after = (
+                datetime.fromisoformat(params["after"])
+                if params.get("after")
+                else datetime.now()
+            )
+        except ValueError:
+            errors["after"] = "Expected an ISO 8601 datetime."
+        try:
+            limit = min(int(params.get("limit", 20)), self.MAX_LIMIT)
+        except ValueError:
+            errors["limit"] = "Expected a number."
+        if errors:
+            raise ValidationError(errors)
+
+        timetable = get_timetable()
+        rows = timetable.board(
+            station_id,
+            after,
+            max(limit, 0),
+            arrivals=params.get("arrivals", "").lower() in ("1", "true"),
+        )
+        return self.timetable_response(
+            timetable, self.get_serializer(rows, many=True).data
+        )
 
 
-class OrderPagination(PageNumberPagination):
+class OrderPagination(EstimatedCountPagination):
     page_size = 10
     max_page_size = 100
 
 
 @extend_schema_view(
     list=extend_schema(description="List of all orders"),
-    create=extend_schema(description="Create a new order"),
+    create=extend_schema(
+        description="Create a new order. Retries sent with the same "
+                    "Idempotency-Key header get the first response back. "
+                    "With queued intake the order is booked in the "
+                    "background: the response is 202 with the URL of "
+                    "its booking status",
+        responses={201: OrderSerializer, 202: BookingRequestSerializer},
+        parameters=[
+            OpenApiParameter(
+                "Idempotency-Key",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.HEADER,
+                description="Unique key of this order attempt",
+            ),
+        ],
+    ),
     retrieve=extend_schema(description="Get an order with given id number"),
     update=extend_schema(
         description="Update all info of an order with given id number"
@@ -317,15 +665,18 @@ class OrderPagination(PageNumberPagination):
         description="Delete info of an order with given id number"
     ),
 )
-class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.prefetch_related(
-        "tickets__journey__route", "tickets__journey__train"
-    )
+class OrderViewSet(
+    SparseFieldsetsViewMixin,
+    IdempotentCreateMixin,
+    QueuedCreateMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Order.objects.all()
     pagination_class = OrderPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        return self.optimize(self.queryset.filter(user=self.request.user))
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -335,3 +686,243 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    def perform_destroy(self, instance):
+        """Delete the order and hand its seats to waitlisted users"""
+        with transaction.atomic():
+            freed = defaultdict(list)
+            for journey_id, cargo_number, seat_number in (
+                instance.tickets.values_list(
+                    "journey_id", "cargo_number", "seat_number"
+                )
+            ):
+                freed[journey_id].append((cargo_number, seat_number))
+            instance.delete()
+            if waitlist.inline_promotion():
+                waitlist.release_seats(freed)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "include_archived",
+                type=OpenApiTypes.BOOL,
+                description="Also list orders of archived journeys and "
+                            "the archived tickets of active orders "
+                            "(ex. ?include_archived=true)",
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        """Get a list of orders, optionally including archived ones"""
+        if request.query_params.get("include_archived") not in (
+            "1",
+            "true",
+        ):
+            return super().list(request, *args, **kwargs)
+
+        history = OrderHistory(
+            self.filter_queryset(self.get_queryset()),
+            ArchivedOrder.objects.filter(user=request.user),
+        )
+        page = self.paginate_queryset(history)
+
+        # Orders with active tickets stay live, their departed tickets
+        # are archived on their own.
+        tickets = defaultdict(list)
+        for ticket in ArchivedTicket.objects.filter(
+            order_id__in=[order.id for order in page]
+        ).select_related("journey"):
+            tickets[ticket.order_id].append(ticket)
+
+        data = []
+        for order in page:
+            if isinstance(order, ArchivedOrder):
+                order.archived_tickets = tickets[order.id]
+                data.append(ArchivedOrderSerializer(order).data)
+            else:
+                item = OrderListSerializer(
+                    order, context=self.get_serializer_context()
+                ).data
+                item["archived_tickets"] = ArchivedTicketSerializer(
+                    tickets[order.id], many=True
+                ).data
+                data.append(item)
+        return self.get_paginated_response(data)
+
+
+@extend_schema_view(
+    list=extend_schema(description="List of your waitlist entries"),
+    create=extend_schema(
+        description="Join the waitlist of a sold-out journey"
+    ),
+    retrieve=extend_schema(
+        description="Get a waitlist entry with its queue position"
+    ),
+    destroy=extend_schema(description="Leave a waitlist"),
+)
+class WaitlistViewSet(
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    GenericViewSet,
+):
+    serializer_class = WaitlistEntrySerializer
+    pagination_class = OrderPagination
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return WaitlistEntry.objects.filter(
+            user=self.request.user
+        ).with_position()
+
+    def perform_create(self, serializer):
+        entry = serializer.save(user=self.request.user)
+        entry.position = (
+            WaitlistEntry.objects.with_position()
+            .values_list("position", flat=True)
+            .get(pk=entry.pk)
+        )
+
+
+class BookingRequestViewSet(mixins.RetrieveModelMixin, GenericViewSet):
+    """Status of an order accepted with queued intake"""
+
+    queryset = BookingRequest.objects.all()
+    serializer_class = BookingRequestSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user)
+
+
+class OccupancyPagination(PageNumberPagination):
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = "page_size"
+
+
+class OccupancyViewSet(mixins.ListModelMixin, GenericViewSet):
+    """Load factor analytics read from pre-aggregated daily rows"""
+
+    queryset = DailyOccupancy.objects.all()
+    serializer_class = OccupancySerializer
+    pagination_class = OccupancyPagination
+    permission_classes = (IsAdminUser,)
+
+    GROUPS = {"day": "day", "route": "route_id", "train_type": "train_type_id"}
+
+    def parse_date(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise ValidationError({name: "Use the YYYY-MM-DD format."})
+
+    def parse_ids(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return [int(str_id) for str_id in value.split(",")]
+        except ValueError:
+            raise ValidationError({name: "Use comma separated ids."})
+
+    def get_group_by(self):
+        value = self.request.query_params.get("group_by", "day,route")
+        groups = [group for group in value.split(",") if group]
+        unknown = set(groups) - set(self.GROUPS)
+        if unknown:
+            raise ValidationError(
+                {"group_by": f"Unknown groups: {', '.join(sorted(unknown))}"}
+            )
+        return list(dict.fromkeys(groups))
+
+    def get_queryset(self):
+        queryset = self.queryset
+        since = self.parse_date("from")
+        until = self.parse_date("to")
+        routes = self.parse_ids("route")
+        train_types = self.parse_ids("train_type")
+
+        if since:
+            queryset = queryset.filter(day__gte=since)
+        if until:
+            queryset = queryset.filter(day__lte=until)
+        if routes:
+            queryset = queryset.filter(route_id__in=routes)
+        if train_types:
+            queryset = queryset.filter(train_type_id__in=train_types)
+        return queryset
+
+    @staticmethod
+    def totals():
+        return {
+            "journey_count": Sum("journeys"),
+            "seat_count": Sum("seats"),
+            "ticket_count": Sum("tickets_sold"),
+        }
+
+    def to_item(self, row, groups):
+        item = {group: row[self.GROUPS[group]] for group in groups}
+        seats = row["seat_count"] or 0
+        tickets = row["ticket_count"] or 0
+        item.update(
+            journeys=row["journey_count"] or 0,
+            seats=seats,
+            tickets_sold=tickets,
+            load_factor=round(tickets / seats, 4) if seats else 0.0,
+        )
+        return item
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "from",
+                type=OpenApiTypes.DATE,
+                description="First departure day (ex. ?from=2024-08-01)",
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.DATE,
+                description="Last departure day (ex. ?to=2024-08-31)",
+            ),
+            OpenApiParameter(
+                "route",
+                type=OpenApiTypes.STR,
+                description="Filter by route ids (ex. ?route=1,2)",
+            ),
+            OpenApiParameter(
+                "train_type",
+                type=OpenApiTypes.STR,
+                description="Filter by train type ids (ex. ?train_type=3)",
+            ),
+            OpenApiParameter(
+                "group_by",
+                type=OpenApiTypes.STR,
+                description="Comma separated subset of day, route and "
+                            "train_type, empty for a single total "
+                            "(ex. ?group_by=day,train_type)",
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        """Get journeys, seats, sold tickets and load factor per group"""
+        groups = self.get_group_by()
+        queryset = self.get_queryset()
+        if not groups:
+            row = queryset.aggregate(**self.totals())
+            return Response(self.get_serializer(self.to_item(row, [])).data)
+
+        columns = [self.GROUPS[group] for group in groups]
+        page = self.paginate_queryset(
+            queryset.values(*columns)
+            .annotate(**self.totals())
+            .order_by(*columns)
+        )
+        serializer = self.get_serializer(
+            [self.to_item(row, groups) for row in page], many=True
+        )
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,106 @@
+"""
+FIFO waitlists of sold-out journeys.
+
+Seats freed by a cancelled order go to the oldest waiting entries of their
+journey. ``promote`` reads at most one entry per freed seat from the
+partial (journey, id) index of waiting entries, so a cancellation costs
+O(freed seats) however long the queue is. With ``WAITLIST_PROMOTION`` set
+to ``"batch"`` cancellations leave the queue alone and the
+``promote_waitlist`` command hands out every free seat instead.
+"""
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from station.models import Journey, Order, Ticket, WaitlistEntry
+
+
+def inline_promotion():
+    return getattr(settings, "WAITLIST_PROMOTION", "inline") == "inline"
+
+
+def free_seats(journey):
+    """Every (cargo, seat) of the journey without a ticket, in seat order"""
+    taken = set(
+        journey.taken_tickets.values_list("cargo_number", "seat_number")
+    )
+    return [
+        (cargo, seat)
+        for cargo in range(1, journey.train.cargo_num + 1)
+        for seat in range(1, journey.train.places_in_cargo + 1)
+        if (cargo, seat) not in taken
+    ]
+
+
+def promote(journey, seats):
+    """
+    Book ``seats`` for the head of the journey's queue and return the
+    promoted entries. Entries are served strictly in order: promotion stops
+    at the first one asking for more seats than are left.
+    """
+    seats = sorted(seats)
+    now = timezone.now()
+    if not seats or journey.departure_time <= now:
+        return []
+
+    promoted = []
+    with transaction.atomic():
+        entries = (
+            WaitlistEntry.objects.waiting()
+            .filter(journey=journey)
+            .select_for_update()
+            .order_by("id")[:len(seats)]
+        )
+        for entry in entries:
+            if entry.seats > len(seats):
+                break
+            allocated, seats = seats[:entry.seats], seats[entry.seats:]
+            try:
+                with transaction.atomic():
+                    order = Order.objects.create(user_id=entry.user_id)
+                    for cargo_number, seat_number in allocated:
+                        Ticket.objects.create(
+                            journey=journey,
+                            order=order,
+                            cargo_number=cargo_number,
+                            seat_number=seat_number,
+                        )
+            except (IntegrityError, ValidationError):
+                # A direct booking took the seats first.
+                break
+            entry.order = order
+            entry.promoted_at = now
+            entry.save(update_fields=["order", "promoted_at"])
+            promoted.append(entry)
+    return promoted
+
+
+def release_seats(freed):
+    """Offer freed seats, a {journey id: [(cargo, seat)]} map, to queues"""
+    journeys = Journey.objects.filter(
+        id__in=WaitlistEntry.objects.waiting()
+        .filter(journey_id__in=list(freed))
+        .values("journey")
+    ).select_related("train")
+    promoted = []
+    for journey in journeys:
+        promoted += promote(journey, freed[journey.id])
+    return promoted
+
+
+def promote_waitlists(batch_size=100):
+    """Hand every free seat of upcoming journeys to their queues"""
+    journeys = (
+        Journey.objects.filter(
+            departure_time__gt=timezone.now(),
+            id__in=WaitlistEntry.objects.waiting().values("journey"),
+        )
+        .select_related("train")
+        .order_by("id")
+    )
+    promoted = []
+    for journey in journeys.iterator(chunk_size=batch_size):
+        promoted += promote(journey, free_seats(journey))
+    return promoted
@@ -11,6 +11,17 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from train_service.db.pool import warm_pools
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "train_service.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up: journey availability streams are served
+# next to Django, everything else goes to it.
+from station.streams import AvailabilityStream  # noqa: E402
+
+application = AvailabilityStream(django_application)
+
+# Every worker imports this module, each fills its own connection pool.
+warm_pools()
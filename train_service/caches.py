@@ -0,0 +1,18 @@
+"""
+Whether the default cache is shared between worker processes.
+
+Entries that must be invalidated everywhere (cached users, search
+generation counters) only work with a shared backend such as Redis
+(``REDIS_URL``); LocMem, the default, keeps one copy per process.
+"""
+
+from django.conf import settings
+
+LOCAL_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def is_shared(alias="default"):
+    return settings.CACHES[alias]["BACKEND"] not in LOCAL_BACKENDS
@@ -0,0 +1,128 @@
+"""
+PostgreSQL backend that takes connections from a process-wide pool.
+
+Django opens a connection per request and closes it when the request ends;
+with this backend "close" returns the connection to a bounded pool, so the
+next request skips the TCP/TLS/authentication handshake. Configure it with
+an optional ``POOL`` entry next to ``ENGINE`` in ``settings.DATABASES``:
+
+    "POOL": {
+        "MIN_SIZE": 1,
+        "MAX_SIZE": 10,
+        "TIMEOUT": 30,
+        "HEALTH_CHECK_INTERVAL": 30,
+    }
+
+Keep ``CONN_MAX_AGE`` at 0, the pool handles reuse. Server workers open
+``MIN_SIZE`` connections when they start (see ``warm_pools``).
+"""
+
+import functools
+
+import psycopg2.extensions
+import psycopg2.extras
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.creation import (
+    DatabaseCreation as PostgreSQLDatabaseCreation,
+)
+
+from train_service.db.pool import (
+    ConnectionPool,
+    PoolTimeout,
+    close_pools,
+    get_pool,
+)
+
+Database = base.Database
+
+DEFAULT_POOL_SETTINGS = {
+    "MIN_SIZE": 0,
+    "MAX_SIZE": 10,
+    "TIMEOUT": 30,
+    "HEALTH_CHECK_INTERVAL": 30,
+}
+
+
+def connect(conn_params):
+    connection = Database.connect(**conn_params)
+    # Same dummy loads() as Django's backend, see its get_new_connection().
+    psycopg2.extras.register_default_jsonb(
+        conn_or_curs=connection, loads=lambda x: x
+    )
+    return connection
+
+
+def is_healthy(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    if not connection.autocommit:
+        connection.rollback()
+    return True
+
+
+class DatabaseCreation(PostgreSQLDatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # PostgreSQL refuses to drop a database with open sessions.
+        close_pools(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    pool = None
+
+    def get_pool(self, conn_params):
+        options = {
+            **DEFAULT_POOL_SETTINGS,
+            **self.settings_dict.get("POOL", {}),
+        }
+        key = tuple(sorted((k, str(v)) for k, v in conn_params.items()))
+        return get_pool(
+            self.alias,
+            key,
+            lambda: ConnectionPool(
+                functools.partial(connect, conn_params),
+                min_size=options["MIN_SIZE"],
+                max_size=options["MAX_SIZE"],
+                timeout=options["TIMEOUT"],
+                health_check_interval=options["HEALTH_CHECK_INTERVAL"],
+                is_healthy=is_healthy,
+            ),
+        )
+
+    def warm_pool(self):
+        """Fill the pool up to its MIN_SIZE, returns the idle count"""
+        return self.get_pool(self.get_connection_params()).warm()
+
+    @base.async_unsafe
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        try:
+            connection = self.pool.acquire()
+        except PoolTimeout as error:
+            raise Database.OperationalError(str(error)) from error
+
+        options = self.settings_dict["OPTIONS"]
+        try:
+            self.isolation_level = options["isolation_level"]
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connection = self.connection
+        discard = bool(connection.closed)
+        if not discard:
+            try:
+                status = connection.get_transaction_status()
+                if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except Database.Error:
+                discard = True
+        self.pool.release(connection, discard=discard)
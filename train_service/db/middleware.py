@@ -0,0 +1,78 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+from train_service.db.routers import allow_replica_reads, replica_reads
+
+PIN_COOKIE_NAME = "use_primary_db"
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Route safe-method requests of catalog views to read replicas, with
+    read-your-writes.
+
+    Only views with ``read_from_replicas = True`` (stations, routes,
+    journeys, ...) read from replicas; the admin, the user's profile and
+    orders always read from the primary. After a client's successful
+    write, its following requests read from the primary for
+    ``REPLICA_READ_YOUR_WRITES_SECONDS`` so they see their own changes
+    despite replication lag. The pin is kept both in a cookie and in the
+    cache under a hash of the client's credentials, since JWT clients often
+    drop cookies.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        is_write = request.method not in SAFE_METHODS
+        request.may_read_replica = not is_write and not self.is_pinned(
+            request
+        )
+
+        # process_view() allows replica reads until the request ends.
+        with replica_reads(False):
+            response = self.get_response(request)
+
+        if is_write and response.status_code < 400:
+            self.pin(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, "cls", view_func)
+        if request.may_read_replica and getattr(
+            view, "read_from_replicas", False
+        ):
+            allow_replica_reads()
+
+    @staticmethod
+    def pin_seconds():
+        return getattr(settings, "REPLICA_READ_YOUR_WRITES_SECONDS", 5)
+
+    @staticmethod
+    def pin_cache_key(request):
+        credentials = request.META.get("HTTP_AUTHORIZATION") or (
+            request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        )
+        if not credentials:
+            return None
+        digest = hashlib.sha256(credentials.encode()).hexdigest()
+        return f"db-primary-pin:{digest}"
+
+    def is_pinned(self, request):
+        if PIN_COOKIE_NAME in request.COOKIES:
+            return True
+        key = self.pin_cache_key(request)
+        return key is not None and cache.get(key) is not None
+
+    def pin(self, request, response):
+        seconds = self.pin_seconds()
+        response.set_cookie(
+            PIN_COOKIE_NAME, "1", max_age=seconds, httponly=True
+        )
+        key = self.pin_cache_key(request)
+        if key is not None:
+            cache.set(key, 1, timeout=seconds)
@@ -0,0 +1,162 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of DB-API connections.
+
+    At most ``max_size`` connections are checked out or idle at any time;
+    callers block for up to ``timeout`` seconds waiting for a free slot.
+    Idle connections are reused most-recently-released first and are
+    health-checked when they have been idle longer than
+    ``health_check_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        connect,
+        min_size=0,
+        max_size=10,
+        timeout=30,
+        health_check_interval=30,
+        is_healthy=None,
+    ):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("Pool requires 0 <= min_size <= max_size >= 1")
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.is_healthy = is_healthy
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self.pid = os.getpid()
+
+    @property
+    def idle_count(self):
+        return len(self._idle)
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(
+                f"No free connection in the pool after {self.timeout} seconds "
+                f"(max_size={self.max_size})"
+            )
+        try:
+            while True:
+                with self._lock:
+                    item = self._idle.pop() if self._idle else None
+                if item is None:
+                    return self.connect()
+                connection, released_at = item
+                if self._check(connection, released_at):
+                    return connection
+                self._discard(connection)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection, discard=False):
+        try:
+            if discard or getattr(connection, "closed", False):
+                self._discard(connection)
+            else:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def warm(self, size=None):
+        """Open connections until ``size`` (default min_size) are idle"""
+        size = self.min_size if size is None else min(size, self.max_size)
+        connections = []
+        try:
+            while self.idle_count + len(connections) < size:
+                connections.append(self.acquire())
+        finally:
+            for connection in connections:
+                self.release(connection)
+        return self.idle_count
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def _check(self, connection, released_at):
+        if getattr(connection, "closed", False):
+            return False
+        idle_for = time.monotonic() - released_at
+        if self.is_healthy is None or idle_for < self.health_check_interval:
+            return True
+        try:
+            return self.is_healthy(connection)
+        except Exception:
+            return False
+
+    @staticmethod
+    def _discard(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, key, factory):
+    """
+    Return this process's pool for ``(alias, key)``, creating it with
+    ``factory``. A forked worker never uses its parent's connections.
+    """
+    with _pools_lock:
+        pool = _pools.get((alias, key))
+        if pool is None or pool.pid != os.getpid():
+            pool = _pools[(alias, key)] = factory()
+        return pool
+
+
+def close_pools(alias=None):
+    """Close idle connections of every pool, or only of one database alias"""
+    with _pools_lock:
+        keys = [key for key in _pools if alias is None or key[0] == alias]
+        pools = [_pools.pop(key) for key in keys]
+    for pool in pools:
+        pool.close()
+
+
+def warm_pools():
+    """
+    Fill the pools of every database up to their MIN_SIZE. Pools belong to
+    one process, so each server worker warms its own when it imports
+    train_service.wsgi or asgi.
+    """
+    from django.db import connections
+
+    for connection in connections.all():
+        if not hasattr(connection, "warm_pool"):
+            continue
+        try:
+            connection.warm_pool()
+        except Exception:
+            # The first request will report it, don't fail the worker.
+            logger.warning(
+                "Could not warm the %s connection pool",
+                connection.alias,
+                exc_info=True,
+            )
@@ -0,0 +1,234 @@
+"""
+Lightweight, production-safe request instrumentation.
+
+``MetricsMiddleware`` records per view/action request counts, a latency
+histogram, SQL query count and time, serializer time and response size in
+an in-process registry; ``metrics_view`` exposes it in the Prometheus text
+format. Every worker process keeps its own registry, so scrape each worker
+(or sum the series per instance in Prometheus).
+"""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+from rest_framework import serializers
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+_request_stats = contextvars.ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    __slots__ = ("queries", "sql_time", "serializer_time", "_depth")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self._depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper, see connection.execute_wrapper()"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += time.perf_counter() - start
+
+
+class Series:
+    __slots__ = (
+        "requests",
+        "buckets",
+        "duration",
+        "queries",
+        "sql_time",
+        "serializer_time",
+        "response_bytes",
+    )
+
+    def __init__(self):
+        self.requests = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.duration = 0.0
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.response_bytes = 0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, status, duration, stats, response_bytes):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = Series()
+            series.requests[status] = series.requests.get(status, 0) + 1
+            series.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+            series.duration += duration
+            series.queries += stats.queries
+            series.sql_time += stats.sql_time
+            series.serializer_time += stats.serializer_time
+            series.response_bytes += response_bytes
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._series.items())
+            return "".join(self._render(items))
+
+    @staticmethod
+    def _render(items):
+        def label_str(view, action, **extra):
+            pairs = {"view": view, "action": action, **extra}
+            return ",".join(f'{key}="{value}"' for key, value in pairs.items())
+
+        yield "# HELP http_requests_total Requests handled per view action.\n"
+        yield "# TYPE http_requests_total counter\n"
+        for (view, action), series in items:
+            for status, count in sorted(series.requests.items()):
+                labels = label_str(view, action, status=status)
+                yield f"http_requests_total{{{labels}}} {count}\n"
+
+        yield "# HELP http_request_duration_seconds Request latency.\n"
+        yield "# TYPE http_request_duration_seconds histogram\n"
+        for (view, action), series in items:
+            cumulative = 0
+            bounds = [*map(str, LATENCY_BUCKETS), "+Inf"]
+            for bound, count in zip(bounds, series.buckets):
+                cumulative += count
+                labels = label_str(view, action, le=bound)
+                yield (
+                    f"http_request_duration_seconds_bucket{{{labels}}} "
+                    f"{cumulative}\n"
+                )
+            labels = label_str(view, action)
+            yield (
+                f"http_request_duration_seconds_sum{{{labels}}} "
+                f"{series.duration}\n"
+            )
+            yield (
+                f"http_request_duration_seconds_count{{{labels}}} "
+                f"{cumulative}\n"
+            )
+
+        for name, attr, kind, help_text in (
+            ("db_queries_total", "queries", "counter", "SQL queries run."),
+            (
+                "db_query_duration_seconds_total",
+                "sql_time",
+                "counter",
+                "Time spent in SQL queries.",
+            ),
+            (
+                "serializer_duration_seconds_total",
+                "serializer_time",
+                "counter",
+                "Time spent building serializer output, lazy queries "
+                "included.",
+            ),
+            (
+                "http_response_size_bytes_total",
+                "response_bytes",
+                "counter",
+                "Response body bytes sent.",
+            ),
+        ):
+            yield f"# HELP {name} {help_text}\n"
+            yield f"# TYPE {name} {kind}\n"
+            for (view, action), series in items:
+                labels = label_str(view, action)
+                yield f"{name}{{{labels}}} {getattr(series, attr)}\n"
+
+
+registry = MetricsRegistry()
+
+
+def _instrument_serializers():
+    """Time the outermost ``.data`` evaluation of every DRF serializer"""
+    base = serializers.BaseSerializer
+    if getattr(base.data.fget, "instrumented", False):
+        return
+    original = base.data.fget
+
+    def data(self):
+        stats = _request_stats.get()
+        if stats is None:
+            return original(self)
+        stats._depth += 1
+        start = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            stats._depth -= 1
+            if stats._depth == 0:
+                stats.serializer_time += time.perf_counter() - start
+
+    prop = property(data)
+    prop.fget.instrumented = True
+    base.data = prop
+
+
+def view_labels(view_func, method):
+    cls = getattr(view_func, "cls", None)
+    if cls is None:
+        return view_func.__name__, method.lower()
+    actions = getattr(view_func, "actions", None) or {}
+    return cls.__name__, actions.get(method.lower(), method.lower())
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        _instrument_serializers()
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        duration = time.perf_counter() - start
+
+        labels = getattr(request, "metrics_labels", None)
+        if labels is not None:
+            size = 0 if response.streaming else len(response.content)
+            registry.observe(
+                labels, response.status_code, duration, stats, size
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if view_func is not metrics_view:
+            request.metrics_labels = view_labels(view_func, request.method)
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, only reachable from METRICS_ALLOWED_IPS"""
+    allowed = getattr(settings, "METRICS_ALLOWED_IPS", ("127.0.0.1", "::1"))
+    if request.META.get("REMOTE_ADDR") not in allowed:
+        raise Http404
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,120 @@
+"""
+On-demand cProfile dumps of single requests.
+
+A staff user adds ``?profile=1`` or an ``X-Profile: 1`` header to any
+request; the request runs under cProfile and the pstats dump is written to
+``PROFILING["DIR"]``. The dump name is returned to the staff user in the
+``X-Profile-Dump`` response header, ``manage.py profile_dumps`` lists and
+summarizes dumps. ``PROFILING["SAMPLE_RATE"]`` additionally profiles that
+fraction of all requests, so production traffic can be sampled without
+anyone asking; sampled responses do not name their dump.
+"""
+
+import contextlib
+import cProfile
+import os
+import random
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.utils.text import slugify
+from rest_framework.exceptions import AuthenticationFailed
+
+from user.authentication import CachedJWTAuthentication
+
+DEFAULT_PROFILING_SETTINGS = {
+    "DIR": "profiles",
+    "SAMPLE_RATE": 0.0,
+    "MAX_DUMPS": 500,
+}
+
+
+def profiling_settings():
+    options = getattr(settings, "PROFILING", {})
+    return {**DEFAULT_PROFILING_SETTINGS, **options}
+
+
+def list_dumps():
+    """Return dump paths, newest first"""
+    directory = profiling_settings()["DIR"]
+    if not os.path.isdir(directory):
+        return []
+    paths = [
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(".prof")
+    ]
+    return sorted(paths, key=modified_at, reverse=True)
+
+
+def modified_at(path):
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        # Pruned by another worker since it was listed.
+        return 0
+
+
+def is_staff(request):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return result is not None and result[0].is_staff
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = self.is_requested(request)
+        if not requested and not self.is_sampled():
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+
+        name = self.save(profiler, request)
+        if requested:
+            response["X-Profile-Dump"] = name
+        return response
+
+    @staticmethod
+    def is_requested(request):
+        """A staff user asked for this request's profile"""
+        requested = "1" in (
+            request.GET.get("profile"),
+            request.headers.get("X-Profile"),
+        )
+        return requested and is_staff(request)
+
+    @staticmethod
+    def is_sampled():
+        return random.random() < profiling_settings()["SAMPLE_RATE"]
+
+    @staticmethod
+    def save(profiler, request):
+        options = profiling_settings()
+        os.makedirs(options["DIR"], exist_ok=True)
+        name = "{}-{}-{}-{}.prof".format(
+            datetime.now().strftime("%Y%m%dT%H%M%S"),
+            request.method.lower(),
+            slugify(request.path)[:80],
+            uuid.uuid4().hex[:8],
+        )
+        profiler.dump_stats(os.path.join(options["DIR"], name))
+
+        for path in list_dumps()[options["MAX_DUMPS"]:]:
+            # Workers prune concurrently, another one may have been first.
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+        return name
@@ -0,0 +1,129 @@
+"""
+Precomputed OpenAPI schema.
+
+``manage.py generate_schema`` renders the drf-spectacular schema into
+``OPENAPI_SCHEMA["PATH"]``; ``schema_view`` serves that file with an ETag
+and ``Cache-Control`` instead of walking every viewset per request, so
+the Swagger and Redoc pages revalidate with a 304. The file is read once
+per process (and again when it changes on disk). Without a file, the
+schema is generated once on the first request.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_safe
+from django.views.decorators.vary import vary_on_headers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "PATH": os.path.join(settings.BASE_DIR, "openapi.yml"),
+    "MAX_AGE": 60 * 60,
+}
+YAML = "application/vnd.oai.openapi"
+JSON = "application/vnd.oai.openapi+json"
+
+
+def schema_settings():
+    options = getattr(settings, "OPENAPI_SCHEMA", {})
+    return {**DEFAULT_SETTINGS, **options}
+
+
+def generate_schema():
+    """Render the current API schema as YAML bytes"""
+    from drf_spectacular.generators import SchemaGenerator
+    from drf_spectacular.renderers import OpenApiYamlRenderer
+
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    return OpenApiYamlRenderer().render(schema, renderer_context={})
+
+
+class SchemaDocument:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+
+
+class SchemaFile:
+    """The schema file in YAML and JSON, reloaded when it changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._documents = {}
+
+    def stamp(self, path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self, path):
+        stamp = self.stamp(path)
+        if stamp is not None:
+            with open(path, "rb") as file:
+                return stamp, file.read()
+        logger.warning(
+            "%s is missing, run 'manage.py generate_schema'", path
+        )
+        return None, generate_schema()
+
+    def get(self, media_type):
+        path = schema_settings()["PATH"]
+        with self._lock:
+            stamp = self.stamp(path)
+            if not self._documents or (
+                stamp is not None and stamp != self._stamp
+            ):
+                self._stamp, body = self.load(path)
+                self._documents = {YAML: SchemaDocument(body)}
+            if media_type not in self._documents:
+                import yaml
+
+                data = yaml.safe_load(self._documents[YAML].body)
+                self._documents[media_type] = SchemaDocument(
+                    json.dumps(data, indent=2).encode()
+                )
+            return self._documents[media_type]
+
+    def reset(self):
+        with self._lock:
+            self._stamp = None
+            self._documents = {}
+
+
+schema_file = SchemaFile()
+
+
+def media_type(request):
+    if request.GET.get("format") == "json" or (
+        "json" in request.headers.get("Accept", "")
+        and "yaml" not in request.headers.get("Accept", "")
+    ):
+        return JSON
+    return YAML
+
+
+def schema_etag(request):
+    return schema_file.get(media_type(request)).etag
+
+
+@require_safe
+@vary_on_headers("Accept")
+@cache_control(public=True, max_age=schema_settings()["MAX_AGE"])
+@condition(etag_func=schema_etag)
+def schema_view(request):
+    content_type = media_type(request)
+    return HttpResponse(
+        schema_file.get(content_type).body, content_type=content_type
+    )
@@ -44,22 +44,44 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "rest_framework",
     "drf_spectacular",
-    "debug_toolbar",
     "station",
     "user",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "train_service.metrics.MetricsMiddleware",
+    "train_service.db.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "train_service.profiling.ProfilingMiddleware",
 ]
 
+# The debug toolbar adds overhead to every request, keep it to development.
+# Its app loads every panel at start-up, DEBUG_TOOLBAR=False boots without.
+DEBUG_TOOLBAR = DEBUG and os.environ.get("DEBUG_TOOLBAR", "True") == "True"
+
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("train_service.metrics.MetricsMiddleware") + 1,
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+    )
+
+METRICS_ALLOWED_IPS = os.environ.get(
+    "METRICS_ALLOWED_IPS", "127.0.0.1,::1"
+).split(",")
+
+PROFILING = {
+    "DIR": os.environ.get("PROFILING_DIR", "/files/profiles"),
+    "SAMPLE_RATE": float(os.environ.get("PROFILING_SAMPLE_RATE", 0)),
+    "MAX_DUMPS": 500,
+}
+
 ROOT_URLCONF = "train_service.urls"
 
 TEMPLATES = [
@@ -85,15 +107,61 @@ WSGI_APPLICATION = "train_service.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "train_service.db.backends.postgresql",
         "NAME": os.environ["POSTGRES_DB"],
         "USER": os.environ["POSTGRES_USER"],
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
         "HOST": os.environ["POSTGRES_HOST"],
         "PORT": os.environ["POSTGRES_PORT"],
+        "POOL": {
+            "MIN_SIZE": int(os.environ.get("POSTGRES_POOL_MIN_SIZE", 1)),
+            "MAX_SIZE": int(os.environ.get("POSTGRES_POOL_MAX_SIZE", 10)),
+            "TIMEOUT": int(os.environ.get("POSTGRES_POOL_TIMEOUT", 30)),
+            "HEALTH_CHECK_INTERVAL": 30,
+        },
+    }
+}
+
+# Read replicas: a comma-separated list of "host[:port]" entries. Safe-method
+# requests read from a random replica, writes and reads shortly after a
+# write go to the primary (see train_service.db.middleware).
+DATABASE_REPLICAS = []
+
+for index, address in enumerate(
+    filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(","))
+):
+    host, _, port = address.strip().partition(":")
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "NAME": os.environ.get(
+            "POSTGRES_REPLICA_DB", DATABASES["default"]["NAME"]
+        ),
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["train_service.db.routers.PrimaryReplicaRouter"]
+
+REPLICA_READ_YOUR_WRITES_SECONDS = int(
+    os.environ.get("REPLICA_READ_YOUR_WRITES_SECONDS", 5)
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
     }
 }
 
+# Share caches between worker processes (requires the "redis" package).
+if os.environ.get("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -153,7 +221,7 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_THROTTLE_RATES": {"anon": "100/day", "user": "300/day"},
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
 }
 
@@ -170,8 +238,95 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# Written by "manage.py generate_schema", served at api/schema/.
+OPENAPI_SCHEMA = {
+    "PATH": os.environ.get(
+        "OPENAPI_SCHEMA_PATH", os.path.join(BASE_DIR, "openapi.yml")
+    ),
+    "MAX_AGE": int(os.environ.get("OPENAPI_SCHEMA_MAX_AGE", 60 * 60)),
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=10),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=100),
     "ROTATE_REFRESH_TOKENS": False,
 }
+
+JWT_AUTH_CACHE = {
+    "MAX_SIZE": int(os.environ.get("JWT_AUTH_CACHE_MAX_SIZE", 10000)),
+    "TTL": int(os.environ.get("JWT_AUTH_CACHE_TTL", 60)),
+    "TRUST_TOKEN_CLAIMS": (
+        os.environ.get("JWT_AUTH_TRUST_TOKEN_CLAIMS", "False") == "True"
+    ),
+    # Unset: cache users only with a shared cache (REDIS_URL).
+    "CACHE_USERS": {"True": True, "False": False}.get(
+        os.environ.get("JWT_AUTH_CACHE_USERS")
+    ),
+}
+
+# "inline": cancelled seats go to waitlisted users in the same transaction,
+# "batch": the promote_waitlist command hands them out later.
+WAITLIST_PROMOTION = os.environ.get("WAITLIST_PROMOTION", "inline")
+
+# "inline": orders are booked in the request, "queued": they are answered
+# with 202 and booked later by the run_booking_workers command.
+ORDER_INTAKE = os.environ.get("ORDER_INTAKE", "inline")
+
+# Background jobs run by "manage.py run_workers" (see station.jobs). Failed
+# attempts are retried after BACKOFF * 2 ** (attempts - 1) seconds.
+JOBS = {
+    "MAX_ATTEMPTS": int(os.environ.get("JOBS_MAX_ATTEMPTS", 5)),
+    "BACKOFF": 10,
+    "MAX_BACKOFF": 60 * 60,
+    "HEARTBEAT": 30,
+    "STALE_AFTER": int(os.environ.get("JOBS_STALE_AFTER", 5 * 60)),
+}
+
+IDEMPOTENCY_KEY_TTL = timedelta(
+    seconds=int(os.environ.get("IDEMPOTENCY_KEY_TTL", 24 * 60 * 60))
+)
+
+JOURNEY_SEARCH_CACHE = {
+    # Unset: cache only with a shared cache (REDIS_URL), "True"/"False" force.
+    "ENABLED": {"True": True, "False": False}.get(
+        os.environ.get("JOURNEY_SEARCH_CACHE")
+    ),
+    "TIMEOUT": int(os.environ.get("JOURNEY_SEARCH_CACHE_TIMEOUT", 60 * 60)),
+    "MAX_ROWS": 1000,
+    "LOCK_TIMEOUT": 10,
+    "WAIT_INTERVAL": 0.05,
+}
+
+# Compiled by the compile_timetable command, served while it is current.
+TIMETABLE_SNAPSHOT = {
+    "PATH": os.environ.get(
+        "TIMETABLE_SNAPSHOT_PATH", "/files/timetable/timetable.bin"
+    ),
+    "CHECK_INTERVAL": int(os.environ.get("TIMETABLE_CHECK_INTERVAL", 5)),
+}
+
+# Departure and arrival boards of stations, cached per station.
+STATION_BOARD_CACHE = {
+    "TIMEOUT": int(os.environ.get("STATION_BOARD_CACHE_TIMEOUT", 5)),
+    "DEFAULT_LIMIT": 10,
+    "MAX_LIMIT": 50,
+}
+
+# Paginated lists and admin changelists count exactly up to THRESHOLD rows,
+# then use PostgreSQL's estimate (see station.pagination).
+ESTIMATED_COUNT = {
+    "THRESHOLD": int(os.environ.get("ESTIMATED_COUNT_THRESHOLD", 10000)),
+}
+
+# Fans seat availability out to the streams served by train_service/asgi.py.
+# Several workers need a broker they share (requires the "redis" package).
+AVAILABILITY_BROKER = {
+    "BACKEND": "station.availability.LocalBroker",
+    "OPTIONS": {},
+    "KEEPALIVE": 15,
+}
+if os.environ.get("REDIS_URL"):
+    AVAILABILITY_BROKER.update(
+        BACKEND="station.availability.RedisBroker",
+        OPTIONS={"url": os.environ["REDIS_URL"]},
+    )
@@ -0,0 +1,130 @@
+"""
+Worker start-up cost.
+
+``profile_startup`` boots ``train_service.wsgi`` (or ``asgi``) in a fresh
+interpreter the way a new worker does, loading the URLconf like its first
+request would, and reports ``python -X importtime`` per module together
+with the boot time and peak memory (see ``manage.py profile_startup``).
+
+Components a worker rarely needs are imported on first use instead:
+``lazy_view`` defers the drf-spectacular documentation views, the schema
+generator only runs in ``manage.py generate_schema`` (see
+train_service.schema), the debug toolbar is only installed with
+``DEBUG_TOOLBAR`` and Pillow is only imported by Django when an image is
+uploaded.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.utils.module_loading import import_string
+
+BOOT_SCRIPT = """
+import json, resource, time
+start = time.perf_counter()
+import train_service.{target}
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({{
+    "boot_seconds": time.perf_counter() - start,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}}))
+"""
+
+
+def lazy_view(path, **initkwargs):
+    """A URLconf view that imports the class-based view on first request"""
+    view = None
+
+    def dispatch(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    return dispatch
+
+
+@dataclass
+class ModuleImport:
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+    @property
+    def package(self):
+        return self.name.split(".")[0]
+
+
+def parse_import_times(output):
+    """``ModuleImport`` rows of ``python -X importtime`` output"""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append(
+            ModuleImport(
+                name=name.strip(),
+                depth=(len(name) - len(name.lstrip()) - 1) // 2,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+            )
+        )
+    return imports
+
+
+def package_times(imports):
+    """``{package: (self_us, cumulative_us)}`` of ``parse_import_times``
+
+    A package's cumulative time counts the imports entered from other
+    packages, including what they import in turn.
+    """
+    totals = defaultdict(lambda: [0, 0])
+    parents = {}
+    # importtime lists a module after its imports: walk back from the top.
+    for row in reversed(imports):
+        parents[row.depth] = row
+        parent = parents.get(row.depth - 1)
+        totals[row.package][0] += row.self_us
+        if parent is None or parent.package != row.package:
+            totals[row.package][1] += row.cumulative_us
+    return {package: tuple(times) for package, times in totals.items()}
+
+
+def boot(target, importtime=False):
+    """Start a worker interpreter, returns its stats and import rows"""
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", BOOT_SCRIPT.format(target=target)]
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        command,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    wall = time.perf_counter() - start
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    stats["wall_seconds"] = wall
+    return stats, parse_import_times(result.stderr)
+
+
+def benchmark(target, repeat):
+    """Median wall time, boot time and peak memory of ``repeat`` boots"""
+    runs = [boot(target)[0] for _ in range(repeat)]
+    return {
+        name: statistics.median(run[name] for run in runs)
+        for name in ("wall_seconds", "boot_seconds", "max_rss_kb")
+    }
@@ -0,0 +1,106 @@
+import functools
+import threading
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase, TestCase
+
+from train_service.db import pool as pools
+from train_service.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.opened = []
+
+    def connect(self):
+        connection = FakeConnection()
+        self.opened.append(connection)
+        return connection
+
+    def test_released_connection_is_reused(self):
+        pool = ConnectionPool(self.connect, max_size=2)
+
+        connection = pool.acquire()
+        pool.release(connection)
+
+        self.assertIs(pool.acquire(), connection)
+        self.assertEqual(len(self.opened), 1)
+
+    def test_pool_size_is_bounded(self):
+        pool = ConnectionPool(self.connect, max_size=1, timeout=0.01)
+        pool.acquire()
+
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+
+    def test_waiting_caller_gets_released_connection(self):
+        pool = ConnectionPool(self.connect, max_size=1, timeout=5)
+        connection = pool.acquire()
+        threading.Timer(0.05, pool.release, args=[connection]).start()
+
+        self.assertIs(pool.acquire(), connection)
+
+    def test_unhealthy_connection_is_replaced(self):
+        pool = ConnectionPool(
+            self.connect,
+            health_check_interval=0,
+            is_healthy=lambda connection: False,
+        )
+        stale = pool.acquire()
+        pool.release(stale)
+
+        fresh = pool.acquire()
+
+        self.assertIsNot(fresh, stale)
+        self.assertTrue(stale.closed)
+
+    def test_warm_opens_min_size_connections(self):
+        pool = ConnectionPool(self.connect, min_size=3, max_size=5)
+
+        self.assertEqual(pool.warm(), 3)
+        self.assertEqual(len(self.opened), 3)
+
+    def test_forked_worker_gets_its_own_pool(self):
+        factory = functools.partial(ConnectionPool, self.connect)
+        self.addCleanup(pools.close_pools, "test")
+        parent = pools.get_pool("test", (), factory)
+
+        self.assertIs(pools.get_pool("test", (), factory), parent)
+        with mock.patch("os.getpid", return_value=parent.pid + 1):
+            self.assertIsNot(pools.get_pool("test", (), factory), parent)
+
+    def test_warm_pools_of_every_database(self):
+        pooled, failing = mock.Mock(), mock.Mock(alias="replica_0")
+        failing.warm_pool.side_effect = OperationalError
+        unpooled = mock.Mock(spec=["alias"])
+
+        with mock.patch(
+            "django.db.connections.all",
+            return_value=[pooled, failing, unpooled],
+        ), self.assertLogs("train_service.db.pool", "WARNING"):
+            pools.warm_pools()
+
+        pooled.warm_pool.assert_called_once_with()
+
+
+class WaitForDbTests(TestCase):
+    @mock.patch("time.sleep")
+    def test_wait_for_db_retries_until_ready(self, sleep):
+        with mock.patch(
+            "django.db.backends.utils.CursorWrapper.execute",
+            side_effect=[OperationalError, OperationalError, None],
+        ) as execute:
+            call_command("wait_for_db", stdout=mock.MagicMock())
+
+        self.assertEqual(execute.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
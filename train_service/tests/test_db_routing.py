@@ -0,0 +1,176 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Order, Station
+from train_service.db.middleware import ReplicaRoutingMiddleware
+from train_service.db.routers import PrimaryReplicaRouter, replica_reads
+
+AUTH = {"HTTP_AUTHORIZATION": "Bearer token"}
+STATION_URL = reverse("station:station-list")
+LVIV = {"name": "Lviv", "latitude": 49.84, "longitude": 24.03}
+
+
+def catalog_view(request):
+    return HttpResponse()
+
+
+catalog_view.read_from_replicas = True
+
+
+def profile_view(request):
+    return HttpResponse()
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class PrimaryReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        self.read_from = []
+        self.view = catalog_view
+        self.status = 200
+
+        def get_response(request):
+            self.middleware.process_view(request, self.view, (), {})
+            self.read_from.append(self.router.db_for_read(Station))
+            return HttpResponse(status=self.status)
+
+        self.middleware = ReplicaRoutingMiddleware(get_response)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(self.router.db_for_read(Station), "default")
+
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Station), "replica")
+            self.assertEqual(self.router.db_for_write(Station), "default")
+
+    def test_safe_request_reads_from_replica(self):
+        self.middleware(self.factory.get("/api/station/stations/", **AUTH))
+
+        self.assertEqual(self.read_from, ["replica"])
+
+    def test_views_without_replica_reads_use_primary(self):
+        self.view = profile_view
+
+        self.middleware(self.factory.get("/api/user/me/", **AUTH))
+
+        self.assertEqual(self.read_from, ["default"])
+
+    def test_replica_reads_end_with_the_request(self):
+        self.middleware(self.factory.get("/api/station/stations/", **AUTH))
+
+        self.assertEqual(self.router.db_for_read(Station), "default")
+
+    def test_write_request_uses_primary(self):
+        self.middleware(self.factory.post("/api/station/orders/", **AUTH))
+
+        self.assertEqual(self.read_from, ["default"])
+
+    def test_reads_after_write_stick_to_primary(self):
+        self.middleware(self.factory.post("/api/station/orders/", **AUTH))
+        self.middleware(self.factory.get("/api/station/orders/", **AUTH))
+        self.middleware(self.factory.get("/api/station/orders/"))
+
+        self.assertEqual(self.read_from, ["default", "default", "replica"])
+
+    def test_failed_write_does_not_pin(self):
+        self.status = 400
+        response = self.middleware(
+            self.factory.post("/api/station/orders/", **AUTH)
+        )
+        self.status = 200
+        self.middleware(self.factory.get("/api/station/orders/", **AUTH))
+
+        self.assertNotIn("use_primary_db", response.cookies)
+        self.assertEqual(self.read_from, ["default", "replica"])
+
+    def test_pin_cookie_keeps_reads_on_primary(self):
+        response = self.middleware(self.factory.post("/api/station/orders/"))
+        request = self.factory.get("/api/station/orders/")
+        request.COOKIES.update(
+            {key: morsel.value for key, morsel in response.cookies.items()}
+        )
+
+        self.middleware(request)
+
+        self.assertEqual(self.read_from, ["default", "default"])
+
+    def test_migrations_skip_replicas(self):
+        self.assertFalse(self.router.allow_migrate("replica", "station"))
+        self.assertTrue(self.router.allow_migrate("default", "station"))
+        self.assertTrue(self.router.allow_relation(Order(), Station()))
+
+
+HAS_REPLICA = "replica_0" in settings.DATABASES
+
+
+@skipUnless(HAS_REPLICA, "Requires a replica, set POSTGRES_REPLICA_HOSTS")
+@override_settings(DATABASE_REPLICAS=["replica_0"])
+class ReplicaConnectionTests(TestCase):
+    """Which connection actually runs the queries of a request"""
+
+    # The runner checks every listed alias, even of skipped tests.
+    databases = {"default", "replica_0"} if HAS_REPLICA else {"default"}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@a.com", "pass", username="admin", is_staff=True
+            )
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def request(self, method, *args, **kwargs):
+        """The response and the connections its queries ran on"""
+        primary = CaptureQueriesContext(connections["default"])
+        replica = CaptureQueriesContext(connections["replica_0"])
+        with primary, replica:
+            response = getattr(self.client, method)(*args, **kwargs)
+        used = {
+            context.connection.alias
+            for context in (primary, replica)
+            if len(context)
+        }
+        return response, used
+
+    def test_read_served_by_replica(self):
+        res, used = self.request("get", STATION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(used, {"replica_0"})
+
+    def test_write_served_by_primary(self):
+        res, used = self.request("post", STATION_URL, LVIV)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(used, {"default"})
+
+    def test_read_after_write_served_by_primary(self):
+        self.request("post", STATION_URL, LVIV)
+
+        res, used = self.request("get", STATION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(used, {"default"})
+        self.assertIn("Lviv", [station["name"] for station in res.data])
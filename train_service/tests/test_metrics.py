@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Station
+from train_service.metrics import registry
+
+METRICS_URL = reverse("metrics")
+STATION_URL = reverse("station:station-list")
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        registry.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "testpass")
+        )
+        Station.objects.create(name="Lviv")
+
+    def test_requests_are_recorded_per_view_action(self):
+        self.client.get(STATION_URL)
+        self.client.get(STATION_URL)
+
+        res = self.client.get(METRICS_URL)
+        body = res.content.decode()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            'http_requests_total{view="StationViewSet",action="list",'
+            'status="200"} 2',
+            body,
+        )
+        self.assertIn(
+            'http_request_duration_seconds_count{view="StationViewSet",'
+            'action="list"} 2',
+            body,
+        )
+        self.assertIn(
+            'db_queries_total{view="StationViewSet",action="list"} 2', body
+        )
+        self.assertIn("serializer_duration_seconds_total", body)
+
+    def test_metrics_hidden_from_external_addresses(self):
+        res = self.client.get(METRICS_URL, REMOTE_ADDR="203.0.113.7")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
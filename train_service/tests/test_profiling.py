@@ -0,0 +1,101 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from train_service import profiling
+
+STATION_URL = reverse("station:station-list")
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings = override_settings(
+            PROFILING={"DIR": self.directory.name}
+        )
+        self.settings.enable()
+        self.client = APIClient()
+
+    def tearDown(self):
+        self.settings.disable()
+        self.directory.cleanup()
+
+    def test_staff_request_is_profiled(self):
+        self.client.force_login(
+            get_user_model().objects.create_superuser(
+                "admin@test.com", "password"
+            )
+        )
+
+        res = self.client.get(STATION_URL, {"profile": 1})
+
+        dump = res["X-Profile-Dump"]
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, dump)))
+
+        out = io.StringIO()
+        call_command("profile_dumps", stdout=out)
+        self.assertIn(dump, out.getvalue())
+
+        out = io.StringIO()
+        call_command("profile_dumps", "stations", stdout=out)
+        self.assertIn("Summary of 1 dump(s)", out.getvalue())
+
+    def test_regular_user_request_is_not_profiled(self):
+        self.client.force_login(
+            get_user_model().objects.create_user("user@test.com", "password")
+        )
+
+        res = self.client.get(STATION_URL, {"profile": 1})
+
+        self.assertNotIn("X-Profile-Dump", res)
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_dumps_pruned_by_other_workers_are_skipped(self):
+        self.client.force_login(
+            get_user_model().objects.create_superuser(
+                "admin@test.com", "password"
+            )
+        )
+        self.client.get(STATION_URL, {"profile": 1})
+
+        with override_settings(
+            PROFILING={"DIR": self.directory.name, "MAX_DUMPS": 1}
+        ), mock.patch("os.remove", side_effect=FileNotFoundError) as remove:
+            res = self.client.get(STATION_URL, {"profile": 1})
+
+        remove.assert_called_once()
+        self.assertIn("X-Profile-Dump", res)
+
+    def test_sampled_request_does_not_name_its_dump(self):
+        with override_settings(
+            PROFILING={"DIR": self.directory.name, "SAMPLE_RATE": 1.0}
+        ):
+            res = self.client.get(STATION_URL)
+
+        self.assertNotIn("X-Profile-Dump", res)
+        self.assertEqual(len(os.listdir(self.directory.name)), 1)
+
+    def test_command_skips_dumps_pruned_while_listing(self):
+        with override_settings(
+            PROFILING={"DIR": self.directory.name, "SAMPLE_RATE": 1.0}
+        ):
+            self.client.get(STATION_URL)
+        pruned = os.path.join(self.directory.name, "pruned-stations.prof")
+
+        with mock.patch(
+            "station.management.commands.profile_dumps.list_dumps",
+            side_effect=lambda: [pruned] + profiling.list_dumps(),
+        ):
+            out = io.StringIO()
+            call_command("profile_dumps", stdout=out)
+            call_command("profile_dumps", "stations", stdout=out)
+
+        self.assertNotIn("pruned", out.getvalue())
+        self.assertIn("Summary of 1 dump(s)", out.getvalue())
@@ -0,0 +1,73 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from train_service.schema import generate_schema, schema_file
+
+SCHEMA_URL = reverse("schema")
+
+
+class SchemaFileTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "openapi.yml")
+        with open(self.path, "w") as file:
+            file.write("openapi: 3.0.3\ninfo:\n  title: Test\n")
+        self.settings = override_settings(OPENAPI_SCHEMA={"PATH": self.path})
+        self.settings.enable()
+        schema_file.reset()
+
+    def tearDown(self):
+        self.settings.disable()
+        self.directory.cleanup()
+        schema_file.reset()
+
+    def test_committed_schema_is_up_to_date(self):
+        self.settings.disable()
+        call_command("generate_schema", "--check", stdout=io.StringIO())
+        self.settings.enable()
+
+    def test_documents_jwt_authentication(self):
+        schema = generate_schema().decode()
+
+        self.assertIn("jwtAuth:", schema)
+        self.assertIn("scheme: bearer", schema)
+
+    def test_served_with_etag_and_cache_headers(self):
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], "application/vnd.oai.openapi")
+        self.assertIn(b"title: Test", res.content)
+        self.assertIn("max-age=3600", res["Cache-Control"])
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b"")
+
+    def test_json_format(self):
+        yaml_etag = self.client.get(SCHEMA_URL)["ETag"]
+
+        res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(json.loads(res.content)["info"]["title"], "Test")
+        self.assertNotEqual(res["ETag"], yaml_etag)
+
+    def test_rewritten_file_is_reloaded(self):
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+        with open(self.path, "w") as file:
+            file.write("openapi: 3.0.3\ninfo:\n  title: Changed\n")
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(b"title: Changed", res.content)
+
+    def test_stale_schema_fails_check(self):
+        with self.assertRaisesMessage(Exception, "is stale"):
+            call_command("generate_schema", "--check", stdout=io.StringIO())
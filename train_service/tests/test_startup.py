@@ -0,0 +1,80 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from train_service.startup import boot, package_times, parse_import_times
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     rest_framework.compat
+import time:       300 |        420 |   rest_framework.views
+import time:        50 |         50 |     station.fieldsets
+import time:       200 |        250 |   station.serializers
+import time:       100 |        770 | station.views
+"""
+
+
+class ImportTimeTests(SimpleTestCase):
+    def test_parse_import_times(self):
+        imports = parse_import_times("other output\n" + IMPORTTIME)
+
+        self.assertEqual(
+            [(row.name, row.depth) for row in imports],
+            [
+                ("rest_framework.compat", 2),
+                ("rest_framework.views", 1),
+                ("station.fieldsets", 2),
+                ("station.serializers", 1),
+                ("station.views", 0),
+            ],
+        )
+        self.assertEqual(imports[1].self_us, 300)
+        self.assertEqual(imports[1].cumulative_us, 420)
+
+    def test_package_times_count_imports_from_other_packages(self):
+        times = package_times(parse_import_times(IMPORTTIME))
+
+        self.assertEqual(times["station"], (350, 770))
+        self.assertEqual(times["rest_framework"], (420, 420))
+
+
+class StartupTests(SimpleTestCase):
+    def test_worker_boot_defers_optional_components(self):
+        stats, imports = boot("wsgi", importtime=True)
+        modules = {row.name for row in imports}
+
+        self.assertIn("station.views", modules)
+        self.assertNotIn("drf_spectacular.views", modules)
+        self.assertNotIn("drf_spectacular.generators", modules)
+        self.assertNotIn("PIL", modules)
+        self.assertGreater(stats["max_rss_kb"], 0)
+
+    def test_lazy_documentation_views(self):
+        res = self.client.get(reverse("swagger-ui"))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, reverse("schema"))
+
+    def test_profile_startup_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            record = os.path.join(directory, "startup.jsonl")
+            out = io.StringIO()
+            call_command(
+                "profile_startup",
+                "--limit=5",
+                "--repeat=1",
+                f"--record={record}",
+                stdout=out,
+            )
+            with open(record) as file:
+                result = json.loads(file.readline())
+
+        self.assertIn("train_service.wsgi", out.getvalue())
+        self.assertEqual(result["target"], "wsgi")
+        self.assertGreater(result["wall_seconds"], 0)
+        self.assertGreater(result["modules"], 0)
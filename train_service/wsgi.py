@@ -11,6 +11,11 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from train_service.db.pool import warm_pools
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "train_service.settings")
 
 application = get_wsgi_application()
+
+# Every worker imports this module, each fills its own connection pool.
+warm_pools()
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from train_service import caches
+
+DEFAULT_CACHE_SETTINGS = {
+    "MAX_SIZE": 10000,
+    "TTL": 60,
+    "TRUST_TOKEN_CLAIMS": False,
+    # None: only cache users when the default cache is shared.
+    "CACHE_USERS": None,
+}
+USER_KEY = "jwt-auth:user:{}"
+
+
+def cache_settings():
+    options = getattr(settings, "JWT_AUTH_CACHE", {})
+    return {**DEFAULT_CACHE_SETTINGS, **options}
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU cache whose entries expire after a TTL"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_options = cache_settings()
+token_cache = LRUCache(_options["MAX_SIZE"], _options["TTL"])
+
+
+def caches_users():
+    enabled = cache_settings()["CACHE_USERS"]
+    if enabled is None:
+        return caches.is_shared()
+    return enabled
+
+
+def invalidate_user(user_id):
+    """
+    Drop a cached user so the next request of any worker reloads it from
+    the database. Queryset updates send no signals: call it after them.
+    """
+    cache.delete(USER_KEY.format(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that keeps verified tokens in a per-process LRU
+    cache and their users in the shared default cache, so a repeated token
+    costs neither a signature check nor a user query until its cache
+    entry expires. User changes invalidate the user in every worker; with
+    a per-process cache users are not cached unless ``CACHE_USERS`` is set.
+
+    Views that only need to know that the caller is authenticated can set
+    ``token_claims_authentication = True``; when ``TRUST_TOKEN_CLAIMS`` is
+    enabled their safe-method requests get a ``TokenUser`` built from the
+    token claims and never touch the user table.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        if self.can_trust_token_claims(request):
+            return (
+                api_settings.TOKEN_USER_CLASS(validated_token),
+                validated_token,
+            )
+
+        return self.get_user(validated_token), validated_token
+
+    def get_validated_token(self, raw_token):
+        validated_token = token_cache.get(raw_token)
+        if validated_token is not None:
+            return validated_token
+
+        validated_token = super().get_validated_token(raw_token)
+        expires_in = validated_token.get("exp", 0) - time.time()
+        token_cache.set(raw_token, validated_token, ttl=expires_in)
+        return validated_token
+
+    def get_user(self, validated_token):
+        if not caches_users():
+            return super().get_user(validated_token)
+
+        key = USER_KEY.format(validated_token.get(api_settings.USER_ID_CLAIM))
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, timeout=cache_settings()["TTL"])
+        return user
+
+    @staticmethod
+    def can_trust_token_claims(request):
+        if not cache_settings()["TRUST_TOKEN_CLAIMS"]:
+            return False
+        if request.method not in SAFE_METHODS:
+            return False
+        view = getattr(request, "parser_context", {}).get("view")
+        return getattr(view, "token_claims_authentication", False)
@@ -0,0 +1,7 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Document ``CachedJWTAuthentication`` as the simplejwt Bearer scheme"""
+
+    target_class = "user.authentication.CachedJWTAuthentication"
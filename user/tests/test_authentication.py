@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import caches_users, invalidate_user, token_cache
+
+ME_URL = reverse("user:manage")
+STATION_URL = reverse("station:station-list")
+
+
+@override_settings(JWT_AUTH_CACHE={"CACHE_USERS": True})
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass", username="test"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_user_is_loaded_once_per_token(self):
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], "test@test.com")
+
+    def test_cached_user_invalidated_on_update(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {"email": "new@test.com"})
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["email"], "new@test.com")
+
+    def test_cached_user_invalidated_on_staff_change(self):
+        res = self.client.post(STATION_URL, {"name": "Lviv"})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.post(
+            STATION_URL, {"name": "Lviv", "latitude": 1, "longitude": 1}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_queryset_update_needs_invalidate_user(self):
+        self.client.get(ME_URL)
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+        invalidate_user(self.user.pk)
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_per_process_cache_does_not_cache_users(self):
+        with self.settings(JWT_AUTH_CACHE={}):
+            self.assertFalse(caches_users())
+            self.client.get(ME_URL)
+            with self.assertNumQueries(1):
+                self.client.get(ME_URL)
+
+    @override_settings(JWT_AUTH_CACHE={"TRUST_TOKEN_CLAIMS": True})
+    def test_read_only_endpoint_authorized_from_claims(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(STATION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_invalid_token_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer invalid")
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)